@@ -0,0 +1,104 @@
+import math
+import threading
+import time
+import numpy as np
+
+
+def rosenbrock(x):
+    x = np.asarray(x, dtype=float)
+    return float(np.sum(100*(x[1:] - x[:-1]**2)**2 + (1 - x[:-1])**2))
+
+
+def rastrigin(x):
+    x = np.asarray(x, dtype=float)
+    return float(10*len(x) + np.sum(x**2 - 10*np.cos(2*math.pi*x)))
+
+
+def ackley(x):
+    x = np.asarray(x, dtype=float)
+    d = len(x)
+    return float(-20*math.exp(-0.2*math.sqrt(np.sum(x**2)/d)) -
+                 math.exp(np.sum(np.cos(2*math.pi*x))/d) + 20 + math.e)
+
+
+def branin(x):
+    a, b, c = 1.0, 5.1/(4*math.pi**2), 5/math.pi
+    r, s, t = 6.0, 10.0, 1/(8*math.pi)
+    return float(a*(x[1] - b*x[0]**2 + c*x[0] - r)**2 +
+                 s*(1 - t)*math.cos(x[0]) + s)
+
+
+class testProblem():
+    '''
+    Analytic test problem of the benchmark suite, with a known optimal
+    objective value. Calling the problem evaluates the objective and
+    counts the evaluations and the time spent in them, so the runner can
+    split the wall time of a run into black-box time and tuner overhead.
+    '''
+    def __init__(self, name, f, lb, ub, ints, target):
+        '''
+        @param name: Name of the problem
+        @param f: Objective, takes a list of floats and returns a float
+        @param lb: Variable lower bounds
+        @param ub: Variable upper bounds
+        @param ints: Variable types, 0 is cont. and 1 is integer
+        @param target: Optimal objective value
+        '''
+        self.name = name
+        self.f = f
+        self.nvars = len(lb)
+        self.lb = [float(v) for v in lb]
+        self.ub = [float(v) for v in ub]
+        self.ints = list(ints)
+        self.target = target
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, x):
+        start = time.time()
+        f_out = self.f(x)
+        seconds = time.time() - start
+        with self.lock:
+            self.count += 1
+            self.seconds += seconds
+        return f_out
+
+
+def box(name, f, nvars, lo, hi, target, mixed):
+    '''
+    @param mixed: If True, the first half of the variables are integer
+    @return: testProblem in the box [lo, hi]^nvars. The box is shifted
+    off center, so the optimum is not the first point of DIRECT.
+    '''
+    ints = [1 if mixed and i < nvars//2 else 0 for i in range(nvars)]
+    if mixed:
+        name = 'mixed-' + name
+    return testProblem(name + '-' + str(nvars), f, [lo]*nvars,
+                       [hi]*nvars, ints, target)
+
+
+def problems(dims, mixed=True):
+    '''
+    Benchmark suite: Rosenbrock, Rastrigin and Ackley at each dimension of
+    dims, their mixed-integer variants if mixed, and Branin in 2 variables
+
+    @param dims: List of dimensions, from 2 to 100
+    @param mixed: Includes the mixed-integer variants if True
+    @return: List of testProblem
+    '''
+    suite = [testProblem('branin-2', branin, [-5, 0], [10, 15], [0, 0],
+                         0.397887357729738)]
+    for nvars in dims:
+        if nvars < 2 or nvars > 100:
+            raise ValueError('Dimensions must be between 2 and 100')
+        for kind in ([False, True] if mixed else [False]):
+            suite.append(box('rosenbrock', rosenbrock, nvars, -2, 3, 0.0,
+                             kind))
+            suite.append(box('rastrigin', rastrigin, nvars, -4, 6, 0.0,
+                             kind))
+            suite.append(box('ackley', ackley, nvars, -10, 20, 0.0, kind))
+    return suite
@@ -0,0 +1,164 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from hybrid_tuner.tuner import tuner
+from benchmarks.functions import problems
+
+parser = argparse.ArgumentParser(
+    description='Runs the tuning methods on the benchmark problems.')
+parser.add_argument('--methods', nargs='+', default=['Single', 'Hybrid',
+                                                     'Bandit'],
+                    help='Methods to run, Single, Hybrid and Bandit.')
+parser.add_argument('--dims', nargs='+', type=int, default=[2, 10],
+                    help='Dimensions of the problems, from 2 to 100.')
+parser.add_argument('--problems', nargs='+', default=None,
+                    help='Names of the problems to run, all if not given.')
+parser.add_argument('--no-mixed', action='store_true',
+                    help='Skips the mixed-integer variants.')
+parser.add_argument('--solver', type=int, default=20,
+                    help='Solver of SingleSolver and HybridDFO, and first '
+                    'solver of BanditDFO.')
+parser.add_argument('--max-iterations', type=int, default=500,
+                    help='Evaluation budget of each run.')
+parser.add_argument('--cpu-limit', type=float, default=300,
+                    help='Time limit of each run in seconds.')
+parser.add_argument('--tol', type=float, default=1e-3,
+                    help='Tolerance on the optimal objective value.')
+parser.add_argument('--seed', type=int, default=0,
+                    help='Random seed of each run.')
+parser.add_argument('--output', default='benchmarks.json',
+                    help='Location of the JSON results.')
+parser.add_argument('--compare', default=None,
+                    help='JSON results of an earlier run to compare with.')
+parser.add_argument('--keep', action='store_true',
+                    help='Keeps the output directories of the runs.')
+
+
+def write_json(path, data):
+    fn = open(path, 'w')
+    fn.write(json.dumps(data))
+    fn.close()
+
+
+def run(problem, method, args, workdir):
+    '''
+    Tunes one benchmark problem with one method in workdir
+
+    @param problem: testProblem to tune
+    @param method: 'Single', 'Hybrid' or 'Bandit'
+    @param args: Options of the runner, see parser
+    @param workdir: Output directory of the run
+    @return: Dictionary of the results of the run
+    '''
+    params = {'max_iterations': args.max_iterations,
+              'global_tol': args.tol,
+              'cpu_limit': args.cpu_limit,
+              'global_target': problem.target,
+              'solver': args.solver}
+    init_limit = min(max(10*problem.nvars, 20), args.max_iterations//4)
+    if method == 'Hybrid':
+        params['hybrid'] = {'init': 'direct',
+                            'solver': args.solver,
+                            'init_limit': init_limit}
+    elif method == 'Bandit':
+        params['bandit'] = {'init': 'direct',
+                            'frequency': max(args.max_iterations//10, 10),
+                            'cParam': 0.05,
+                            'window': args.max_iterations,
+                            'init_limit': init_limit}
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    problem.reset()
+    start = time.time()
+    job = tuner({'lower_bounds': problem.lb,
+                 'upper_bounds': problem.ub,
+                 'var_type': problem.ints}, problem, method.lower(),
+                workdir, **params)
+    data = job.run()['history']
+    wall = time.time() - start
+
+    # Evaluations are logged in the order they complete, the last column
+    # is the best objective value so far
+    reached = np.nonzero(data[:, -1] <= problem.target + args.tol)[0]
+    best = float(np.nanmin(data[:, -1])) if len(data) > 0 else None
+    return {'problem': problem.name,
+            'nvars': problem.nvars,
+            'method': method,
+            'evaluations': len(data),
+            'blackbox_evaluations': problem.count,
+            'evals_to_tol': int(reached[0]) + 1 if len(reached) else None,
+            'best': best,
+            'gap': best - problem.target if best is not None else None,
+            'wall_time': wall,
+            'blackbox_time': problem.seconds,
+            'overhead': wall - problem.seconds,
+            'overhead_per_eval': ((wall - problem.seconds) /
+                                  max(problem.count, 1))}
+
+
+def compare(old, new):
+    '''
+    Prints the changes of evaluations to tolerance, wall time and overhead
+    per evaluation between two sets of results
+
+    @param old: Results of the earlier run
+    @param new: Results of this run
+    '''
+    earlier = dict(((r['problem'], r['method']), r) for r in old['results'])
+    print('%-22s %-7s %-16s %-18s %-20s' % ('problem', 'method',
+                                            'evals_to_tol', 'wall_time (s)',
+                                            'overhead/eval (s)'))
+    for r in new['results']:
+        o = earlier.get((r['problem'], r['method']))
+        if o is None:
+            continue
+        print('%-22s %-7s %7s->%-7s %8.2f->%-8.2f %9.2e->%-9.2e' %
+              (r['problem'], r['method'], o['evals_to_tol'],
+               r['evals_to_tol'], o['wall_time'], r['wall_time'],
+               o['overhead_per_eval'], r['overhead_per_eval']))
+
+
+def main(argv):
+    args = parser.parse_args(argv[1:])
+    suite = problems(args.dims, not args.no_mixed)
+    if args.problems:
+        suite = [p for p in suite if p.name in args.problems or
+                 p.name.rsplit('-', 1)[0] in args.problems]
+    results = []
+    for problem in suite:
+        for method in args.methods:
+            workdir = tempfile.mkdtemp(prefix='hybbench.')
+            try:
+                result = run(problem, method, args, workdir)
+            finally:
+                if not args.keep:
+                    shutil.rmtree(workdir, ignore_errors=True)
+            if args.keep:
+                result['outdir'] = workdir
+            results.append(result)
+            print('%s %s: %s evaluations to tolerance, best = %.6g, '
+                  'wall time = %.2f s, overhead = %.2f s' %
+                  (problem.name, method, result['evals_to_tol'],
+                   result['best'], result['wall_time'], result['overhead']))
+
+    output = {'options': vars(args),
+              'python': sys.version.split()[0],
+              'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+              'results': results}
+    write_json(args.output, output)
+    if args.compare:
+        compare(json.load(open(args.compare)), output)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
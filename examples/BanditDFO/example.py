@@ -7,6 +7,9 @@ parser = argparse.ArgumentParser()
 parser.add_argument('params',
                     help='Location of the parameter file.'
                     'Requires a .json file.')
+parser.add_argument('--resume', action='store_true',
+                    help='Resume the run from the last checkpoint '
+                    'in the output directory.')
 
 
 def main(args, ht, dfo):
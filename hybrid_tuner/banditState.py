@@ -0,0 +1,144 @@
+import math
+import random
+import numpy as np
+
+
+class ringBuffer():
+    '''
+    Fixed capacity FIFO of floats backed by a NumPy array.
+    Only the last capacity values are kept, count is the number of
+    values ever appended.
+    '''
+    def __init__(self, capacity):
+        self.capacity = max(int(capacity), 1)
+        self.data = np.zeros(self.capacity)
+        self.head = 0
+        self.size = 0
+        self.count = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=float)
+        self.count += len(values)
+        values = values[-self.capacity:]
+        n = len(values)
+        self.data[(self.head + np.arange(n)) % self.capacity] = values
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def last(self, k):
+        '''
+        @param k: Number of values requested
+        @return: Array with the last k values, oldest first
+        '''
+        k = min(k, self.size)
+        return self.data[(self.head - k + np.arange(k)) % self.capacity]
+
+
+class banditState():
+    '''
+    In-memory state of Bandit DFO, updated after every solver pull.
+    For each arm it keeps the number of evaluations spent (Ht) and a ring
+    buffer with the objective values of its last window evaluations, from
+    which the windowed area under the improvement curve (AUC) and the
+    upper confidence bound score are computed.
+    Arms can be given prior statistics from an earlier run, see prior.
+    '''
+    def __init__(self, solvers, window, cParam):
+        self.solvers = list(solvers)
+        self.window = window
+        self.cParam = cParam
+        n = len(self.solvers)
+        self.Ht = np.zeros(n, dtype=np.int64)
+        self.history = [ringBuffer(window) for i in range(n)]
+        self.AUC = np.full(n, 2.0)
+        self.score = np.full(n, 2.0)
+        self.active = np.ones(n, dtype=bool)
+        self.prior_Ht = np.zeros(n, dtype=np.int64)
+        self.prior_AUC = np.zeros(n)
+
+    def prior(self, solver, values):
+        '''
+        Gives an arm the AUC of its evaluations in an earlier run. Until
+        its first pull the arm is scored as if it had spent them, instead
+        of being explored first.
+
+        @param solver: Number of the DFO solver
+        @param values: Objective values of the solver in the earlier run
+        '''
+        values = np.asarray(values, dtype=float)
+        H = len(values)
+        if H == 0:
+            return
+        k = self.solvers.index(solver)
+        Vti = np.nonzero(values < values[0])[0]
+        self.prior_Ht[k] = H
+        self.prior_AUC[k] = 2/(H*(H+1))*Vti.sum()
+        total = max(self.prior_Ht.sum(), 2)
+        for k in np.nonzero(self.prior_Ht)[0]:
+            self.score[k] = self.cParam*math.sqrt(2*math.log(
+                total)/self.prior_Ht[k]+self.prior_AUC[k])
+
+    def update(self, solver, evals, values, elapsed):
+        '''
+        Records one pull of an arm and rescores all arms
+
+        @param solver: Number of the DFO solver that was pulled
+        @param evals: Number of evaluations spent by the pull
+        @param values: Objective values logged by the pull
+        @param elapsed: Total number of evaluations of the run
+        '''
+        k = self.solvers.index(solver)
+        self.Ht[k] += evals
+        self.history[k].extend(values)
+
+        H = max(elapsed, 1)
+        buff = 0
+        if (elapsed-self.window > 0):
+            buff = elapsed - self.window
+            H = self.window
+        # elapsed is 0 when the initialization evaluated nothing, which
+        # leaves arms with priors to be scored before any evaluation
+        steps = max(elapsed-buff, 1)
+        for k in range(len(self.solvers)):
+            # Vti holds the positions within the window of the evaluations
+            # that improve on the first evaluation of the window
+            inwin = self.history[k].count - buff
+            if inwin > 0:
+                data = self.history[k].last(inwin)
+                Vti = np.nonzero(data < data[0])[0]
+                self.AUC[k] = 2/(H*(H+1))*Vti.sum()
+            else:
+                self.AUC[k] = 0
+
+            if (self.Ht[k] != 0):
+                self.score[k] = self.cParam*math.sqrt(2*math.log(
+                    steps)/self.Ht[k]+self.AUC[k])
+            elif (self.prior_Ht[k] != 0):
+                self.score[k] = self.cParam*math.sqrt(2*math.log(
+                    steps)/self.prior_Ht[k]+self.prior_AUC[k])
+            else:
+                self.score[k] = 100
+
+    def disable(self, solver):
+        '''
+        Removes an arm whose pull failed to evaluate any point
+
+        @param solver: Number of the DFO solver
+        '''
+        self.active[self.solvers.index(solver)] = False
+
+    def select(self, running=()):
+        '''
+        @param running: DFO solvers currently running, only selected
+        when every other active arm is running too
+        @return: Number of the active DFO solver with the best score,
+        ties are broken at random, None if no arm is active
+        '''
+        if not self.active.any():
+            return None
+        idle = self.active & ~np.isin(self.solvers, list(running))
+        if not idle.any():
+            idle = self.active
+        score = np.where(idle, self.score, -np.inf)
+        keys = np.nonzero(score == score.max())[0]
+        return self.solvers[random.choice(keys)]
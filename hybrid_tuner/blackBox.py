@@ -0,0 +1,757 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import collections
+import contextlib
+import functools
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from hybrid_tuner.evalCache import evalCache
+from hybrid_tuner.traceLog import traceLog
+from hybrid_tuner.budgetScheduler import budgetScheduler, evaluationExpired
+
+scratch = None
+objective = None
+
+
+def load_objective(target, path=None):
+    '''
+    Resolves a Python objective given as a callable or as an
+    import string such as "mypkg.model:evaluate"
+
+    @param target: Callable or import string
+    @param path: Directory added to sys.path before importing
+    @return: Callable taking a list of floats and returning a float
+    '''
+    if callable(target):
+        return target
+    if path and path not in sys.path:
+        sys.path.insert(0, path)
+    module, name = target.split(':')
+    obj = importlib.import_module(module)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def init_worker(tdir, target):
+    '''
+    Initializes a worker of the evaluation pool with its own scratch
+    directory, so concurrent evaluations never share myin and myout.
+    A Python objective is loaded once, keeping the worker warm.
+
+    @param tdir: Output directory of the tuning run
+    @param target: Python objective or None for the file protocol
+    '''
+    global scratch, objective
+    scratch = tdir + '/worker.' + str(os.getpid())
+    if not os.path.exists(scratch):
+        os.mkdir(scratch)
+    if target is not None:
+        objective = load_objective(target)
+
+
+def call(target, x, fidelity=None):
+    '''
+    @param target: Python objective
+    @param x: Point provided as an array with length num_params
+    @param fidelity: Fidelity passed as the fidelity keyword argument,
+    not passed if None
+    @return: Objective value
+    '''
+    if fidelity is None:
+        return float(target(x))
+    return float(target(x, fidelity=fidelity))
+
+
+def run_callable(x, fidelity=None):
+    '''
+    Evaluates one point with the Python objective of the worker
+
+    @param x: Point provided as an array with length num_params
+    @param fidelity: Fidelity of the evaluation, None if not used
+    @return: Objective value
+    '''
+    return call(objective, x, fidelity)
+
+
+def write_input(path, x, fidelity=None):
+    '''
+    @param path: Location of the input file
+    @param x: Point provided as an array with length num_params
+    @param fidelity: Fidelity of the evaluation, written to the input
+    file after the point, not written if None
+    '''
+    fn = open(path, 'w')
+    for i in x:
+        fn.write(str(i) + '\n')
+    if fidelity is not None:
+        fn.write(str(fidelity) + '\n')
+    fn.close()
+
+
+def read_curve(path):
+    '''
+    @param path: Location of the output file
+    @return: List of the values of the complete lines of the file
+    '''
+    if not os.path.exists(path):
+        return []
+    fn = open(path, 'r')
+    lines = fn.read().split('\n')[:-1]
+    fn.close()
+    return [float(line) for line in lines if line.strip()]
+
+
+def read_value(path):
+    '''
+    @param path: Location of the output file
+    @return: Objective value, the last value of the output file
+    '''
+    if os.path.exists(path):
+        fn = open(path, 'r')
+        fields = fn.read().split()
+        fn.close()
+        if fields:
+            return float(fields[-1])
+    from hybrid_tuner.evalBroker import evaluationFailed
+    raise evaluationFailed('The black-box wrote no objective value to ' +
+                           path)
+
+
+def remaining(deadline):
+    '''
+    @param deadline: Wall clock time by which the evaluation is killed,
+    None if unlimited
+    @return: Seconds left before deadline, None if unlimited
+    '''
+    if deadline is None:
+        return None
+    timeout = deadline - time.time()
+    if timeout <= 0:
+        raise evaluationExpired()
+    return timeout
+
+
+def run_point(executable, workdir, input, output, x, fidelity=None,
+              deadline=None):
+    '''
+    Evaluates one point with the myin/myout file protocol.
+    With a deadline the executable runs in its own process group, which
+    is killed when the deadline passes, see budgetScheduler.kill.
+
+    @param executable: Location of the black-box executable
+    @param workdir: Directory holding the input and output files,
+    the scratch directory of the worker if None
+    @param input: Name of the input file
+    @param output: Name of the output file
+    @param x: Point provided as an array with length num_params
+    @param fidelity: Fidelity of the evaluation, None if not used
+    @param deadline: Wall clock time by which the executable is killed
+    and evaluationExpired is raised, None if unlimited
+    @return: Objective value, the last line of the output file
+    '''
+    if workdir is None:
+        workdir = scratch
+    timeout = remaining(deadline)
+    write_input(workdir + '/' + input, x, fidelity)
+    if timeout is None:
+        subprocess.run([executable], shell=True, cwd=workdir)
+    else:
+        proc = subprocess.Popen([executable], shell=True, cwd=workdir,
+                                start_new_session=True)
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            budgetScheduler.kill(proc)
+            raise evaluationExpired()
+    return read_value(workdir + '/' + output)
+
+
+def run_streamed(executable, workdir, input, output, x, fidelity, pruner,
+                 deadline=None):
+    '''
+    Evaluates one point with the myin/myout file protocol while the
+    black-box appends intermediate objective values to the output file,
+    killing it as soon as pruner decides the evaluation is hopeless,
+    or when the deadline passes
+
+    @param executable: Location of the black-box executable
+    @param workdir: Directory holding the input and output files,
+    the scratch directory of the worker if None
+    @param input: Name of the input file
+    @param output: Name of the output file
+    @param x: Point provided as an array with length num_params
+    @param fidelity: Fidelity of the evaluation, None if not used
+    @param pruner: curvePruner holding the completed curves
+    @param deadline: Wall clock time by which the executable is killed
+    and evaluationExpired is raised, None if unlimited
+    @return: Objective value, the last value of the output file,
+    the values of the output file and True if the evaluation was pruned
+    '''
+    if workdir is None:
+        workdir = scratch
+    remaining(deadline)
+    write_input(workdir + '/' + input, x, fidelity)
+    path = workdir + '/' + output
+    if os.path.exists(path):
+        os.remove(path)
+    proc = subprocess.Popen([executable], shell=True, cwd=workdir,
+                            start_new_session=True)
+    pruned = False
+    while True:
+        poll = pruner.poll
+        if deadline is not None:
+            poll = min(poll, max(deadline - time.time(), 0))
+        try:
+            proc.wait(timeout=poll)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        if deadline is not None and time.time() >= deadline:
+            budgetScheduler.kill(proc)
+            raise evaluationExpired()
+        if pruner.prune(read_curve(path)):
+            budgetScheduler.kill(proc)
+            pruned = True
+            break
+    curve = read_curve(path)
+    if pruned:
+        return curve[-1], curve, pruned
+    # The last line may not end with a newline, and an executable that
+    # does not stream only writes its objective value
+    f_out = read_value(path)
+    if not curve or curve[-1] != f_out:
+        curve.append(f_out)
+    return f_out, curve, pruned
+
+
+class blackBox():
+    '''
+    Runs the black-box executable through the myin/myout file protocol,
+    or calls a Python objective in-process when one is provided either
+    as a callable or as an import string "module:function".
+    Every point is checked against the evaluation cache first, so that
+    points already evaluated by any solver are never re-run.
+    Cache hits are reported in cacheHits.res as lines starting with
+    #cached, which evalLog.export appends to allEvals.res.
+
+    Batches of points are evaluated concurrently by a pool of
+    max_workers processes, each running in its own scratch directory
+    outdir/worker.<pid>. Results are merged by the calling process only.
+    A Python objective with a map method is given whole batches instead.
+
+    When the surrogate key of the configuration is set, points are first
+    screened by a rbfSurrogate fitted on the real evaluations, which
+    are read from the evaluation cache. A screened point gets the
+    prediction of the model instead of an evaluation and is reported in
+    surrogate.res as a line starting with #surrogate, and the row of the
+    point in evals.bin is flagged as surrogate, see screened_flags.
+
+    When the broker key of the configuration holds the address of an
+    evalBroker, points are evaluated by the workers of the broker instead,
+    which may run on other hosts, see evalBroker.
+
+    When the fidelity key of the configuration is set, every evaluation
+    gets a fidelity, full fidelity unless a lower one is requested, which
+    is written to the input file on the line after the point, or passed
+    to a Python objective as the fidelity keyword argument. Evaluations
+    below full fidelity are neither cached nor added to the surrogate,
+    see successiveHalving.
+
+    When the prune key of the configuration is set, the executable may
+    append intermediate objective values to the output file, one per
+    line, and a full fidelity evaluation is killed once a curvePruner
+    decides it cannot beat the incumbent. The last value it wrote is
+    then its objective value, and it is reported in pruned.res as a
+    line starting with #pruned. This value is partial, so it is neither
+    cached nor added to the surrogate, and the row of the evaluation in
+    evals.bin is flagged as pruned, see pruned_flags.
+
+    Executables started while a deadline is set, see deadline, are
+    killed with their process group when it passes and the evaluation
+    raises evaluationExpired. Python objectives run in-process and
+    cannot be killed, they complete.
+
+    When the trace key of the configuration holds the location of
+    trace.json, evaluations and screenings are timed in it, see traceLog.
+
+    The same configuration is written to blackbox.json in outdir, so the
+    HOPSPACK script and the MATLAB func_f.m can call this module with
+    python -m hybrid_tuner.blackBox blackbox.json [batch]
+    The wrapper can only load Python objectives given by import string.
+    It runs once per evaluation, so numpy, the surrogate, the pruner, the
+    broker client and the evaluation pool are only imported when used.
+    '''
+    def __init__(self, config, objective=None):
+        self.config = config
+        self.tdir = config['tdir']
+        self.executable = config['executable']
+        if objective is None and config['objective']:
+            objective = load_objective(config['objective'],
+                                       config['dirpath'])
+        self.objective = objective
+        self.input = config['input']
+        self.output = config['output']
+        self.ints = config['ints']
+        self.fidelity = config.get('fidelity')
+        self.max_workers = config['max_workers']
+        self.pool = None
+        self.local = threading.local()
+        # Points reported in pruned.res and surrogate.res not logged yet
+        self.lock = threading.Lock()
+        self.reported = {'pruned': collections.Counter(),
+                         'surrogate': collections.Counter()}
+        self.offsets = {}
+        for name in self.reported:
+            path = self.tdir + '/' + name + '.res'
+            self.offsets[name] = (os.path.getsize(path)
+                                  if os.path.exists(path) else 0)
+        if config['cache_size'] > 0:
+            self.cache = evalCache(config['cache'], self.ints,
+                                   config['cache_size'])
+        else:
+            self.cache = None
+        self.surrogate = None
+        if config.get('surrogate'):
+            from hybrid_tuner.surrogate import rbfSurrogate
+            self.surrogate = rbfSurrogate(config['lb'], config['ub'],
+                                          config['surrogate']['quantile'],
+                                          config['surrogate']['tol'])
+            if self.cache:
+                self.surrogate.add(*self.cache.points())
+        self.trace = traceLog(config.get('trace'), 'blackBox')
+        self.pruner = None
+        if config.get('prune') and self.executable is not None:
+            from hybrid_tuner.pruner import curvePruner
+            self.pruner = curvePruner(config['prune']['rule'],
+                                      config['prune']['warmup'],
+                                      config['prune']['min_curves'],
+                                      self.tdir + '/curves.res')
+            if self.cache:
+                F = self.cache.points()[1]
+                if len(F) > 0:
+                    self.pruner.observe(min(F))
+
+    def write_config(self, path):
+        '''
+        Writes the configuration read by the command line wrapper
+
+        @param path: Location of the configuration file
+        '''
+        with open(path, 'w') as f:
+            json.dump(self.config, f)
+
+    def round(self, x):
+        '''
+        Rounds the integer variables of a point
+
+        @param x: Point provided as an array with length num_params
+        @return: List of floats with var_type = 1 entries rounded
+        '''
+        return [float(round(v)) if t == 1 else float(v)
+                for v, t in zip(x, self.ints)]
+
+    @contextlib.contextmanager
+    def deadline(self, seconds):
+        '''
+        Kills the executables started by the calling thread after seconds,
+        so each solver call, or concurrent bandit arm, keeps to its slice
+
+        @param seconds: Time in seconds granted to the evaluations
+        '''
+        previous = getattr(self.local, 'deadline', None)
+        self.local.deadline = time.time() + seconds
+        try:
+            yield
+        finally:
+            self.local.deadline = previous
+
+    def report_hit(self, x, f_out):
+        fn = open(self.tdir + '/cacheHits.res', 'a')
+        fn.write('#cached   ' + '   '.join('%.5f' % i for i in x) +
+                 '   ' + '%.5f\n' % f_out)
+        fn.close()
+
+    def report_screened(self, x, f_out):
+        # Full precision, screened_flags matches the points logged by solvers
+        fn = open(self.tdir + '/surrogate.res', 'a')
+        fn.write('#surrogate   ' + '   '.join('%.15g' % i for i in x) +
+                 '   ' + '%.15g\n' % f_out)
+        fn.close()
+
+    def report_pruned(self, x, f_out):
+        # Full precision, pruned_flags matches the points logged by solvers
+        fn = open(self.tdir + '/pruned.res', 'a')
+        fn.write('#pruned   ' + '   '.join('%.15g' % i for i in x) +
+                 '   ' + '%.15g\n' % f_out)
+        fn.close()
+
+    def report_key(self, x):
+        # The MATLAB solvers log their points with 6 decimals
+        return tuple(round(v, 6) for v in self.round(x))
+
+    def pruned_flags(self, X):
+        '''
+        Flags the points of a solver call whose evaluation was pruned,
+        by this process or by the evaluators started by HOPSPACK and
+        MATLAB, see reported_flags
+
+        @param X: Points logged by a solver, in the order of evaluation
+        @return: Boolean array, True for the pruned evaluations
+        '''
+        return self.reported_flags(X, 'pruned')
+
+    def screened_flags(self, X):
+        '''
+        Flags the points of a solver call which got the prediction of
+        the surrogate instead of an evaluation, see reported_flags
+
+        @param X: Points logged by a solver, in the order of evaluation
+        @return: Boolean array, True for the screened points
+        '''
+        return self.reported_flags(X, 'surrogate')
+
+    def reported_flags(self, X, name):
+        '''
+        Flags the points of a solver call from the lines appended to
+        <name>.res since the last call, by this process or by the
+        evaluators started by HOPSPACK and MATLAB.
+        Each line flags one logged point, so a point evaluated again in
+        full later is not flagged.
+
+        @param X: Points logged by a solver, in the order of evaluation
+        @param name: pruned or surrogate
+        @return: Boolean array, True for the reported points
+        '''
+        import numpy as np
+        flags = np.zeros(len(X), dtype=bool)
+        path = self.tdir + '/' + name + '.res'
+        reported = self.reported[name]
+        with self.lock:
+            if os.path.exists(path):
+                fn = open(path, 'rb')
+                fn.seek(self.offsets[name])
+                text = fn.read()
+                fn.close()
+                # A line being written is read on the next call
+                text = text[:text.rfind(b'\n')+1]
+                self.offsets[name] += len(text)
+                for line in text.decode().splitlines():
+                    fields = line.split()
+                    if fields and fields[0] == '#' + name:
+                        x = [float(v) for v in fields[1:-1]]
+                        reported[self.report_key(x)] += 1
+            if not reported:
+                return flags
+            for i, x in enumerate(X):
+                key = self.report_key(x)
+                if reported[key] > 0:
+                    reported[key] -= 1
+                    flags[i] = True
+            # Drops the points counted down to zero
+            reported += collections.Counter()
+        return flags
+
+    def finish(self, x, result):
+        '''
+        Records the curve of a streamed evaluation
+
+        @param x: Evaluated point
+        @param result: Value, curve and pruned flag from run_streamed
+        @return: Objective value and True if the evaluation was pruned
+        '''
+        f_out, curve, pruned = result
+        if pruned:
+            self.report_pruned(x, f_out)
+        else:
+            self.pruner.add(curve)
+        return f_out, pruned
+
+    def screen(self, x):
+        '''
+        @param x: Rounded point
+        @return: Surrogate value if x is screened out, None otherwise
+        '''
+        if self.surrogate is None:
+            return None
+        with self.trace.span('screen', 'surrogate'):
+            f_out = self.surrogate.screen(x)
+        if f_out is not None:
+            self.report_screened(x, f_out)
+        return f_out
+
+    def evaluate(self, x, workdir=None, fidelity=None):
+        '''
+        Evaluates the black-box at x, integer variables are rounded
+        before the point is passed to the black-box
+
+        @param x: Point provided as an array with length num_params
+        @param workdir: Directory holding the input and output files,
+        outdir if None
+        @param fidelity: Fidelity of the evaluation, full if None
+        @return: Objective value
+        '''
+        x = self.round(x)
+        full = fidelity is None or fidelity == self.fidelity
+        fidelity = self.fidelity if full else fidelity
+        if self.cache and full:
+            f_out = self.cache.get(x)
+            if f_out is not None:
+                self.report_hit(x, f_out)
+                return f_out
+        if full:
+            f_out = self.screen(x)
+            if f_out is not None:
+                return f_out
+
+        pruned = False
+        with self.trace.span('evaluate', 'blackbox', fidelity=fidelity):
+            if self.config.get('broker'):
+                f_out = self.remote().map([x], fidelity)[0]
+            elif self.objective is not None:
+                f_out = call(self.objective, x, fidelity)
+            elif self.pruner and full:
+                f_out, pruned = self.finish(x, run_streamed(
+                    self.executable, workdir or self.tdir, self.input,
+                    self.output, x, fidelity, self.pruner,
+                    getattr(self.local, 'deadline', None)))
+            else:
+                f_out = run_point(self.executable, workdir or self.tdir,
+                                  self.input, self.output, x, fidelity,
+                                  getattr(self.local, 'deadline', None))
+        if self.cache and full and not pruned:
+            self.cache.put(x, f_out)
+        if self.surrogate and full and not pruned:
+            self.surrogate.add([x], [f_out])
+        return f_out
+
+    def evaluate_batch(self, X, fidelity=None):
+        '''
+        Evaluates a batch of points on the evaluation pool.
+        Cached points and duplicates within the batch are not re-run.
+        When the deadline of the thread passes, the evaluations completed
+        before it are cached and evaluationExpired is raised with their
+        values, None for the points killed or not started.
+
+        @param X: List of points, each an array with length num_params
+        @param fidelity: Fidelity of the evaluations, full if None
+        @return: List of objective values in the order of X
+        '''
+        X = [self.round(x) for x in X]
+        F = [None]*len(X)
+        full = fidelity is None or fidelity == self.fidelity
+        fidelity = self.fidelity if full else fidelity
+        pending = {}
+        for i, x in enumerate(X):
+            if not full:
+                pending.setdefault(tuple(x), []).append(i)
+                continue
+            if self.cache:
+                f_out = self.cache.get(x)
+                if f_out is not None:
+                    self.report_hit(x, f_out)
+                    F[i] = f_out
+                    continue
+            f_out = self.screen(x)
+            if f_out is not None:
+                F[i] = f_out
+                continue
+            pending.setdefault(tuple(x), []).append(i)
+
+        points = [list(x) for x in pending.keys()]
+        with self.trace.span('evaluate_batch', 'blackbox', n=len(points),
+                             fidelity=fidelity):
+            if self.pruner and full and not self.config.get('broker'):
+                values, pruned = self.run_pruned(points, fidelity)
+            else:
+                values = self.run_batch(points, fidelity)
+                pruned = [False]*len(points)
+
+        if self.surrogate and points and full:
+            real = [not p and f is not None for f, p in zip(values, pruned)]
+            self.surrogate.add([x for x, r in zip(points, real) if r],
+                               [f for f, r in zip(values, real) if r])
+        for x, f_out, p in zip(points, values, pruned):
+            if f_out is None:
+                continue
+            if self.cache and full and not p:
+                self.cache.put(x, f_out)
+            for n, i in enumerate(pending[tuple(x)]):
+                F[i] = f_out
+                if n > 0 and p:
+                    self.report_pruned(x, f_out)
+                elif n > 0:
+                    self.report_hit(x, f_out)
+        if None in F:
+            raise evaluationExpired(F)
+        return F
+
+    def gather(self, fn, calls, pool=False):
+        '''
+        Runs fn on each tuple of arguments of calls until the deadline of
+        the thread passes, the calls made after it raise at once
+
+        @param fn: run_point or run_streamed
+        @param calls: List of tuples of arguments of fn
+        @param pool: Runs the calls on the evaluation pool if True
+        @return: List of the results in the order of calls, None for the
+        calls killed at the deadline
+        '''
+        if pool:
+            jobs = [self.pool.submit(fn, *args).result for args in calls]
+        else:
+            jobs = [functools.partial(fn, *args) for args in calls]
+        results = []
+        for job in jobs:
+            try:
+                results.append(job())
+            except evaluationExpired:
+                results.append(None)
+        return results
+
+    def run_batch(self, points, fidelity=None):
+        '''
+        @param points: List of points not cached nor screened
+        @param fidelity: Fidelity of the evaluations, None if not used
+        @return: List of objective values in the order of points, None
+        for the evaluations killed at the deadline of the thread
+        '''
+        deadline = getattr(self.local, 'deadline', None)
+        if self.config.get('broker'):
+            return self.remote().map(points, fidelity) if points else []
+        elif hasattr(self.objective, 'map'):
+            # The objective evaluates whole batches, see askQueue
+            return self.objective.map(points, fidelity) if points else []
+        elif self.max_workers > 1 and len(points) > 1:
+            if self.pool is None:
+                self.start_pool()
+            n = len(points)
+            if self.objective is not None:
+                return list(self.pool.map(run_callable, points,
+                                          [fidelity]*n))
+            return self.gather(run_point,
+                               [(self.executable, None, self.input,
+                                 self.output, x, fidelity, deadline)
+                                for x in points], True)
+        elif self.objective is not None:
+            return [call(self.objective, x, fidelity) for x in points]
+        return self.gather(run_point, [(self.executable, self.tdir,
+                                        self.input, self.output, x,
+                                        fidelity, deadline)
+                                       for x in points])
+
+    def run_pruned(self, points, fidelity=None):
+        '''
+        @param points: List of points not cached nor screened
+        @param fidelity: Fidelity of the evaluations, None if not used
+        @return: List of objective values in the order of points, None
+        for the evaluations killed at the deadline of the thread, and
+        list of their pruned flags
+        '''
+        n = len(points)
+        deadline = getattr(self.local, 'deadline', None)
+        if self.max_workers > 1 and n > 1:
+            if self.pool is None:
+                self.start_pool()
+            # Each worker gets a copy of the completed curves
+            results = self.gather(run_streamed,
+                                  [(self.executable, None, self.input,
+                                    self.output, x, fidelity, self.pruner,
+                                    deadline) for x in points], True)
+        else:
+            results = self.gather(run_streamed,
+                                  [(self.executable, self.tdir, self.input,
+                                    self.output, x, fidelity, self.pruner,
+                                    deadline) for x in points])
+        done = [(None, False) if r is None else self.finish(x, r)
+                for x, r in zip(points, results)]
+        return [d[0] for d in done], [d[1] for d in done]
+
+    def start_pool(self):
+        '''
+        Starts the pool of max_workers evaluation processes
+        '''
+        from concurrent.futures import ProcessPoolExecutor
+        self.pool = ProcessPoolExecutor(self.max_workers,
+                                        initializer=init_worker,
+                                        initargs=(self.tdir, self.objective))
+
+    def remote(self):
+        '''
+        @return: Client of the broker, each thread connects on first use
+        '''
+        if not hasattr(self.local, 'client'):
+            from hybrid_tuner.evalBroker import brokerClient
+            self.local.client = brokerClient(self.config['broker'],
+                                             self.config['authkey'],
+                                             self.config['lease'])
+        return self.local.client
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.cache:
+            self.cache.close()
+        self.trace.close()
+
+
+def main(argv):
+    '''
+    Command line wrapper around blackBox. Reads the point from
+    the input file, rewrites it with integer variables rounded and
+    leaves the objective value in the output file.
+    With the batch option the points are read one per line from
+    mybatch.in and the objective values are written to mybatch.out.
+    The files are in the working directory of the calling solver.
+
+    @param argv: argv[1] is the location of blackbox.json,
+    argv[2] is the optional batch flag
+    '''
+    config = json.load(open(argv[1]))
+    if config['executable'] is None and config['objective'] is None:
+        sys.exit('The Python objective is not importable, '
+                 'provide it as an import string "module:function".')
+    bb = blackBox(config)
+    workdir = os.getcwd()
+    if len(argv) > 2 and argv[2] == 'batch':
+        X = []
+        fn = open(workdir + '/mybatch.in', 'r')
+        for line in fn:
+            if line.strip():
+                X.append([float(v) for v in line.split()])
+        fn.close()
+        F = bb.evaluate_batch(X)
+        bb.close()
+        fn = open(workdir + '/mybatch.out', 'w')
+        for f_out in F:
+            fn.write('%.15g\n' % f_out)
+        fn.close()
+        return
+
+    x = []
+    fn = open(workdir + '/' + bb.input, 'r')
+    for line in fn:
+        if line.strip():
+            x.append(float(line))
+    fn.close()
+    x = bb.round(x)
+    fn = open(workdir + '/' + bb.input, 'w')
+    for i in x:
+        fn.write(str(i) + '\n')
+    fn.close()
+    f_out = bb.evaluate(x, workdir)
+    fn = open(workdir + '/' + bb.output, 'w')
+    fn.write('%.15g\n' % f_out)
+    fn.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
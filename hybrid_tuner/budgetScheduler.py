@@ -0,0 +1,88 @@
+import os
+import signal
+import subprocess
+import time
+
+
+class evaluationExpired(Exception):
+    '''
+    Raised when a black-box evaluation is killed at the end of the time
+    slice of the solver call that requested it. For a batch, values
+    holds the values of the batch, None for the points not evaluated.
+    '''
+    def __init__(self, values=None):
+        Exception.__init__(self)
+        self.values = values
+
+
+class budgetScheduler():
+    '''
+    Enforces cpu_limit and max_iterations over a whole tuning run.
+    Each solver call is given a slice of the remaining wall time and
+    evaluations, and external solvers are run in their own process group
+    so that the solver and every black-box call it started are killed
+    together when the slice expires.
+    '''
+    def __init__(self, hybClass):
+        self.tune = hybClass
+        # Evaluations granted to solver calls that are still running
+        self.reserved = 0
+
+    def remaining_time(self):
+        return self.tune.max_cpu - (time.time() - self.tune.s_time)
+
+    def remaining_evals(self):
+        return self.tune.limit_evals - self.tune.elapsed - self.reserved
+
+    def expired(self):
+        return self.remaining_time() <= 0 or self.remaining_evals() <= 0
+
+    def allot(self, evals, seconds):
+        '''
+        Computes the budget of the next solver call
+
+        @param evals: Evaluations requested by the call
+        @param seconds: Time in seconds requested by the call
+        @return: Evaluations and time granted to the call
+        '''
+        return (max(min(evals, self.remaining_evals()), 0),
+                max(min(seconds, self.remaining_time()), 0))
+
+    def run(self, cmd, timeout, stdout, cwd=None):
+        '''
+        Runs an external solver, killing its process group on timeout
+
+        @param cmd: Command to execute
+        @param timeout: Time in seconds granted to the solver
+        @param stdout: File receiving the output of the solver
+        @param cwd: Directory the solver runs in
+        @return: True if the solver completed within timeout
+        '''
+        proc = subprocess.Popen(cmd, stdout=stdout, cwd=cwd,
+                                start_new_session=True)
+        try:
+            proc.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            self.kill(proc)
+            return False
+
+    @staticmethod
+    def kill(proc):
+        '''
+        Terminates a process group, giving it 5 seconds to exit cleanly
+        before the remaining processes of the group are killed
+        '''
+        try:
+            os.killpg(proc.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
@@ -0,0 +1,138 @@
+import numpy as np
+
+# Degree s, coefficients a and initial direction numbers m of the
+# primitive polynomials of dimensions 2 to 21 (Joe and Kuo, 2008)
+sobol_table = [(1, 0, [1]),
+               (2, 1, [1, 3]),
+               (3, 1, [1, 3, 1]),
+               (3, 2, [1, 1, 1]),
+               (4, 1, [1, 1, 3, 3]),
+               (4, 4, [1, 3, 5, 13]),
+               (5, 2, [1, 1, 5, 5, 17]),
+               (5, 4, [1, 1, 5, 5, 5]),
+               (5, 7, [1, 1, 7, 11, 19]),
+               (5, 11, [1, 1, 5, 1, 1]),
+               (5, 13, [1, 1, 1, 3, 11]),
+               (5, 14, [1, 3, 5, 5, 31]),
+               (6, 1, [1, 3, 3, 9, 7, 49]),
+               (6, 13, [1, 1, 1, 15, 21, 21]),
+               (6, 16, [1, 3, 1, 13, 27, 49]),
+               (6, 19, [1, 1, 1, 15, 7, 5]),
+               (6, 22, [1, 3, 1, 15, 13, 25]),
+               (6, 25, [1, 1, 5, 5, 19, 61]),
+               (7, 1, [1, 3, 7, 11, 23, 15, 103]),
+               (7, 4, [1, 3, 7, 13, 13, 15, 69])]
+
+
+def primitive(s, a):
+    '''
+    @param s: Degree of the polynomial
+    @param a: Bits of the inner coefficients of the polynomial
+    @return: True if the polynomial is primitive over GF(2)
+    '''
+    poly = (1 << s) | (a << 1) | 1
+    order = (1 << s) - 1
+    x, k = 1, 0
+    while True:
+        # Powers of x modulo the polynomial, which is primitive if
+        # the first power equal to 1 is x^(2^s - 1)
+        x <<= 1
+        if x >> s:
+            x ^= poly
+        k += 1
+        if x == 1 or k >= order:
+            return x == 1 and k == order
+
+
+def polynomials(count):
+    '''
+    Extends sobol_table to count dimensions with the next primitive
+    polynomials and seeded random odd direction numbers
+
+    @param count: Number of dimensions after the first
+    @return: List of (s, a, m) for dimensions 2 to count + 1
+    '''
+    table = list(sobol_table[:count])
+    if len(table) == count:
+        return table
+    rng = np.random.RandomState(21201)
+    s, a = table[-1][0], table[-1][1]
+    while len(table) < count:
+        a += 1
+        if a >= 1 << (s-1):
+            s, a = s+1, 0
+        if primitive(s, a):
+            m = [int(rng.randint(0, 1 << (k-1)))*2 + 1
+                 for k in range(1, s+1)]
+            table.append((s, a, m))
+    return table
+
+
+def sobol(n, nvars):
+    '''
+    Sobol' sequence with Gray code ordering, the first point at the
+    origin is skipped
+
+    @param n: Number of points
+    @param nvars: Number of variables
+    @return: Points in [0, 1), array of shape (n, nvars)
+    '''
+    bits = max(int(np.ceil(np.log2(n + 1))), 1)
+    V = np.zeros((nvars, bits), dtype=np.int64)
+    V[0] = 1 << (bits - 1 - np.arange(bits))
+    for d, (s, a, m) in enumerate(polynomials(nvars - 1), 1):
+        for k in range(bits):
+            if k < s:
+                V[d, k] = m[k] << (bits - 1 - k)
+            else:
+                v = V[d, k-s] ^ (V[d, k-s] >> s)
+                for i in range(1, s):
+                    if (a >> (s - 1 - i)) & 1:
+                        v ^= V[d, k-i]
+                V[d, k] = v
+    X = np.zeros((n, nvars))
+    x = np.zeros(nvars, dtype=np.int64)
+    for i in range(1, n + 1):
+        # Bit that changes in the Gray code of i
+        c = (i & -i).bit_length() - 1
+        x ^= V[:, c]
+        X[i-1] = x
+    return X/float(1 << bits)
+
+
+def lhs(n, nvars):
+    '''
+    Latin hypercube sample, each variable has one point in each of
+    n equal intervals
+
+    @param n: Number of points
+    @param nvars: Number of variables
+    @return: Points in [0, 1), array of shape (n, nvars)
+    '''
+    U = np.random.uniform(size=(n, nvars))
+    strata = np.argsort(np.random.uniform(size=(n, nvars)), axis=0)
+    return (strata + U)/n
+
+
+def design(kind, n, lb, ub, ints):
+    '''
+    Space-filling design in the box [lb, ub]. Integer variables are
+    mapped to the integers of [lb, ub] with equal probability.
+
+    @param kind: 'lhs' or 'sobol'
+    @param n: Number of points
+    @param lb: Variable lower bounds
+    @param ub: Variable upper bounds
+    @param ints: Variable types, 0 is cont. and 1 is integer
+    @return: Points, array of shape (n, num_params)
+    '''
+    lb = np.asarray(lb, dtype=float)
+    ub = np.asarray(ub, dtype=float)
+    ints = np.asarray(ints) == 1
+    if kind == 'sobol':
+        U = sobol(n, len(lb))
+    else:
+        U = lhs(n, len(lb))
+    X = lb + U*(ub - lb)
+    X[:, ints] = np.minimum(np.floor(lb + U*(ub - lb + 1)), ub)[:, ints]
+    return X
@@ -1,4 +1,5 @@
-import os
+import io
+from hybrid_tuner.pySolvers import pySolvers
 
 
 class dfoClass():
@@ -11,7 +12,7 @@ class dfoClass():
 
         @type self: Stores hybClass as self.tune
         @param idx: Number of solver scripts to setup
-        idx accepts 7, 8, 10, or 15 currently
+        idx accepts 7, 8, 10, 15 or 20 to 24 currently
         @return: Returns the scripts required to run a particular solver
         '''
         if idx == 7:
@@ -22,6 +23,8 @@ class dfoClass():
             chk = self.call_dfo_10()
         elif idx == 15:
             chk = self.call_dfo_15()
+        elif idx in pySolvers.solvers:
+            chk = True  # Native solvers do not need scripts
 
         return chk
 
@@ -33,24 +36,20 @@ class dfoClass():
         @type self: Stores hybClass as self.tune
         @return: Returns the scripts for MCS
         '''
-        f = open(self.tune.tdir + '/matlab_main2.m', 'w')
+        f = io.StringIO()
         f.write("path('" + self.tune.dfo_path + "/mcs', path);\n")
         f.write('n = ' + str(self.tune.nvars) + ';\n')
         f.write("bl = bl';\n")
         f.write("bu = bu';\n")
-        f.write('budget = ' + str(self.tune.time_iter) + ';\n')
         f.write("fcn = 'func_f';\n")
         f.write("data = 'func_f';\n")
         f.write('prt = 1;\n')
         f.write('smax = 5*n+10;\n')
         f.write('[x_best, f_best, xmin, fmi, ncall, ncloc] = mcs('
                 'fcn, data, bl, bu, prt, smax, budget);\n')
-        f.close()
+        self.tune.write_artifact('matlab_solver_7.m', f.getvalue())
 
-        try:
-            os.remove(self.tune.tdir + '/func_f.m')
-        except Exception:
-            pass
+        return True
 
     def call_dfo_8(self):
         '''
@@ -60,68 +59,32 @@ class dfoClass():
         @type self: Stores hybClass as self.tune
         @return: Returns the scripts for SID-PSM
         '''
-        f = open(self.tune.tdir + '/matlab_main2.m', 'w')
+        f = io.StringIO()
         f.write("path(path, '" + self.tune.dfo_path + "/sid_psm_1.3');\n")
         f.write('n = ' + str(self.tune.nvars) + ';\n')
         f.write("bl = bl';\n")
         f.write("bu = bu';\n")
         f.write("x_0 = x_0';\n")
-        f.write('budget = ' + str(self.tune.time_iter) + ';\n')
         f.write('sid_psm(x_0, 2, 0);\n')
-        f.close()
-        try:
-            os.remove(self.tune.tdir + '/func_f.m')
-        except Exception:
-            pass
-
-        ffunc = open(self.tune.tdir + '/func_f.m', 'w')
-        ffunc.write('function f = func_f(x,Prob);\n')
-        ffunc.close()
+        self.tune.write_artifact('matlab_solver_8.m', f.getvalue())
 
-        fconst = open(self.tune.tdir + '/func_const.m', 'w')
+        # c_const = [bl(1) - x(1); x(1) - bu(1); bl(2) - x(2); ...]
+        fconst = io.StringIO()
         fconst.write('function [c_const] = func_const(x);\n')
         fconst.write('global bl\n')
         fconst.write('global bu\n')
-        fconst.write('c_const = [ ];\n')
-
-        constraint_id = 0
-        for i, j in zip(range(0, self.tune.nvars), range(0, 2 *
-                                                         self.tune.nvars, 2)):
-            fconst.write('c_const(' + str(j+1) + ') = bl(' + str(i+1) + ') - '
-                         'x(' + str(i+1) + ');\n')
-            fconst.write('c_const(' + str(j+2) + ') = x(' + str(i+1) + ') - '
-                         'bu(' + str(i+1) + ');\n')
+        fconst.write("c_const = reshape([bl(:)' - x(:)'; x(:)' - bu(:)'], "
+                     "[], 1);\n")
+        self.tune.write_artifact('func_const.m', fconst.getvalue())
 
-        fconst.write("c_const = c_const';\n")
-        fconst.close()
-
-        fgrad = open(self.tune.tdir + '/grad_const.m', 'w')
+        # Column 2i-1 of grad_c is -e_i and column 2i is e_i
+        fgrad = io.StringIO()
         fgrad.write('function [grad_c] = grad_const(x);\n')
-        fgrad.write('grad_c = [ ];\n')
-
-        constraint_id = 0
-        counter = 0
-        while counter < self.tune.nvars:
-            counter = counter + 1
-            constraint_id = constraint_id + 1
-            scounter = 0
-            while scounter < self.tune.nvars:
-                scounter = scounter + 1
-                fgrad.write("grad_c(" + str(scounter) + "," +
-                            str(constraint_id) + ") = 0;\n")
-            fgrad.write("grad_c(" + str(counter) + "," +
-                        str(constraint_id) + ") = -1;\n")
-            constraint_id = constraint_id+1
-            scounter = 0
-            while scounter < self.tune.nvars:
-                scounter = scounter + 1
-                fgrad.write("grad_c(" + str(scounter) + "," +
-                            str(constraint_id) + ") = 0;\n")
-            fgrad.write("grad_c(" + str(counter) + "," +
-                        str(constraint_id) + ") =  1;\n")
-        fgrad.close()
+        fgrad.write('grad_c = kron(eye(numel(x)), [-1 1]);\n')
+        self.tune.write_artifact('grad_const.m', fgrad.getvalue())
 
-        fp = open(self.tune.tdir + '/parameters.m', 'w')
+        fp = io.StringIO()
+        fp.write("global limit_evals\n")
         fp.write("always = 1;\n")
         fp.write("cache = 0;\n")
         fp.write("economic = 0;\n")
@@ -144,12 +107,12 @@ class dfoClass():
         fp.write("alfa = max(1,norm(x_initial,inf));\n")
         fp.write("phi = 1;\n")
         fp.write("theta = 0.5;\n")
-        fp.write("fevals_max = " + str(self.tune.frequency) + ";\n")
-        fp.write("iter_max = " + str(self.tune.frequency) + ";\n")
+        fp.write("fevals_max = limit_evals;\n")
+        fp.write("iter_max = limit_evals;\n")
         fp.write("tol_alfa = 10^-5;\n")
         fp.write("tol_grad = 10^-5;\n")
         fp.write("epsilon_ini = 10^-4;\n")
-        fp.close()
+        self.tune.write_artifact('parameters.m', fp.getvalue())
 
         return True
 
@@ -158,9 +121,11 @@ class dfoClass():
         Setup the scripts for solver HOPSPACK.
 
         @type self: Stores hybClass as self.tune
-        @return: Returns the scripts for HOPSPACK
+        @return: Returns the scripts for HOPSPACK, only the starting
+        point and the evaluation limit of hopspack_input.in change
+        between calls
         '''
-        f = open(self.tune.tdir + '/hopspack_input.in', 'w')
+        f = io.StringIO()
         f.write('@ "Problem Definition"\n')
         f.write('"Number Unknowns"'" int " + str(self.tune.nvars) + '\n')
         f.write('"Upper Bounds" vector ' + str(self.tune.nvars) + ' ')
@@ -192,7 +157,11 @@ class dfoClass():
         f.write('@@\n')
         f.write('@ "Mediator"\n')
         f.write('"Citizen Count" int 1\n')
-        f.write('"Maximum Evaluations" int '" " + str(self.tune.frequency) +
+        if self.tune.hopspack_threads > 1:
+            # Trial points of the GSS citizen are evaluated concurrently
+            f.write('"Number Threads" int ' +
+                    str(self.tune.hopspack_threads) + '\n')
+        f.write('"Maximum Evaluations" int '" " + str(self.tune.pull_evals) +
                 "      \n")
         f.write('"Display"   int 0      \n')
         f.write('@@\n')
@@ -201,11 +170,10 @@ class dfoClass():
         f.write('"Step Tolerance" double 0.001\n')
         f.write('@@\n')
 
-        fcall = open(self.tune.tdir + '/10.call', 'w')
-        fcall.write(self.tune.dfo_path +
-                    '/HOPSPACK_main_serial hopspack_input.in > 10.results &')
-        fcall.close()
-        f.close()
+        self.tune.write_artifact('hopspack_input.in', f.getvalue())
+        self.tune.write_artifact('10.call', self.tune.dfo_path + '/' +
+                                 self.tune.hopspack_main() +
+                                 ' hopspack_input.in > 10.results &')
 
         return True
 
@@ -217,12 +185,12 @@ class dfoClass():
         @type self: Stores hybClass as self.tune
         @return: Returns the scripts for SNOBFIT
         '''
-        f = open(self.tune.tdir + '/matlab_main2.m', 'w')
+        f = io.StringIO()
         f.write("path(path, '" + self.tune.dfo_path + "/v2.1');\n")
         f.write("file = 'test';\n")
         f.write("fcn = 'func_f';\n")
         f.write('fac = 0;\n')
-        f.write('ncall = ' + str(self.tune.frequency) + ';\n')
+        f.write('ncall = limit_evals;\n')
         f.write('u = bl;\n')
         f.write('v = bu;\n')
         f.write('n = ' + str(self.tune.nvars) + ';\n')
@@ -258,9 +226,11 @@ class dfoClass():
         f.write('   if prt>0, request, end\n')
         f.write('   clear x\n')
         f.write('   clear f\n')
+        f.write('   x = request(:,1:n);\n')
+        f.write('   % all nreq requests are evaluated as one batch\n')
+        f.write('   fb = func_batch(x);\n')
         f.write('   for j=1:size(request,1)\n')
-        f.write('      x(j,:) = request(j,1:n);\n')
-        f.write('      f(j,:) = [feval(fcn, x(j,:))+fac*randn '
+        f.write('      f(j,:) = [fb(j)+fac*randn '
                 'max(sqrt(eps), 3*fac)];\n')
         f.write('   end\n')
         f.write('   ncall0 = ncall0 + size(f,1);\n')
@@ -275,15 +245,6 @@ class dfoClass():
         f.write('end\n')
         f.write('ncall0, xbest, fbest %show number of function values, '
                 'best point and function value\n')
-
-        try:
-            os.remove(self.tune.tdir + '/func_f.m')
-        except Exception:
-            pass
-
-        ffunc = open(self.tune.tdir + '/func_f.m', 'w')
-        ffunc.write('function f = func_f(x,Prob);\n')
-        ffunc.close()
-        f.close()
+        self.tune.write_artifact('matlab_solver_15.m', f.getvalue())
 
         return True
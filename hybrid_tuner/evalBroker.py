@@ -0,0 +1,311 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import collections
+import os
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+board = None
+
+
+class evaluationFailed(Exception):
+    pass
+
+
+class evalBoard():
+    '''
+    Work queue of black-box evaluations kept by the broker.
+    Clients submit points and wait for their objective values, workers
+    take points, report heartbeats while evaluating and post the values.
+    A point taken by a worker that stops reporting heartbeats for lease
+    seconds is put back in the queue, as is a point whose evaluation
+    raised an error. After retries failed attempts the point is failed.
+    '''
+    def __init__(self, lease=30, retries=3):
+        self.lease = lease
+        self.retries = retries
+        self.lock = threading.Condition()
+        self.next_id = 0
+        self.pending = collections.deque()
+        self.points = {}
+        self.tries = {}
+        self.leases = {}
+        self.results = {}
+        self.seen = {}
+
+    def submit(self, x):
+        '''
+        @param x: Point provided as a list with length num_params and
+        the fidelity of the evaluation, None for full fidelity
+        @return: Id of the task evaluating x
+        '''
+        with self.lock:
+            self.next_id += 1
+            self.points[self.next_id] = x
+            self.tries[self.next_id] = 0
+            self.pending.append(self.next_id)
+            self.lock.notify_all()
+            return self.next_id
+
+    def take(self, worker, timeout=1.0):
+        '''
+        Hands the oldest pending point to a worker
+
+        @param worker: Name of the worker
+        @param timeout: Time in seconds to wait for a point
+        @return: Id of the task and point, None if no point is pending
+        '''
+        with self.lock:
+            self.seen[worker] = time.time()
+            self.expire()
+            if not self.pending:
+                self.lock.wait(timeout)
+            if not self.pending:
+                return None
+            task = self.pending.popleft()
+            self.leases[task] = worker
+            return task, self.points[task]
+
+    def heartbeat(self, worker):
+        with self.lock:
+            self.seen[worker] = time.time()
+
+    def finish(self, worker, task, f):
+        '''
+        Posts the objective value of a task
+        '''
+        with self.lock:
+            self.seen[worker] = time.time()
+            if self.leases.get(task) != worker:
+                return  # The task was given to another worker
+            del self.leases[task]
+            self.results[task] = (True, f)
+            self.lock.notify_all()
+
+    def fail(self, worker, task, message):
+        '''
+        Reports an evaluation that raised an error
+        '''
+        with self.lock:
+            self.seen[worker] = time.time()
+            if self.leases.get(task) != worker:
+                return
+            del self.leases[task]
+            self.retry(task, message)
+            self.lock.notify_all()
+
+    def retry(self, task, message):
+        self.tries[task] += 1
+        if self.tries[task] > self.retries:
+            self.results[task] = (False, message)
+        else:
+            self.pending.appendleft(task)
+
+    def expire(self):
+        '''
+        Puts back the points leased to workers lost for lease seconds
+        '''
+        now = time.time()
+        for task, worker in list(self.leases.items()):
+            if now - self.seen[worker] > self.lease:
+                del self.leases[task]
+                self.retry(task, 'Worker ' + worker + ' was lost')
+
+    def alive(self):
+        '''
+        @return: Number of workers seen within the last lease seconds
+        '''
+        now = time.time()
+        return sum(1 for t in self.seen.values() if now - t <= self.lease)
+
+    def wait(self, tasks, timeout=1.0):
+        '''
+        Waits until some of the tasks are finished
+
+        @param tasks: Ids of the tasks of the client
+        @param timeout: Time in seconds to wait
+        @return: Dictionary of the finished tasks with their result,
+        which is (True, f) or (False, error message), and the number
+        of workers alive
+        '''
+        with self.lock:
+            self.expire()
+            if not any(t in self.results for t in tasks):
+                self.lock.wait(timeout)
+            done = {}
+            for t in tasks:
+                if t in self.results:
+                    done[t] = self.results.pop(t)
+                    del self.points[t]
+                    del self.tries[t]
+            return done, self.alive()
+
+
+def get_board(lease=30, retries=3):
+    global board
+    if board is None:
+        board = evalBoard(lease, retries)
+    return board
+
+
+class brokerManager(BaseManager):
+    pass
+
+
+brokerManager.register('board', callable=get_board)
+
+
+def connect(address, authkey):
+    '''
+    @param address: Address of the broker as "host:port"
+    @param authkey: Shared secret of the broker
+    @return: Proxy of the evalBoard of the broker
+    '''
+    host, port = address.rsplit(':', 1)
+    manager = brokerManager((host, int(port)), authkey=authkey.encode())
+    manager.connect()
+    return manager.board()
+
+
+def start_broker(address, authkey=None, lease=30, retries=3):
+    '''
+    Starts a broker process
+
+    @param address: Address "host:port" to listen on, "local" for the
+    loopback interface and a free port
+    @param authkey: Shared secret of the broker, random if None
+    @param lease: Time in seconds after which a silent worker is lost
+    @param retries: Number of times a point is retried
+    @return: Manager of the broker, its address and its authkey
+    '''
+    if authkey is None:
+        authkey = secrets.token_hex(16)
+    if address == 'local':
+        host, port = '127.0.0.1', 0
+    else:
+        host, port = address.rsplit(':', 1)
+    manager = brokerManager((host, int(port)), authkey=authkey.encode())
+    manager.start()
+    manager.board(lease, retries)
+    host, port = manager.address
+    return manager, host + ':' + str(port), authkey
+
+
+def start_workers(config_path, n):
+    '''
+    Starts n worker processes on this host
+
+    @param config_path: Location of blackbox.json
+    @param n: Number of workers
+    @return: List of the worker processes
+    '''
+    return [subprocess.Popen([sys.executable, '-m',
+                              'hybrid_tuner.evalBroker', config_path])
+            for i in range(n)]
+
+
+class brokerClient():
+    '''
+    Evaluates points on the workers of a broker. Used by blackBox when
+    the broker key of its configuration is set.
+    '''
+    def __init__(self, address, authkey, lease=30):
+        self.board = connect(address, authkey)
+        self.lease = lease
+
+    def map(self, points, fidelity=None):
+        '''
+        Evaluates points on the workers, waiting for all of them
+
+        @param points: List of points, each a list with length num_params
+        @param fidelity: Fidelity of the evaluations, full if None
+        @return: List of objective values in the order of points
+        '''
+        tasks = [self.board.submit(([float(v) for v in x], fidelity))
+                 for x in points]
+        results = {}
+        lost = None
+        while len(results) < len(tasks):
+            done, alive = self.board.wait(
+                [t for t in tasks if t not in results])
+            results.update(done)
+            if done or alive > 0:
+                lost = None
+            elif lost is None:
+                lost = time.time()
+            elif time.time() - lost > self.lease:
+                raise evaluationFailed('No evaluation worker is alive')
+        values = []
+        for t in tasks:
+            ok, value = results[t]
+            if not ok:
+                raise evaluationFailed(value)
+            values.append(value)
+        return values
+
+
+def heartbeat(config, worker, stop):
+    board = connect(config['broker'], config['authkey'])
+    while not stop.wait(config['lease']/3):
+        board.heartbeat(worker)
+
+
+def main(argv):
+    '''
+    Evaluation worker. Takes points from the broker, evaluates them in a
+    scratch directory of its own and posts the objective values, until
+    the broker goes away.
+
+    @param argv: argv[1] is the location of blackbox.json, argv[2] is
+    the optional address of the broker as "host:port", which overrides
+    the address in blackbox.json
+    '''
+    from hybrid_tuner.blackBox import blackBox
+    config = json.load(open(argv[1]))
+    if config['executable'] is None and config['objective'] is None:
+        sys.exit('The Python objective is not importable, '
+                 'provide it as an import string "module:function".')
+    if len(argv) > 2:
+        config['broker'] = argv[2]
+    scratch = tempfile.mkdtemp(prefix='hybworker.')
+    # The cache and the surrogate are checked by the tuner before a
+    # point is submitted, the curves of the pruner are not shared
+    bb = blackBox(dict(config, tdir=scratch, cache_size=0, max_workers=1,
+                       broker=None, surrogate=None, prune=None))
+    worker = socket.gethostname() + ':' + str(os.getpid())
+    board = connect(config['broker'], config['authkey'])
+    stop = threading.Event()
+    beat = threading.Thread(target=heartbeat, args=(config, worker, stop),
+                            daemon=True)
+    beat.start()
+    try:
+        while True:
+            task = board.take(worker)
+            if task is None:
+                continue
+            try:
+                x, fidelity = task[1]
+                f_out = bb.evaluate(x, fidelity=fidelity)
+            except Exception as err:
+                board.fail(worker, task[0], repr(err))
+                continue
+            board.finish(worker, task[0], f_out)
+    except (EOFError, ConnectionError):
+        pass  # The broker has shut down
+    finally:
+        stop.set()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,99 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+
+class evalCache():
+    '''
+    Content-addressed cache of black-box evaluations.
+    Entries are keyed on the rounded parameter vector and stored in a
+    SQLite database inside outdir, so every solver of a hybClass run
+    (DIRECT, HOPSPACK, the MATLAB solvers) and every restart of the run
+    share the same cache. The cache holds at most max_size entries,
+    the least recently used entries are evicted first.
+    The cache can be shared by the threads of one process.
+    '''
+    def __init__(self, path, ints, max_size=10000):
+        self.path = path
+        self.ints = ints
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=60,
+                                  check_same_thread=False)
+        self.db.execute('CREATE TABLE IF NOT EXISTS evals ('
+                        'key TEXT PRIMARY KEY, x TEXT, f REAL, '
+                        'last_used REAL)')
+        self.db.commit()
+
+    def round(self, x):
+        '''
+        Rounds the integer variables of a point
+
+        @param x: Point provided as an array with length num_params
+        @return: List of floats with var_type = 1 entries rounded
+        '''
+        return [float(round(v)) if t == 1 else float(v)
+                for v, t in zip(x, self.ints)]
+
+    def key(self, x):
+        '''
+        Computes the content address of a point
+
+        @param x: Point provided as an array with length num_params
+        @return: SHA-1 hex digest of the rounded point
+        '''
+        text = ' '.join(repr(v) for v in self.round(x))
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def get(self, x):
+        '''
+        Looks up a previously evaluated point
+
+        @param x: Point provided as an array with length num_params
+        @return: Cached objective value or None on a miss
+        '''
+        k = self.key(x)
+        with self.lock:
+            row = self.db.execute('SELECT f FROM evals WHERE key = ?',
+                                  (k,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute('UPDATE evals SET last_used = ? WHERE key = ?',
+                            (time.time(), k))
+            self.db.commit()
+        return row[0]
+
+    def put(self, x, f):
+        '''
+        Stores an evaluation and evicts the least recently used
+        entries once the cache holds more than max_size points
+
+        @param x: Point provided as an array with length num_params
+        @param f: Objective value returned by the black-box
+        '''
+        xr = self.round(x)
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO evals '
+                            'VALUES (?, ?, ?, ?)',
+                            (self.key(xr), ' '.join(repr(v) for v in xr),
+                             float(f), time.time()))
+            count = self.db.execute(
+                'SELECT COUNT(*) FROM evals').fetchone()[0]
+            if count > self.max_size:
+                self.db.execute('DELETE FROM evals WHERE key IN (SELECT key '
+                                'FROM evals ORDER BY last_used LIMIT ?)',
+                                (count - self.max_size,))
+            self.db.commit()
+
+    def points(self):
+        '''
+        @return: List of the cached points and list of their values
+        '''
+        with self.lock:
+            rows = self.db.execute('SELECT x, f FROM evals').fetchall()
+        return ([[float(v) for v in x.split()] for x, f in rows],
+                [f for x, f in rows])
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,214 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import os
+import shutil
+import sys
+import numpy as np
+
+
+class evalLog():
+    '''
+    Append-only binary log of all evaluations of a tuning run.
+    The log is stored in outdir as evals.bin, a headerless sequence of
+    little-endian float64 rows, and evals.json which documents the schema.
+    Each row holds nvars + 8 columns:
+    0. iteration: Iteration number of the run
+    1. time: Wall time of the evaluation in seconds, as reported by the
+    solver (seconds since the start of the run or of the solver call)
+    2. solver: Number of the DFO solver, 0 for the initialization
+    3. seconds: Duration of the evaluation, NaN if not measured
+    4. pruned: 1 if the evaluation was stopped by the pruner, its value
+    is then the last intermediate value of the black-box, 0 otherwise
+    5. surrogate: 1 if the point was screened out by the surrogate, its
+    value is then the prediction of the surrogate, 0 otherwise
+    6 to nvars + 5. x: Evaluated point
+    nvars + 6. f: Objective value
+    nvars + 7. best: Best objective value found so far, pruned
+    evaluations and surrogate predictions excluded
+    The log is read memory-mapped or in chunks of rows, so exporting it
+    to the allEvals.res and <solver>.res text format of HybridTuner and
+    summarizing it take one pass in constant memory, whatever the length
+    of the run.
+    '''
+    dtype = np.dtype('<f8')
+    chunk = 65536
+
+    def __init__(self, tdir, nvars):
+        self.tdir = tdir
+        self.nvars = nvars
+        self.ncols = nvars + 8
+        self.path = tdir + '/evals.bin'
+        schema = {'format': 'float64 little-endian rows',
+                  'columns': ['iteration', 'time', 'solver', 'seconds',
+                              'pruned', 'surrogate'] +
+                  ['x' + str(i+1) for i in range(nvars)] + ['f', 'best']}
+        with open(tdir + '/evals.json', 'w') as f:
+            json.dump(schema, f)
+        self.best = np.inf
+        data = self.read()
+        if len(data) > 0:
+            self.best = data[-1, -1]
+
+    def append(self, iteration, wall, solver, X, F, seconds=np.nan,
+               pruned=False, surrogate=False):
+        '''
+        Appends the evaluations of one solver call to the log
+
+        @param iteration: Iteration numbers, array of length m
+        @param wall: Wall times, array of length m
+        @param solver: Number of the DFO solver
+        @param X: Evaluated points, array of shape (m, nvars)
+        @param F: Objective values, array of length m
+        @param seconds: Durations of the evaluations, array of length m
+        @param pruned: Pruned flags of the evaluations, array of length m
+        @param surrogate: Surrogate flags of the evaluations, array of
+        length m
+        '''
+        F = np.asarray(F, dtype=float).reshape(-1)
+        m = len(F)
+        if m == 0:
+            return
+        rows = np.empty((m, self.ncols), dtype=self.dtype)
+        rows[:, 0] = iteration
+        rows[:, 1] = wall
+        rows[:, 2] = solver
+        rows[:, 3] = seconds
+        rows[:, 4] = pruned
+        rows[:, 5] = surrogate
+        rows[:, 6:6+self.nvars] = np.asarray(X, dtype=float).reshape(
+            m, self.nvars)
+        rows[:, -2] = F
+        # The value of a pruned evaluation is partial, the value of a
+        # screened point is predicted
+        real = (rows[:, 4] == 0) & (rows[:, 5] == 0)
+        rows[:, -1] = np.minimum.accumulate(np.append(
+            self.best, np.where(real, F, np.inf)))[1:]
+        self.best = rows[-1, -1]
+        with open(self.path, 'ab') as f:
+            f.write(rows.tobytes())
+
+    def truncate(self, rows):
+        '''
+        Drops the rows logged after the first rows, used when resuming
+        a run from a checkpoint
+
+        @param rows: Number of rows to keep
+        '''
+        if os.path.exists(self.path):
+            os.truncate(self.path, rows*self.dtype.itemsize*self.ncols)
+        data = self.read()
+        self.best = data[-1, -1] if len(data) > 0 else np.inf
+
+    def read(self):
+        '''
+        @return: Read-only memory map of the log, shape (rows, nvars + 8)
+        '''
+        if not os.path.exists(self.path):
+            return np.empty((0, self.ncols))
+        # A row cut short by a crash is ignored
+        rows = os.path.getsize(self.path)//(self.dtype.itemsize*self.ncols)
+        if rows == 0:
+            return np.empty((0, self.ncols))
+        return np.memmap(self.path, dtype=self.dtype, mode='r',
+                         shape=(rows, self.ncols))
+
+    def chunks(self, size=None):
+        '''
+        @param size: Number of rows of each chunk, defaults to chunk
+        @return: Generator of the consecutive chunks of rows of the log,
+        arrays of shape (rows, nvars + 8)
+        '''
+        if not os.path.exists(self.path):
+            return
+        count = (size or self.chunk)*self.ncols
+        with open(self.path, 'rb') as f:
+            while True:
+                data = np.fromfile(f, dtype=self.dtype, count=count)
+                # A row cut short by a crash is ignored
+                rows = len(data)//self.ncols
+                if rows == 0:
+                    return
+                yield data[:rows*self.ncols].reshape(rows, self.ncols)
+
+    def profile(self, points=1000):
+        '''
+        Best objective value so far of the log, downsampled to evenly
+        spaced rows, and the black-box time, in one pass over the log
+
+        @param points: Max number of rows of the trace
+        @return: Iterations and best values of the trace, the last row
+        being the last row of the log, total duration and number of the
+        timed evaluations
+        '''
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        rows = size//(self.dtype.itemsize*self.ncols)
+        keep = np.unique(np.linspace(0, rows - 1, min(points, rows),
+                                     dtype=np.int64))
+        iteration, best = [], []
+        seconds, timed = 0.0, 0
+        start = 0
+        for data in self.chunks():
+            pick = keep[(keep >= start) & (keep < start + len(data))] - start
+            iteration.append(data[pick, 0])
+            best.append(data[pick, -1])
+            timed_rows = ~np.isnan(data[:, 3])
+            seconds += data[timed_rows, 3].sum()
+            timed += int(timed_rows.sum())
+            start += len(data)
+        if not iteration:
+            return np.empty(0), np.empty(0), seconds, timed
+        return np.concatenate(iteration), np.concatenate(best), seconds, timed
+
+    def export(self):
+        '''
+        Writes the log in the text format of allEvals.res and
+        <solver>.res, one row per evaluation: iteration, x and f.
+        The DIRECT initialization only appears in allEvals.res.
+        Pruned evaluations and screened points only appear as the #pruned
+        and #surrogate lines of pruned.res and surrogate.res.
+        Cache hits from cacheHits.res, points screened out by the
+        surrogate from surrogate.res and evaluations stopped by the
+        pruner from pruned.res are appended to allEvals.res.
+        '''
+        cols = [0] + list(range(6, 6+self.nvars)) + [self.nvars+6]
+        fmt = ['%d'] + ['%.5f']*(self.nvars+1)
+        files = {}
+        f = open(self.tdir + '/allEvals.res', 'w')
+        for data in self.chunks():
+            data = data[(data[:, 4] == 0) & (data[:, 5] == 0)]
+            np.savetxt(f, data[:, cols], fmt=fmt, delimiter='   ')
+            for solver in np.unique(data[:, 2]):
+                if solver == 0:
+                    continue
+                if solver not in files:
+                    files[solver] = open(self.tdir + '/' + str(int(solver)) +
+                                         '.res', 'w')
+                rows = data[data[:, 2] == solver]
+                np.savetxt(files[solver], rows[:, cols], fmt=fmt,
+                           delimiter='   ')
+        for fs in files.values():
+            fs.close()
+        for name in ['cacheHits.res', 'surrogate.res', 'pruned.res']:
+            if os.path.exists(self.tdir + '/' + name):
+                with open(self.tdir + '/' + name, 'r') as fh:
+                    shutil.copyfileobj(fh, f)
+        f.close()
+
+
+def main(argv):
+    '''
+    Converter from the binary log to the .res text format
+
+    @param argv: argv[1] is the output directory of the tuning run
+    '''
+    schema = json.load(open(argv[1] + '/evals.json'))
+    log = evalLog(argv[1], sum(1 for c in schema['columns']
+                               if c.startswith('x')))
+    log.export()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,141 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import math
+import numpy as np
+from hybrid_tuner.budgetScheduler import evaluationExpired
+
+
+class successiveHalving():
+    '''
+    Successive halving (Jamieson and Talwalkar, 2016) over the fidelity
+    of the black-box, such as training epochs, mesh size or sample count.
+    All candidates are evaluated at the lowest fidelity of the schedule,
+    the best 1/eta of them are promoted to the next fidelity, eta times
+    higher, until the survivors are evaluated at full fidelity. Only the
+    full fidelity values are comparable with the evaluations of the
+    solvers, so only they are returned, cached and logged.
+
+    The cost of an evaluation at fidelity r is r/max full evaluations,
+    and the budget is given in full evaluations.
+    The promotion tree, the values of each candidate at each fidelity and
+    the candidates promoted from each rung, is written to
+    outdir/promotions.json.
+    '''
+    def __init__(self, spec, blackbox):
+        '''
+        @param spec: Dictionary with the fidelity bounds min and max,
+        0 < min <= max, the reduction factor eta > 1, defaults to 3,
+        and var_type, 1 if the fidelity is an integer, defaults to 0
+        @param blackbox: blackBox evaluating the candidates
+        '''
+        self.blackbox = blackbox
+        self.max = float(spec['max'])
+        self.min = float(spec['min'])
+        try:
+            self.eta = spec['eta']
+        except KeyError:
+            self.eta = 3
+        try:
+            self.integer = spec['var_type'] == 1
+        except KeyError:
+            self.integer = False
+        if not 0 < self.min <= self.max:
+            raise ValueError('The fidelity needs 0 < min <= max, got min = ' +
+                             str(spec['min']) + ' and max = ' +
+                             str(spec['max']))
+        if self.eta <= 1:
+            raise ValueError('The fidelity needs eta > 1, got eta = ' +
+                             str(self.eta))
+        # Rung k runs at max*eta^(k-K), the first rung at or above min
+        K = int(math.floor(math.log(self.max/self.min, self.eta) + 1e-9))
+        self.fidelities = [self.max*self.eta**(k-K) for k in range(K+1)]
+        if self.integer:
+            self.fidelities = [int(round(r)) for r in self.fidelities]
+        self.tree = None
+
+    def promoted(self, n):
+        '''
+        @param n: Number of candidates of a rung
+        @return: Number of candidates promoted to the next rung
+        '''
+        return max(n//self.eta, 1)
+
+    def cost(self, n):
+        '''
+        @param n: Number of candidates of the first rung
+        @return: Cost of the schedule in full evaluations
+        '''
+        total = 0.0
+        for r in self.fidelities:
+            total += n*r/self.max
+            n = self.promoted(n)
+        return total
+
+    def candidates(self, budget):
+        '''
+        @param budget: Number of full evaluations granted
+        @return: Largest number of candidates whose schedule fits budget
+        '''
+        n = 0
+        while self.cost(n+1) <= budget:
+            n += 1
+        return n
+
+    def run(self, X):
+        '''
+        Runs the schedule on the candidates
+
+        @param X: Candidates, array of shape (n, num_params)
+        @return: Candidates evaluated at full fidelity, their values and
+        the cost of the schedule in full evaluations, the candidates
+        killed at the deadline of the blackBox in the last rung are left
+        out, evaluationExpired is raised if an earlier rung is cut short
+        '''
+        X = np.asarray(X, dtype=float)
+        alive = np.arange(len(X))
+        values = [{} for i in range(len(X))]
+        rungs = []
+        cost = 0.0
+        for k, r in enumerate(self.fidelities):
+            full = k == len(self.fidelities) - 1
+            cost += len(alive)*r/self.max
+            try:
+                F = np.asarray(self.blackbox.evaluate_batch(
+                    list(X[alive]), None if full else r), dtype=float)
+            except evaluationExpired as err:
+                if not full:
+                    raise
+                # The full evaluations completed before the deadline
+                done = [f is not None for f in err.values]
+                alive = alive[done]
+                F = np.array([f for f in err.values if f is not None])
+            for i, f in zip(alive, F):
+                values[i][r] = float(f)
+            if full:
+                rungs.append({'fidelity': r, 'candidates': alive.tolist(),
+                              'promoted': []})
+                break
+            order = np.argsort(F, kind='stable')
+            keep = alive[order[:self.promoted(len(alive))]]
+            rungs.append({'fidelity': r, 'candidates': alive.tolist(),
+                          'promoted': keep.tolist()})
+            alive = keep
+        self.tree = {'fidelities': self.fidelities,
+                     'eta': self.eta,
+                     'points': X.tolist(),
+                     'values': [[[r, f] for r, f in sorted(v.items())]
+                                for v in values],
+                     'rungs': rungs}
+        return X[alive], F, cost
+
+    def write(self, path):
+        '''
+        Writes the promotion tree of the last run
+
+        @param path: Location of promotions.json
+        '''
+        with open(path, 'w') as f:
+            json.dump(self.tree, f)
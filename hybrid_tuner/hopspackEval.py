@@ -0,0 +1,115 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import fcntl
+import os
+import shutil
+import sys
+import time
+
+
+def replace(path, text):
+    '''
+    Atomically replaces the content of a file
+    '''
+    fn = open(path + '.tmp', 'w')
+    fn.write(text)
+    fn.close()
+    os.replace(path + '.tmp', path)
+
+
+def record(x, f_out, seconds, start_time, printopt):
+    '''
+    Updates iteration.number, the incumbent files best_objective,
+    best_solution and best_iteration, and appends the evaluation to
+    evals.res, all in the working directory of HOPSPACK. The files are
+    updated under a lock, so concurrent evaluations never race.
+
+    @param x: Evaluated point, integer variables rounded
+    @param f_out: Objective value
+    @param seconds: Duration of the evaluation
+    @param start_time: Start of the tuning run in seconds since the epoch
+    @param printopt: Evaluations are logged to evals.res every printopt
+    evaluations, never if 0
+    @return: Iteration number of the evaluation
+    '''
+    lock = open('hopspack.lock', 'a')
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    try:
+        iteration = 1
+        if os.path.exists('iteration.number'):
+            fn = open('iteration.number', 'r')
+            iteration = int(fn.read()) + 1
+            fn.close()
+        replace('iteration.number', '%d\n' % iteration)
+
+        best = f_out
+        if os.path.exists('best_objective'):
+            fn = open('best_objective', 'r')
+            best = min(float(fn.read()), f_out)
+            fn.close()
+        if best == f_out:
+            replace('best_objective', '%.15g\n' % f_out)
+            replace('best_solution', ''.join('%.15g\n' % v for v in x))
+            replace('best_iteration', '%d\n' % iteration)
+
+        if printopt > 0 and iteration % printopt == 0:
+            line = ('%d %.3f ' % (iteration, time.time() - start_time) +
+                    ' '.join('%.15g' % v for v in x) +
+                    ' %.15g %.15g %.6f\n' % (f_out, best, seconds))
+            fd = os.open('evals.res', os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                         0o644)
+            os.write(fd, line.encode())
+            os.close(fd)
+    finally:
+        fcntl.flock(lock, fcntl.LOCK_UN)
+        lock.close()
+    return iteration
+
+
+def main(argv, config, nvars, start_time, printopt, threads=1):
+    '''
+    Evaluator called by HOPSPACK as
+    <Executable Name> <input file> <output file> <tag>
+    The point is read from lines 3 to nvars + 2 of the input file and
+    evaluated with blackBox, the objective value is written to the output
+    file in the format read by HOPSPACK. With the multithreaded HOPSPACK
+    the black-box runs in a directory of its own, eval.<tag>, so that
+    concurrent evaluations do not share myin and myout.
+
+    @param argv: Arguments passed by HOPSPACK
+    @param config: Location of blackbox.json
+    @param nvars: Number of variables
+    @param start_time: Start of the tuning run in seconds since the epoch
+    @param printopt: Evaluations are logged to evals.res every printopt
+    evaluations, never if 0
+    @param threads: Number of concurrent evaluations of HOPSPACK
+    '''
+    config = json.load(open(config))
+    if config['executable'] is None and config['objective'] is None:
+        sys.exit('The Python objective is not importable, '
+                 'provide it as an import string "module:function".')
+    # Imported here, the script of HOPSPACK runs once per evaluation and
+    # blackBox only imports what the configuration uses
+    from hybrid_tuner.blackBox import blackBox
+    fn = open(argv[1], 'r')
+    lines = fn.readlines()
+    fn.close()
+    bb = blackBox(config)
+    x = bb.round([float(v) for v in lines[2:2+nvars]])
+    workdir = os.getcwd()
+    if threads > 1:
+        tag = argv[3] if len(argv) > 3 else str(os.getpid())
+        workdir = workdir + '/eval.' + tag
+        os.makedirs(workdir, exist_ok=True)
+    start = time.time()
+    f_out = bb.evaluate(x, workdir)
+    seconds = time.time() - start
+    if threads > 1:
+        shutil.rmtree(workdir, ignore_errors=True)
+    record(x, f_out, seconds, start_time, printopt)
+    fn = open(argv[2], 'w')
+    fn.write('1\n%.15g\n' % f_out)
+    fn.close()
@@ -4,23 +4,39 @@ except ImportError:
     import json
 
 import numpy as np
-import pandas as pd
-import subprocess
+import copy
+import math
 import os
+import pickle
 import sys
 import time
 import random
 import shutil
-import math
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from mako.template import Template
 from hybrid_tuner.pyDirect import pyOpt
+from hybrid_tuner.design import design
+from hybrid_tuner.fidelity import successiveHalving
+from hybrid_tuner.blackBox import blackBox
+from hybrid_tuner.evalBroker import start_broker, start_workers
+from hybrid_tuner.pySolvers import pySolvers
+from hybrid_tuner.matlabSession import matlabSession
+from hybrid_tuner.banditState import banditState
+from hybrid_tuner.warmStart import warmStart
+from hybrid_tuner.evalLog import evalLog
+from hybrid_tuner.budgetScheduler import budgetScheduler, evaluationExpired
+from hybrid_tuner.traceLog import traceLog
 
 class hybClass():
     '''
     This is the definition of the hybClass module.
     This module contains Bandit DFO and Hybrid DFO.
-    The only requirement for this module is a defined myparams.json file.
+    The only requirement for this module is a defined myparams.json file,
+    args.params is its location or a dictionary with the same content.
+    The state of a run is kept in the hybClass object and in outdir, the
+    working directory is never changed, so several tuners can run in one
+    process, see tuner for the library interface.
     The params file should provide:
     a. num_params: Number of hyper parameters
     b. lower_bounds: Variable lower bounds provided as an array with length num_params
@@ -31,20 +47,96 @@ class hybClass():
     g. global_tol: Stops within tolerance of the optimal solution if provided
     h. cpu_limit: Max amount of time to spend on the search provided in seconds
     i. global_target: Optimal solution if one is known
-    j. executable: Name of executable file or black-box to call, see myexec
-    k. outdir: Location of output directory, defaults to ./tmp
-    l. bandit (optional): Location of bparams.json, file of bandit params
-    m. hybrid (optional): Location of hparams.json, file of hybrid params
+    j. executable: Name of executable file or black-box to call, see myexec,
+    or import string "module:function" of a Python objective that takes
+    the list of parameters and returns the objective value. A callable
+    can also be passed to hybClass as the executable keyword argument.
+    The external solvers, HOPSPACK and the MATLAB solvers, only reach
+    an executable or an importable objective, otherwise they are left
+    out of Bandit DFO and refused as solver.
+    k. outdir: Location of output directory, defaults to ./tmp, relative
+    paths are relative to the dirpath keyword argument of hybClass,
+    which defaults to the working directory
+    l. bandit (optional): Location of bparams.json, file of bandit params,
+    or a dictionary of bandit params
+    m. hybrid (optional): Location of hparams.json, file of hybrid params,
+    or a dictionary of hybrid params
     n. printopt: 0 or 1, if 1 will print intermediate values to evals.res
     o. solver: DFO solver to use initially, accepted options are 8, 10, 15
+    and the native Python solvers 20 to 24, see pySolvers
+    p. cache_size (optional): Max number of evaluations kept in the
+    evaluation cache in outdir, defaults to 10000, 0 disables the cache
+    q. max_workers (optional): Number of black-box evaluations run
+    concurrently for batches of points, defaults to 1
+    r. matlab_session (optional): 0 or 1, if 1 the MATLAB solvers run in
+    one MATLAB process kept for the whole run, see matlabSession
+    s. broker (optional): Address "host:port" of a broker of evaluations
+    started by the run, "local" for the loopback interface. Black-box
+    evaluations are then run by max_workers workers started on this host
+    and by workers started on other hosts with
+    python -m hybrid_tuner.evalBroker outdir/blackbox.json host:port
+    t. broker_authkey (optional): Shared secret of the broker, random
+    if not provided, it is stored in outdir/blackbox.json
+    u. broker_lease (optional): Time in seconds after which a worker
+    that stopped reporting is lost and its point is retried, defaults to 30
+    v. broker_retries (optional): Number of times a point is retried
+    before the evaluation fails, defaults to 3
+    w. surrogate (optional): 0 or 1, if 1 the points proposed by the
+    solvers are screened by a surrogate model of the evaluations in the
+    evaluation cache, predicted poor points are not evaluated,
+    see rbfSurrogate
+    x. surrogate_quantile (optional): Points predicted above this quantile
+    of the values of their neighbors can be screened out, defaults to 0.75
+    y. surrogate_tol (optional): Max mean leave-one-out error of the
+    surrogate relative to the range of the values of the neighbors,
+    defaults to 0.1
+    z. hopspack_threads (optional): Number of evaluations HOPSPACK
+    (solver 10) runs concurrently with the multithreaded HOPSPACK
+    executable, defaults to 1 for the serial executable
+    aa. trace (optional): 0 or 1, if 1 the phases of the run and every
+    black-box call are timed in outdir/trace.json, see traceLog,
+    defaults to 0
+    bb. fidelity (optional): Fidelity of the black-box, such as training
+    epochs, as a dictionary with the bounds min and max, the reduction
+    factor eta, defaults to 3, and var_type, 1 if the fidelity is an
+    integer. The fidelity is written to the input file on the line after
+    the parameters, or passed to a Python objective as the fidelity
+    keyword argument. Solvers evaluate at full fidelity, max, and the
+    lhs and sobol initializations run successive halving from min to max,
+    see successiveHalving
+    cc. prune (optional): 'median' or 'bound', rule stopping the
+    evaluations of the executable that cannot beat the incumbent, from
+    the intermediate objective values it appends to myout, one per line,
+    the last line being the objective value, see curvePruner
+    dd. prune_warmup (optional): Number of intermediate values before an
+    evaluation can be stopped, defaults to 2
+    ee. prune_curves (optional): Number of completed evaluations before
+    evaluations are stopped, defaults to 5
+    ff. warm_start (optional): Location or list of locations of the
+    allEvals.res files, evaluation logs (evals.bin) or output directories
+    of earlier runs. Their evaluations seed the incumbent, the evaluation
+    cache and the surrogate, and those of the evaluation logs give the
+    bandit arms prior AUC statistics, see warmStart
+    gg. warm_start_region (optional): Fraction of the best evaluations of
+    warm_start whose bounding box DIRECT initializes in, defaults to 0
+    for the whole search space
+    hh. plot_points (optional): Max number of points of the plot of the
+    best objective value in outdir/evalsPlot, defaults to 1000
     '''
+    # Compiled Mako templates of the solver files, see template
+    templates = {}
+    # Files of outdir appended to during a run, see reset_reports
+    reports = ['trace.json', 'cacheHits.res', 'surrogate.res', 'pruned.res',
+               'curves.res']
+
     def __init__(self, args, *pargs, **kwargs):
         np.set_printoptions(precision=3)
-        pd.options.display.precision = 3
         self.input = 'myin'
         self.output = 'myout'
         self.args = args
-        if os.path.exists(self.args.params):
+        if isinstance(self.args.params, dict):
+            self.params = dict(self.args.params)
+        elif os.path.exists(self.args.params):
             self.params = json.load(open(self.args.params))
         else:
             sys.exit("Parameter file does not exist, please provide one.")
@@ -72,12 +164,16 @@ class hybClass():
         self.window = self.params['max_iterations']
         self.global_tolerance = self.params['global_tol']
         self.cParam = 0.05
+        self.arms = 1
         self.init = 0
         self.init_limit = 0
 
         self.max_cpu = self.params['cpu_limit']
         self.global_solution = self.params['global_target']
-        self.executable = self.params['executable']
+        if 'executable' in kwargs:
+            self.executable = kwargs['executable']
+        else:
+            self.executable = self.params['executable']
         try:
             self.outdir = self.params['outdir']
         except KeyError:
@@ -102,25 +198,311 @@ class hybClass():
             self.matlab = True
         else:
             self.matlab = False
+        try:
+            self.matlab_session = self.params['matlab_session']
+        except KeyError:
+            self.matlab_session = 0
+        self.session = None
+        # Content of the solver files written to outdir, see write_artifact
+        self.artifacts = {}
 
         self.solver = self.params['solver']
+        try:
+            self.cache_size = self.params['cache_size']
+        except KeyError:
+            self.cache_size = 10000
+        try:
+            self.max_workers = self.params['max_workers']
+        except KeyError:
+            self.max_workers = 1
+        try:
+            self.surrogate = self.params['surrogate']
+        except KeyError:
+            self.surrogate = 0
+        try:
+            self.surrogate_quantile = self.params['surrogate_quantile']
+        except KeyError:
+            self.surrogate_quantile = 0.75
+        try:
+            self.surrogate_tol = self.params['surrogate_tol']
+        except KeyError:
+            self.surrogate_tol = 0.1
+        try:
+            self.hopspack_threads = self.params['hopspack_threads']
+        except KeyError:
+            self.hopspack_threads = 1
+        try:
+            self.fidelity = self.params['fidelity']
+        except KeyError:
+            self.fidelity = None
+        try:
+            self.prune = self.params['prune']
+        except KeyError:
+            self.prune = None
+        try:
+            self.prune_warmup = self.params['prune_warmup']
+        except KeyError:
+            self.prune_warmup = 2
+        try:
+            self.prune_curves = self.params['prune_curves']
+        except KeyError:
+            self.prune_curves = 5
+        try:
+            self.warm_start = self.params['warm_start']
+        except KeyError:
+            self.warm_start = None
+        try:
+            self.warm_start_region = self.params['warm_start_region']
+        except KeyError:
+            self.warm_start_region = 0
+        try:
+            self.plot_points = self.params['plot_points']
+        except KeyError:
+            self.plot_points = 1000
+        try:
+            trace = self.params['trace']
+        except KeyError:
+            trace = 0
+        try:
+            self.broker = self.params['broker']
+        except KeyError:
+            self.broker = None
+        try:
+            self.broker_authkey = self.params['broker_authkey']
+        except KeyError:
+            self.broker_authkey = None
+        try:
+            self.broker_lease = self.params['broker_lease']
+        except KeyError:
+            self.broker_lease = 30
+        try:
+            self.broker_retries = self.params['broker_retries']
+        except KeyError:
+            self.broker_retries = 3
 
-        self.dirpath = os.getcwd()
-        self.tdir = self.dirpath + '/' + self.outdir
+        if 'dirpath' in kwargs:
+            self.dirpath = os.path.abspath(kwargs['dirpath'])
+        else:
+            self.dirpath = os.getcwd()
+        self.tdir = os.path.join(self.dirpath, self.outdir)
         self.incumbent = 1000000.00
-        self.s_time = round(time.time())
+        self.s_time = time.time()
         self.elapsed = 0
         for i in range(0, len(self.x0)):
             if self.ints[i] == 1:
                 self.x0[i] = round(self.x0[i])
         self.time_iter = self.max_cpu
         if(not os.path.exists(self.tdir)):
-            os.mkdir(self.tdir)
+            os.makedirs(self.tdir)
+        # Read before the reports are reset, outdir may be one of the
+        # earlier runs
+        self.warm = None
+        if self.warm_start and not getattr(self.args, 'resume', False):
+            self.warm = self.read_warm_start()
+        self.reset_reports()
+        self.trace = traceLog(self.tdir + '/trace.json' if trace else None)
+        objective = None
+        target = None
+        if callable(self.executable):
+            objective = self.executable
+            module = getattr(objective, '__module__', '__main__')
+            name = getattr(objective, '__qualname__', '<unknown>')
+            if module != '__main__' and '<' not in name:
+                target = module + ':' + name
+            executable = None
+        elif (':' in self.executable and not
+              os.path.exists(os.path.join(self.dirpath,
+                                          self.executable))):
+            target = self.executable
+            executable = None
+        else:
+            executable = os.path.join(self.dirpath, self.executable)
+        # The external solvers evaluate through the wrapper scripts
+        self.external = executable is not None or target is not None
+        address = None
+        if self.broker:
+            (self.broker_manager, address,
+             self.broker_authkey) = start_broker(self.broker,
+                                                 self.broker_authkey,
+                                                 self.broker_lease,
+                                                 self.broker_retries)
+        prune = None
+        if self.prune:
+            prune = {'rule': self.prune,
+                     'warmup': self.prune_warmup,
+                     'min_curves': self.prune_curves}
+        surrogate = None
+        if self.surrogate:
+            surrogate = {'quantile': self.surrogate_quantile,
+                         'tol': self.surrogate_tol}
+        self.blackbox = blackBox({'tdir': self.tdir,
+                                  'dirpath': self.dirpath,
+                                  'executable': executable,
+                                  'objective': target,
+                                  'input': self.input,
+                                  'output': self.output,
+                                  'ints': self.ints,
+                                  'lb': self.lb,
+                                  'ub': self.ub,
+                                  'surrogate': surrogate,
+                                  'cache': self.tdir + '/evals.cache',
+                                  'cache_size': self.cache_size,
+                                  'max_workers': self.max_workers,
+                                  'broker': address,
+                                  'authkey': self.broker_authkey,
+                                  'lease': self.broker_lease,
+                                  'trace': self.trace.path,
+                                  'prune': prune,
+                                  'fidelity': (self.fidelity['max']
+                                               if self.fidelity else None)},
+                                 objective)
+        # Kept by the bandit arms, which run in their own directories
+        self.blackbox_config = self.tdir + '/blackbox.json'
+        self.blackbox.write_config(self.blackbox_config)
+        # One trace writer per process
+        self.blackbox.trace = self.trace
+        if self.broker:
+            self.workers = start_workers(self.blackbox_config,
+                                         self.max_workers)
+        self.blackbox_cmd = (sys.executable + ' -m hybrid_tuner.blackBox ' +
+                             self.blackbox_config)
+        self.pysolvers = pySolvers(self)
+        self.evallog = evalLog(self.tdir, self.nvars)
+        if self.warm is not None:
+            with self.trace.span('warm_start'):
+                self.load_warm_start()
         if self.bandit:
             self.init_bandit()
         if self.hybrid:
             self.init_hybrid()
-        os.chdir(self.tdir)
+        # Budget of the next solver call, see run_tuning_iteration
+        self.budget = budgetScheduler(self)
+        self.pull_evals = self.frequency
+        self.pull_time = self.time_iter
+        # Best value and point of the last native solver call, see pull
+        self.pulled_best = None
+        self.resume_phase = None
+        if getattr(self.args, 'resume', False):
+            self.load_checkpoint()
+
+    def read_warm_start(self):
+        '''
+        Reads the evaluations of the earlier runs listed in warm_start,
+        relative locations are relative to dirpath
+
+        @type self: Parameters setup in __init__
+        @return: warmStart of the runs, kept for the bandit and DIRECT
+        '''
+        paths = self.warm_start
+        if isinstance(paths, str):
+            paths = [paths]
+        paths = [os.path.join(self.dirpath, path) for path in paths]
+        return warmStart(paths, self.lb, self.ub, self.ints)
+
+    def load_warm_start(self):
+        '''
+        Starts the run from the evaluations of the earlier runs
+
+        @type self: Parameters setup in __init__
+        @return: Update to self.x0, self.incumbent, the evaluation cache
+        and the surrogate
+        '''
+        self.warm.seed(self.blackbox)
+        best = self.warm.best()
+        if best is None:
+            print('Warm start found no evaluations within the bounds!')
+            return
+        self.incumbent, self.x0 = best
+        if self.blackbox.pruner:
+            self.blackbox.pruner.observe(self.incumbent)
+        print('Warm start from ' + str(len(self.warm.F)) +
+              ' evaluations, incumbent ' + str(self.incumbent))
+
+    def reset_reports(self):
+        '''
+        Removes the reports and the evaluation log of an earlier run in
+        outdir, or cuts the reports back to their size at the checkpoint
+        when the run is resumed, so they only hold the evaluations of
+        this run. The evaluation cache is kept.
+
+        @type self: Parameters setup in __init__
+        '''
+        checkpoint = self.tdir + '/checkpoint.pkl'
+        if getattr(self.args, 'resume', False) and os.path.exists(checkpoint):
+            with open(checkpoint, 'rb') as f:
+                sizes = pickle.load(f).get('reports')
+            if sizes is None:
+                # Checkpoint written before the reports were recorded
+                return
+            for name in self.reports:
+                path = self.tdir + '/' + name
+                if os.path.exists(path):
+                    os.truncate(path, min(sizes.get(name, 0),
+                                          os.path.getsize(path)))
+            return
+        for name in self.reports + ['evals.bin']:
+            if os.path.exists(self.tdir + '/' + name):
+                os.remove(self.tdir + '/' + name)
+
+    def save_checkpoint(self, phase, next_solver=None):
+        '''
+        Atomically writes the tuner state to checkpoint.pkl in outdir.
+        Evaluations done after the checkpoint are recovered from the
+        evaluation cache when the run is resumed.
+
+        @type self: Parameters setup in __init__
+        @param phase: 'init' after the initialization, 'bandit' after a
+        Bandit DFO pull and 'done' once the method has completed
+        @param next_solver: Next solver to pull in Bandit DFO
+        @return: checkpoint.pkl in outdir
+        '''
+        state = {'phase': phase,
+                 'incumbent': self.incumbent,
+                 'x0': list(self.x0),
+                 'elapsed': self.elapsed,
+                 'time': time.time() - self.s_time,
+                 'bandit_state': getattr(self, 'bandit_state', None),
+                 'next_solver': next_solver,
+                 'random': random.getstate(),
+                 'np_random': np.random.get_state(),
+                 'cache': self.blackbox.config['cache'],
+                 'log_rows': len(self.evallog.read()),
+                 'reports': {name: os.path.getsize(self.tdir + '/' + name)
+                             for name in self.reports
+                             if os.path.exists(self.tdir + '/' + name)}}
+        tmp = self.tdir + '/checkpoint.pkl.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.tdir + '/checkpoint.pkl')
+
+    def load_checkpoint(self):
+        '''
+        Restores the tuner state saved by save_checkpoint, the evaluation
+        log is cut back to the rows logged at the time of the checkpoint,
+        and the reports were cut back by reset_reports
+
+        @type self: Parameters setup in __init__
+        @return: Restored state and self.resume_phase
+        '''
+        if not os.path.exists(self.tdir + '/checkpoint.pkl'):
+            print('No checkpoint found, starting a new run!')
+            return
+        with open(self.tdir + '/checkpoint.pkl', 'rb') as f:
+            state = pickle.load(f)
+        self.resume_phase = state['phase']
+        self.incumbent = state['incumbent']
+        self.x0 = state['x0']
+        self.elapsed = state['elapsed']
+        self.s_time = time.time() - state['time']
+        self.bandit_state = state['bandit_state']
+        self.next_solver = state['next_solver']
+        random.setstate(state['random'])
+        np.random.set_state(state['np_random'])
+        self.evallog.truncate(state['log_rows'])
+        print('Resuming from checkpoint after ' + str(self.elapsed) +
+              ' iterations!')
 
     def init_bandit(self):
         '''
@@ -130,8 +512,10 @@ class hybClass():
         @return: Values stored in self for Bandit DFO
         '''
         try:
-            os.path.exists(self.bandit)
-            self.bandit_params = json.load(open(self.bandit))
+            if isinstance(self.bandit, dict):
+                self.bandit_params = self.bandit
+            else:
+                self.bandit_params = json.load(open(self.bandit))
         except KeyError:
             sys.exit("Bandit file does not exist, please provide one.")
         self.init = self.bandit_params['init']
@@ -139,6 +523,10 @@ class hybClass():
         self.cParam = self.bandit_params['cParam']
         self.window = self.bandit_params['window']
         self.init_limit = self.bandit_params['init_limit']
+        try:
+            self.arms = self.bandit_params['arms']
+        except KeyError:
+            self.arms = 1
         self.time_iter = self.max_cpu*self.frequency/self.limit_evals
         f = open(self.tdir + '/iteration.number', 'w')
         f.write('0')
@@ -152,100 +540,134 @@ class hybClass():
         @return: Values stored in self for Hybrid DFO
         '''
         try:
-            os.path.exists(self.hybrid)
-            self.hybrid_params = json.load(open(self.hybrid))
+            if isinstance(self.hybrid, dict):
+                self.hybrid_params = self.hybrid
+            else:
+                self.hybrid_params = json.load(open(self.hybrid))
         except KeyError:
             sys.exit("Hybrid file does not exist, please provide one.")
         self.hybrid_solver = self.hybrid_params['solver']
         self.init_limit = self.hybrid_params['init_limit']
+        # DIRECT unless hparams.json names another initialization
+        try:
+            self.init = self.hybrid_params['init']
+        except KeyError:
+            self.init = 'direct'
         f = open(self.tdir + '/iteration.number', 'w')
         f.write('0')
         f.close()
 
+    def template(self, name):
+        '''
+        @param name: File name of a Mako template of the solvers directory
+        @return: The template, compiled once per process
+        '''
+        path = self.dfo_path + '/' + name
+        if path not in hybClass.templates:
+            hybClass.templates[path] = Template(filename=path,
+                                                strict_undefined=True)
+        return hybClass.templates[path]
+
+    def write_artifact(self, name, text, executable=False):
+        '''
+        Writes a solver file to outdir unless it already holds text.
+        The solver files only depend on the run, the starting point and
+        the budget of each call are passed to the MATLAB solvers in
+        pull.dat, so the files are written once per run.
+
+        @param name: File name in outdir
+        @param text: Content of the file
+        @param executable: Makes the file executable if True
+        '''
+        path = self.tdir + '/' + name
+        if self.artifacts.get(path) == text and os.path.exists(path):
+            return
+        with open(path, 'w') as f:
+            f.write(text)
+        if executable:
+            st = os.stat(path)
+            os.chmod(path, st.st_mode | 0o111)
+        self.artifacts[path] = text
+
     def script_setup(self, solver):
         '''
         Initializes the DFO solvers that execute a script
 
         @type self: Parameters defined in __init__
         @param solver: Currently only accepts solver 10
-        @return: Setup the solver file for execution
-        '''
-        processID = os.getpid()
-        template = Template(filename=self.dfo_path + '/solver.script.mako',
-                            strict_undefined=True)
-        with open(self.tdir + '/' + str(solver) + '.script', "w") as f:
-            f.write(template.render(nvars=self.nvars, PID=processID,
-                                    executable=self.dirpath + '/' +
-                                    self.executable, start_time=self.s_time,
-                                    input=self.input, output=self.output,
-                                    printopt=self.printopt,
-                                    limit_evals=self.frequency,
-                                    global_tolerance=self.global_tolerance,
-                                    global_solution=self.global_solution))
-            f.close()
-        st = os.stat(self.tdir + '/' + str(solver) + '.script')
-        os.chmod(self.tdir + '/' + str(solver) + '.script', st.st_mode | 0o111)
+        @return: Setup the solver file for execution, the script is the
+        evaluator called by HOPSPACK, see hopspackEval
+        '''
+        path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        self.write_artifact(str(solver) + '.script',
+                            self.template('solver.script.mako').render(
+                                python=sys.executable, path=path,
+                                config=self.blackbox_config,
+                                nvars=self.nvars,
+                                start_time=self.s_time,
+                                printopt=self.printopt,
+                                threads=self.hopspack_threads),
+                            executable=True)
 
     def matlab_setup(self, solver):
         '''
         Initialize DFO solvers that use MATLAB,
-        only works if self.matlab = True
+        only works if self.matlab = True.
+        matlab_main_<solver>.m runs matlab_main1.m, which sets the
+        bounds and reads the starting point and the budget of the call
+        from pull.dat, the solver script written by dfoClass and
+        matlab_main3.m. Only pull.dat changes between calls.
 
         @type self: Parameters defined in __init__
-        @param solver: Accepts number for MATLAB solvers (8 or 15)
-        @return: Matlab scripts to run solver 8 or 15
+        @param solver: Accepts number for MATLAB solvers (7, 8 or 15)
+        @return: Matlab scripts to run solver 7, 8 or 15
         '''
-        f3 = open(self.tdir + '/matlab_main3.m', 'w')
-        f3.write('clear all\n')
-        f3.write('quit;\n')
-        f3.close()
+        with open(self.tdir + '/pull.dat', 'w') as f:
+            f.write(' '.join(repr(float(v)) for v in
+                             [self.pull_evals, self.pull_time] +
+                             list(self.x0)) + '\n')
+
+        if self.matlab_session:
+            self.write_artifact('matlab_main3.m', 'clear all\n')
+            stop = "error('HybridTuner:stop', 'Solver stopped');"
+        else:
+            self.write_artifact('matlab_main3.m', 'clear all\nquit;\n')
+            stop = 'exit'
 
         var_params = ''
-        for i in range(self.nvars):
-            lb = str(self.lb[i])
-            ub = str(self.ub[i])
-            x0 = str(self.x0[i])
-            ints = str(self.ints[i])
-            idx = str(i+1)
-            var_params = (var_params + 'bl(' + idx + ') = ' + lb + ';\n' +
-                          'bu(' + idx + ') = ' + ub + ';\n')
-            var_params = (var_params + 'x_0(' + idx + ') = ' + x0 + ';\n' +
-                          'ints(' + idx + ') = ' + ints + ';\n')
-
-        template = Template(filename=self.dfo_path + '/matlab_main1.m.mako',
-                            strict_undefined=True)
-        with open(self.tdir + '/matlab_main1.m', "w") as f:
-            f.write(template.render(var_params=var_params,
-                                    global_solution=self.global_solution,
-                                    global_tolerance=self.global_tolerance))
+        for name, values in [('bl', self.lb), ('bu', self.ub),
+                             ('ints', self.ints)]:
+            var_params += (name + ' = [' +
+                           ' '.join(str(v) for v in values) + '];\n')
+        self.write_artifact('matlab_main1.m',
+                            self.template('matlab_main1.m.mako').render(
+                                var_params=var_params,
+                                global_solution=self.global_solution,
+                                global_tolerance=self.global_tolerance))
 
         if solver == 7:
             inPair = 'data, x'
         else:
             inPair = 'x, Prob'
-        fin_loop = ''
-        for i in range(self.nvars):
-            fin_loop += "fprintf(fin, '%30.15f\\n', x(" + str(i+1) + "));\n"
-
-        template = Template(filename=self.dfo_path + '/func_f.m.mako',
-                            strict_undefined=True)
-        with open(self.tdir + '/func_f.m', "w") as f:
-            f.write(template.render(fin_loop=fin_loop,
-                                    nvars=self.nvars,
-                                    limit_evals=self.frequency,
-                                    executable=self.dirpath+'/'
-                                    + self.executable, inPair=inPair))
-            filenames = [self.tdir + '/matlab_main1.m',
-                         self.tdir + '/matlab_main2.m',
-                         self.tdir + '/matlab_main3.m']
-        with open(self.tdir + '/matlab_main.m', 'wb') as wfd:
-            for f in filenames:
-                with open(f, 'rb') as fd:
-                    shutil.copyfileobj(fd, wfd)
+        self.write_artifact('func_f.m',
+                            self.template('func_f.m.mako').render(
+                                nvars=self.nvars,
+                                executable=self.blackbox_cmd,
+                                inPair=inPair))
+        self.write_artifact('func_record.m',
+                            self.template('func_record.m.mako').render(
+                                stop=stop))
+        self.write_artifact('func_batch.m',
+                            self.template('func_batch.m.mako').render(
+                                nvars=self.nvars,
+                                executable=self.blackbox_cmd))
+        self.write_artifact('matlab_main_' + str(solver) + '.m',
+                            'matlab_main1\nmatlab_solver_' + str(solver) +
+                            '\nmatlab_main3\n')
 
     def dfo_iteration(self, solver):
         '''
-        Executes one call to DFO solver 7, 8, 10, or 15
+        Executes one call to DFO solver 7, 8, 10, 15 or 20 to 24
 
         @type self: Parameters setup in __init__
         @param solver: Number of DFO solver to call
@@ -253,38 +675,84 @@ class hybClass():
         evals.res if printopt = 1
         '''
         if solver == 7 or solver == 8 or solver == 15:
-            self.matlab_setup(solver)
-            fun = '-r "addpath(\'' + self.tdir + '\'); matlab_main; exit"'
-            cmd = ['matlab', '-nodisplay', '-nosplash', fun]
-            with open(self.tdir + '/' + str(solver)
-                      + '.results', "w") as outfile:
-                subprocess.run(cmd, timeout=self.time_iter, stdout=outfile)
+            with self.trace.span('matlab_setup', solver=solver):
+                self.matlab_setup(solver)
+            if self.matlab_session:
+                if self.session is None:
+                    with self.trace.span('matlab_start', 'solver'):
+                        self.session = matlabSession(self.tdir)
+                with self.trace.span('solver', 'solver', solver=solver):
+                    self.session.run('matlab_main_' + str(solver),
+                                     str(solver) + '.results',
+                                     self.pull_time)
+            else:
+                fun = ('-r "addpath(\'' + self.tdir + '\'); matlab_main_' +
+                       str(solver) + '; exit"')
+                cmd = ['matlab', '-nodisplay', '-nosplash', fun]
+                with open(self.tdir + '/' + str(solver)
+                          + '.results', "w") as outfile:
+                    with self.trace.span('solver', 'solver', solver=solver):
+                        self.budget.run(cmd, self.pull_time, outfile,
+                                        self.tdir)
         elif solver == 10:
-            self.script_setup(solver)
-            cmd = [self.dfo_path + '/HOPSPACK_main_serial',
-                   'hopspack_input.in', '&']
+            with self.trace.span('script_setup', solver=solver):
+                self.script_setup(solver)
+            cmd = [self.dfo_path + '/' + self.hopspack_main(),
+                   'hopspack_input.in']
             with open(self.tdir + '/' + str(solver)
                       + '.results', "w") as outfile:
-                subprocess.run(cmd, timeout=self.time_iter, stdout=outfile)
+                with self.trace.span('solver', 'solver', solver=solver):
+                    self.budget.run(cmd, self.pull_time, outfile, self.tdir)
+        elif solver in pySolvers.solvers:
+            with self.trace.span('solver', 'solver', solver=solver):
+                self.pysolvers.run(solver, self.x0, self.lb, self.ub,
+                                   self.ints, self.pull_evals,
+                                   self.pull_time)
 
-    def update_x0(self):
+    def hopspack_main(self):
+        '''
+        @return: Name of the HOPSPACK executable in the solvers directory,
+        the multithreaded one if hopspack_threads > 1
+        '''
+        if self.hopspack_threads > 1:
+            if os.path.exists(self.dfo_path + '/HOPSPACK_main_threaded'):
+                return 'HOPSPACK_main_threaded'
+            print('HOPSPACK_main_threaded not found in ' + self.dfo_path +
+                  ', HOPSPACK runs serially!')
+        return 'HOPSPACK_main_serial'
+
+    def update_x0(self, wdir=None, best=None):
         '''
         Updates the best solution and parameters to obtain it
         after running a DFO iteration
 
         @type self: Parameters setup in __init__
+        @param wdir: Directory the DFO solver ran in, outdir if None
+        @param best: Best value and point of a native solver call, the
+        external solvers leave them in best_objective and best_solution
         @return: Update to self.x0 and self.incumbent
         '''
-        fn = open('best_objective', 'r')
-        curr = float(fn.read())
-        fn.close()
+        if best is not None:
+            curr, raw_x0 = best
+        else:
+            if wdir is None:
+                wdir = self.tdir
+            if not os.path.exists(wdir + '/best_objective'):
+                return
+            fn = open(wdir + '/best_objective', 'r')
+            curr = float(fn.read())
+            fn.close()
+            raw_x0 = None
 
         if (curr < self.incumbent):
             self.incumbent = curr
-            raw_x0 = np.loadtxt(fname='best_solution', ndmin=1)
+            if raw_x0 is None:
+                raw_x0 = np.loadtxt(fname=wdir + '/best_solution', ndmin=1)
             for i in range(0, len(self.x0)):
                 if self.ints[i] == 1:
                     self.x0[i] = round(raw_x0[i])
+                else:
+                    self.x0[i] = float(raw_x0[i])
 
     def run_tuning_iteration(self, solver, dfo):
         '''
@@ -294,48 +762,118 @@ class hybClass():
         @param solver: Number of DFO solver to invoke
         @param dfo: dfoClass see dfo_solvers for more info.
         @return: Updates to self.x0, self.incumbent
-        and history of the iterations if printopt = 1
+        and history of the iterations if printopt = 1,
+        returns the number of evaluations of the call
         '''
-        try:
-            dfo.call_dfo(solver)
-        except KeyError:
-            print('Error producing solver files!')
+        with self.trace.span('run_tuning_iteration', solver=solver):
+            self.pull_evals, self.pull_time = self.budget.allot(
+                self.frequency, self.time_iter)
+            evals = self.pull(solver, dfo)
+            with self.trace.span('update_x0'):
+                self.update_x0(best=self.pulled_best)
+            return self.record(solver, evals)
+
+    def pull(self, solver, dfo):
+        '''
+        Runs one call to a DFO solver in outdir with the budget
+        self.pull_evals and self.pull_time
+
+        @type self: Parameters setup in __init__
+        @param solver: Number of DFO solver to invoke
+        @param dfo: dfoClass see dfo_solvers for more info.
+        @return: Evaluations of the call in the evals.res format
+        '''
+        with self.trace.span('call_dfo', solver=solver):
+            try:
+                dfo.call_dfo(solver)
+            except KeyError:
+                print('Error producing solver files!')
 
         self.dfo_iteration(solver)
-        fn = open('evals.res', 'r')
-        evals = np.genfromtxt(fn)
-        if np.size(evals, 1) > 1:
-            df = pd.DataFrame(evals)
+        res = self.tdir + '/evals.res'
+        self.pulled_best = None
+        if solver in pySolvers.solvers:
+            evals = self.pysolvers.evals
+            if self.pysolvers.xbest is not None:
+                self.pulled_best = (self.pysolvers.fbest,
+                                    self.pysolvers.xbest)
+        elif os.path.exists(res):
+            with self.trace.span('parse_evals', solver=solver):
+                try:
+                    evals = np.loadtxt(res, ndmin=2)
+                except ValueError:
+                    # The last row was cut short when the solver was killed
+                    evals = np.atleast_2d(np.genfromtxt(res,
+                                                        invalid_raise=False))
+            os.remove(res)
         else:
-            df = pd.DataFrame(evals).T
-
-        dfI = df.astype({0: 'int32'})
-        elapsed = int(dfI.tail(1)[0])
-        dfI[0] = dfI[0] + self.elapsed
-        if (len(dfI.columns) > self.nvars+3):
-            dfI = dfI.drop([self.nvars+3], axis=1) # Drop column with best iteration and only keep current iteration
-        dfI = dfI.drop([1], axis=1)  # Drop odd column
-        fn.close()
-        fsolve = open(str(solver) + '.res', 'a')
-        data = dfI.to_string(index=False, header=False) + '\n'
-        fsolve.write(data)
-        fsolve.close()
-        fall = open('allEvals.res', 'a')
-        fall.write(data)
-        fall.close()
-        self.update_x0()
+            evals = np.empty((0, self.nvars+3))
+        return evals
+
+    def record(self, solver, evals):
+        '''
+        Adds the evaluations of one DFO solver call to the run,
+        partial results of a solver that ran out of budget are kept
+
+        @type self: Parameters setup in __init__
+        @param solver: Number of DFO solver that was invoked
+        @param evals: Evaluations of the call, see pull
+        @return: Number of evaluations of the call
+        '''
+        if len(evals) == 0:
+            self.last_values = np.empty(0)
+            return 0
+
+        with self.trace.span('record', solver=solver):
+            return self.append_evals(solver, evals)
+
+    def append_evals(self, solver, evals):
+        '''
+        @param solver: Number of DFO solver that was invoked
+        @param evals: Evaluations of the call, not empty
+        @return: Number of evaluations of the call
+        '''
+        elapsed = int(evals[-1, 0])
+        # Column nvars+2 is the objective of the evaluation, except for the
+        # MATLAB solvers which only report the best objective of the call
+        values = evals[:, self.nvars+2]
+        # Column nvars+4, if present, is the duration of the evaluation
+        seconds = np.nan
+        if evals.shape[1] > self.nvars+4:
+            seconds = evals[:, self.nvars+4]
+        X = evals[:, 2:self.nvars+2]
+        self.evallog.append(evals[:, 0] + self.elapsed, evals[:, 1], solver,
+                            X, values, seconds,
+                            self.blackbox.pruned_flags(X),
+                            self.blackbox.screened_flags(X))
+        self.last_values = values
         self.elapsed += elapsed
-        try:
-            os.remove('evals.res')
-        except KeyError:
-            print('evals.res does not exist')
 
         return elapsed
 
+    def check_solver(self, solver):
+        '''
+        Refuses an external solver when the wrapper scripts it evaluates
+        through cannot reach the objective, a callable that is not
+        importable or the ask/tell mode of tuner
+
+        @type self: Parameters setup in __init__
+        @param solver: Number of DFO solver, None or 0 if not chosen
+        '''
+        if (solver and not self.external and
+                int(solver) not in pySolvers.solvers):
+            raise ValueError('Solver ' + str(solver) + ' cannot reach the '
+                             'objective, use one of the solvers ' +
+                             str(pySolvers.solvers) + ' or provide the '
+                             'objective as an executable or an import '
+                             'string "module:function".')
+
     def hybInit(self, dfo):
         '''
         Execute the global DFO strategy to init Bandit DFO and Hybrid DFO.
-        Only works for DIRECT (from NLOPT) or MCS if self.matlab = True.
+        Accepts DIRECT, see pyOpt, MCS if self.matlab = True, or a
+        space-filling design of init_limit points, 'lhs' for a Latin
+        hypercube or 'sobol' for a Sobol' sequence, see design.
 
         @type self: Parameters setup in __init__
         @type dfo: dfoClass that creates DFO scripts
@@ -343,18 +881,88 @@ class hybClass():
         '''
         if self.init == 'direct':
             nlo = pyOpt(self)
-            self.x0, self.incumbent, self.elapsed = nlo.direct(self.init_limit,
-                                                               self.time_iter,
-                                                               self.nvars)
-            for i in range(0, len(self.x0)):
-                if self.ints[i] == 1:
-                    self.x0[i] = round(self.x0[i])
+            evals, seconds = self.budget.allot(self.init_limit, self.time_iter)
+            region = None
+            if self.warm is not None and self.warm_start_region:
+                region = self.warm.region(self.warm_start_region)
+            if region is None:
+                region = (None, None)
+            # Evaluations still running when the slice expires are killed
+            with self.blackbox.deadline(seconds):
+                x0, curr, self.elapsed = nlo.direct(evals, seconds,
+                                                    self.nvars, *region)
+            # A warm start incumbent is kept unless DIRECT improves on it
+            if curr < self.incumbent:
+                self.x0, self.incumbent = x0, curr
+                for i in range(0, len(self.x0)):
+                    if self.ints[i] == 1:
+                        self.x0[i] = round(self.x0[i])
+        elif self.init == 'lhs' or self.init == 'sobol':
+            evals, seconds = self.budget.allot(self.init_limit, self.time_iter)
+            if evals > 0:
+                with self.blackbox.deadline(seconds):
+                    self.design_init(evals)
         elif self.init == 'mcs':
             if self.matlab:
+                self.check_solver(7)
                 self.run_tuning_iteration(7, dfo)
             else:
                 print('MCS cannot be used if MATLAB is not installed!')
 
+    def design_init(self, n):
+        '''
+        Evaluates a space-filling design as one batch. The whole design
+        is logged and cached, so later solvers and the surrogate reuse it.
+        With a fidelity the design is run through successive halving,
+        only the candidates promoted to full fidelity are logged and the
+        incumbent is the best of them.
+
+        @type self: Parameters setup in __init__
+        @param n: Number of points of the design, or of full evaluations
+        of the successive halving schedule
+        @return: Update to self.x0, self.incumbent and self.elapsed
+        '''
+        if self.fidelity:
+            sh = successiveHalving(self.fidelity, self.blackbox)
+            m = sh.candidates(n)
+            if m == 0:
+                return
+            X = design(self.init, m, self.lb, self.ub, self.ints)
+            try:
+                X, F, cost = sh.run(X)
+            except evaluationExpired:
+                print('The ' + self.init + ' design did not reach full '
+                      'fidelity within its time slice and is skipped!')
+                return
+            sh.write(self.tdir + '/promotions.json')
+            evals = max(int(math.ceil(cost - 1e-9)), len(F))
+        else:
+            X = design(self.init, n, self.lb, self.ub, self.ints)
+            try:
+                F = np.asarray(self.blackbox.evaluate_batch(list(X)))
+            except evaluationExpired as err:
+                # The points evaluated before the deadline are kept
+                done = [f is not None for f in err.values]
+                X = X[done]
+                F = np.array([f for f in err.values if f is not None])
+                print('The ' + self.init + ' design was cut short by its '
+                      'time slice after ' + str(len(F)) + ' of ' + str(n) +
+                      ' points!')
+            evals = len(F)
+        if len(F) == 0:
+            return
+        # Iterations count full evaluations, the promoted candidates are
+        # the last evaluations of the schedule
+        self.evallog.append(evals - len(F) + np.arange(1, len(F)+1),
+                            time.time() - self.s_time, 0, X, F,
+                            pruned=self.blackbox.pruned_flags(X),
+                            surrogate=self.blackbox.screened_flags(X))
+        best = np.argmin(F)
+        if F[best] < self.incumbent:
+            self.incumbent = float(F[best])
+            self.x0 = [float(x) for x in X[best]]
+        self.elapsed = evals
+
     def BanditDFO(self, dfo):
         '''
         Performs Bandit DFO. This will run different solvers until terminating.
@@ -364,71 +972,154 @@ class hybClass():
         @return: Performs Bandit DFO and outputs results interpretable
         by self.visualizeResults
         '''
-        self.hybInit(dfo)
-        if self.matlab:
+        self.check_solver(self.solver)
+        if self.resume_phase is None:
+            with self.trace.span('hybInit', init=self.init):
+                self.hybInit(dfo)
+            self.save_checkpoint('init')
+        if not self.external:
+            solvers = list(pySolvers.solvers)
+        elif self.matlab:
             # The following are the list of solvers that we that accept x0
-            solvers = [8, 10, 15]
+            solvers = [8, 10, 15] + pySolvers.solvers
         else:
-            solvers = [10]  # Bandit = Hybrid if Matlab is not installed
-        if self.solver:
-            next_solver = int(self.solver)
+            solvers = [10] + pySolvers.solvers
+        if self.resume_phase in ['bandit', 'done']:
+            next_solver = self.next_solver
         else:
-            next_solver = solvers[random.randint(0, len(solvers)-1)]
-        AUC = {}
-        score = {}
-        Ht = {}
-        for i in solvers:
-            AUC[i] = 2
-            score[i] = 2
-            Ht[i] = 0
-
-        func_evals = pd.DataFrame([0, 0, 0])
-        period = 0
+            self.bandit_state = banditState(solvers, self.window,
+                                            self.cParam)
+            if self.warm is not None:
+                self.warm.priors(self.bandit_state)
+            if self.solver:
+                next_solver = int(self.solver)
+            elif self.bandit_state.prior_Ht.any():
+                next_solver = self.bandit_state.select()
+            else:
+                next_solver = solvers[random.randint(0, len(solvers)-1)]
+        if self.arms > 1:
+            self.BanditAsync(dfo, next_solver)
+            return
         # The following is the main loop of the bandit function
-        while self.elapsed < self.limit_evals:
+        while (self.resume_phase != 'done' and
+               not self.budget.expired()):
             fminus = self.run_tuning_iteration(next_solver, dfo)
             if self.incumbent == self.global_solution:
                 break
-            H = self.elapsed
-            buff = 0
-            if (self.elapsed-self.window > 0):
-                buff = self.elapsed - self.window
-                H = self.window
-            for k in range(len(solvers)):
-                idx = solvers[k]
-                if next_solver == idx:
-                    func_evals.loc[k, round(period)] = fminus
-                # Calculate the Ht term:
-                Ht[idx] = sum(func_evals.loc[k])
-                # Append a new column to the dataframe if another iteration
-                period += 1
-                func_evals[period] = 0
-
-                # Now we calculate Vti
-                try:
-                    fn = open(str(idx) + '.res', 'r')
-                    data = np.genfromtxt(fn)
-                    small = data[buff][-1]
-                    Vti = []
-                    for j in range(buff, len(data)):
-                        if (data[j][-1] < small):
-                            Vti.append(j-buff)
-                    lhs = 2/(H*(H+1))
-                    rhs = sum(Vti)
-                    AUC[idx] = lhs*rhs
-                except FileNotFoundError:
-                    AUC[idx] = 0
-
-                if (Ht[idx] != 0):
-                    score[idx] = self.cParam*math.sqrt(2*math.log(
-                        self.elapsed-buff)/Ht[idx]+AUC[idx])
+            with self.trace.span('score', 'bandit', solver=next_solver):
+                if fminus == 0 and not self.budget.expired():
+                    print('Solver ' + str(next_solver) + ' failed to '
+                          'evaluate any point and is removed from the '
+                          'bandit!')
+                    self.bandit_state.disable(next_solver)
                 else:
-                    score[idx] = 100
+                    self.bandit_state.update(next_solver, fminus,
+                                             self.last_values, self.elapsed)
+                next_solver = self.bandit_state.select()
+            if next_solver is None:
+                break
+            self.save_checkpoint('bandit', next_solver)
+        self.save_checkpoint('done', next_solver)
+        self.close_session()
+
+    def arm(self, slot, dfo):
+        '''
+        Prepares a concurrent Bandit DFO arm. The arm is a copy of the
+        tuner that runs in its own directory outdir/arm.<slot>, starting
+        from the current incumbent, with its own solver files.
+
+        @type self: Parameters setup in __init__
+        @param slot: Number of the arm slot
+        @param dfo: dfoClass of the tuner
+        @return: Copy of the tuner and its dfoClass
+        '''
+        tune = copy.copy(self)
+        tune.tdir = self.tdir + '/arm.' + str(slot)
+        if not os.path.exists(tune.tdir):
+            os.mkdir(tune.tdir)
+        tune.x0 = list(self.x0)
+        tune.incumbent = 1000000.00
+        tune.pysolvers = pySolvers(tune)
+        # Concurrent MATLAB solvers cannot share one session
+        tune.matlab_session = 0
+        tune.session = None
+        tune.pull_evals, tune.pull_time = self.budget.allot(self.frequency,
+                                                            self.time_iter)
+        for name in ['best_objective', 'best_solution']:
+            if os.path.exists(tune.tdir + '/' + name):
+                os.remove(tune.tdir + '/' + name)
+        f = open(tune.tdir + '/iteration.number', 'w')
+        f.write('0')
+        f.close()
+        return tune, type(dfo)(tune)
 
-            # Select next solver
-            maxValue = max(score.values())
-            keys = [key for key, value in score.items() if value == maxValue]
-            next_solver = random.choice(keys)
+    def BanditAsync(self, dfo, next_solver):
+        '''
+        Performs Bandit DFO with self.arms solvers running concurrently.
+        Whenever an arm completes, its evaluations are added to the run
+        and to the scores of the bandit, and the freed slot is given the
+        best scored arm that is not running, started from the incumbent.
+
+        @type self: Parameters setup in __init__
+        @type dfo: dfoClass that creates DFO scripts
+        @param next_solver: First DFO solver to pull
+        @return: Performs Bandit DFO and outputs results interpretable
+        by self.visualizeResults
+        '''
+        pool = ThreadPoolExecutor(self.arms)
+        running = {}
+        free = list(range(self.arms))
+        stop = self.resume_phase == 'done'
+        try:
+            while True:
+                while free and not stop and not self.budget.expired():
+                    if next_solver is None:
+                        next_solver = self.bandit_state.select(
+                            [arm[2] for arm in running.values()])
+                        if next_solver is None:
+                            break
+                    slot = free.pop(0)
+                    tune, tdfo = self.arm(slot, dfo)
+                    self.budget.reserved += tune.pull_evals
+                    future = pool.submit(tune.pull, next_solver, tdfo)
+                    running[future] = (slot, tune, next_solver)
+                    next_solver = None
+                if not running:
+                    break
+
+                done, pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    slot, tune, solver = running.pop(future)
+                    free.append(slot)
+                    self.budget.reserved -= tune.pull_evals
+                    evals = future.result()
+                    with self.trace.span('update_x0'):
+                        self.update_x0(tune.tdir, tune.pulled_best)
+                    fminus = self.record(solver, evals)
+                    if self.incumbent == self.global_solution:
+                        stop = True
+                    with self.trace.span('score', 'bandit', solver=solver):
+                        if fminus == 0 and not self.budget.expired():
+                            print('Solver ' + str(solver) + ' failed to '
+                                  'evaluate any point and is removed from the '
+                                  'bandit!')
+                            self.bandit_state.disable(solver)
+                        else:
+                            self.bandit_state.update(solver, fminus,
+                                                     self.last_values,
+                                                     self.elapsed)
+                with self.trace.span('select', 'bandit'):
+                    next_solver = self.bandit_state.select(
+                        [arm[2] for arm in running.values()])
+                if next_solver is None and not running:
+                    break
+                self.save_checkpoint('bandit', next_solver)
+        finally:
+            # Arms still running after an error are left to their time
+            # slices, the ones not started yet are cancelled
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.save_checkpoint('done', next_solver)
+        self.close_session()
 
     def HybridDFO(self, dfo):
         '''
@@ -439,8 +1130,15 @@ class hybClass():
         @return: Performs Hybrid DFO and outputs results interpretable
         by self.visualizeResults
         '''
-        self.hybInit(dfo)
-        self.run_tuning_iteration(self.hybrid_solver, dfo)
+        self.check_solver(self.hybrid_solver)
+        if self.resume_phase is None:
+            with self.trace.span('hybInit', init=self.init):
+                self.hybInit(dfo)
+            self.save_checkpoint('init')
+        if self.resume_phase != 'done' and not self.budget.expired():
+            self.run_tuning_iteration(self.hybrid_solver, dfo)
+        self.save_checkpoint('done')
+        self.close_session()
 
     def SingleSolver(self, dfo):
         '''
@@ -452,11 +1150,23 @@ class hybClass():
         by self.visualizeResults
         '''
         solver = int(self.solver)
+        self.check_solver(solver)
         f = open(self.tdir + '/iteration.number', 'w')
         f.write('0')
         f.close()
 
-        self.run_tuning_iteration(solver, dfo)
+        if self.resume_phase != 'done':
+            self.run_tuning_iteration(solver, dfo)
+            self.save_checkpoint('done')
+        self.close_session()
+
+    def close_session(self):
+        '''
+        Ends the MATLAB session kept by matlab_session = 1, if any
+        '''
+        if self.session is not None:
+            self.session.close()
+            self.session = None
 
     def visualizeResults(self, method):
         '''
@@ -468,6 +1178,8 @@ class hybClass():
         @return: Produces .jpg to display tuning performance over time
         and summarizes results as output
         '''
+        # Wall time of the run, the reporting below is not included
+        wall = time.time() - self.s_time
         if method == 'Bandit':
             print('BanditDFO has completed!')
             print('Best Solution = ' + str(self.incumbent) + ' found after ' +
@@ -483,19 +1195,50 @@ class hybClass():
             print('Best Solution = ' + str(self.incumbent) + ' found after ' +
                   str(self.elapsed) + ' iterations!')
 
-        fn = open('allEvals.res', 'r')
-        data = np.genfromtxt(fn)
-        xtmp = data[:, 0]
-        ytmp = data[:, -1]
-        y0 = ytmp[0]
-        y = []
-        x = xtmp.tolist()
-        for i in ytmp:
-            if i <= y0:
-                y0 = i
-            y.append(y0)
-
-        plt.scatter(x, y)
-        plt.xlabel('Iteration Number')
-        plt.ylabel('Objective Value')
-        plt.savefig('evalsPlot')
+        if os.path.exists(self.tdir + '/cacheHits.res'):
+            fn = open(self.tdir + '/cacheHits.res', 'r')
+            hits = sum(1 for line in fn)
+            fn.close()
+            print('Cache hits = ' + str(hits) + ' of ' + str(self.elapsed) +
+                  ' iterations!')
+        else:
+            hits = 0
+        if os.path.exists(self.tdir + '/surrogate.res'):
+            fn = open(self.tdir + '/surrogate.res', 'r')
+            screened = sum(1 for line in fn)
+            fn.close()
+            print('Surrogate evaluations = ' + str(screened) +
+                  ', real evaluations = ' +
+                  str(self.elapsed - hits - screened) + '!')
+        if os.path.exists(self.tdir + '/pruned.res'):
+            fn = open(self.tdir + '/pruned.res', 'r')
+            pruned = sum(1 for line in fn)
+            fn.close()
+            print('Pruned evaluations = ' + str(pruned) + ' of ' +
+                  str(self.elapsed) + ' iterations!')
+
+        self.evallog.export()
+        # The plot is downsampled, long runs log millions of evaluations
+        x, y, seconds, timed = self.evallog.profile(self.plot_points)
+        if timed > 0:
+            print('Black-box time = ' + '%.2f' % seconds + ' s in ' +
+                  str(timed) + ' timed evaluations, wall time = ' +
+                  '%.2f' % wall + ' s!')
+
+        # A figure of its own, pyplot keeps one current figure per process
+        fig = Figure()
+        ax = fig.add_subplot()
+        ax.scatter(x, y)
+        ax.set_xlabel('Iteration Number')
+        ax.set_ylabel('Objective Value')
+        fig.savefig(self.tdir + '/evalsPlot')
+
+        rows = self.trace.summary()
+        if rows:
+            print('%-10s %-22s %7s %10s %10s %10s %6s' %
+                  ('Category', 'Span', 'Count', 'Total (s)', 'Mean (ms)',
+                   'Max (ms)', 'Wall'))
+            for cat, name, count, total, longest in rows:
+                print('%-10s %-22s %7d %10.3f %10.3f %10.3f %5.1f%%' %
+                      (cat, name, count, total, 1e3*total/count,
+                       1e3*longest, 100*total/max(wall, 1e-9)))
@@ -0,0 +1,83 @@
+import os
+import signal
+import subprocess
+import time
+
+
+class matlabSession():
+    '''
+    Long-lived MATLAB process fed through a pipe, so the MATLAB startup
+    is paid once per tuning run instead of once per DFO solver call.
+    Each call runs the matlab_main_<solver>.m script of the solver and
+    signals completion by creating matlab.done in outdir. The session is
+    restarted when MATLAB dies or a call exceeds its time limit.
+    '''
+    def __init__(self, tdir):
+        self.tdir = tdir
+        self.proc = None
+        self.starts = 0
+
+    def start(self):
+        self.proc = subprocess.Popen(['matlab', '-nodisplay', '-nosplash'],
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.DEVNULL,
+                                     cwd=self.tdir, text=True,
+                                     start_new_session=True)
+        self.send("addpath('" + self.tdir + "');")
+        self.starts += 1
+
+    def send(self, command):
+        self.proc.stdin.write(command + '\n')
+        self.proc.stdin.flush()
+
+    def run(self, script, results, timeout):
+        '''
+        Runs a script of outdir in the session
+
+        @param script: Name of the script, without .m
+        @param results: Name of the file receiving the MATLAB output
+        @param timeout: Max amount of time in seconds for the call
+        @return: True if the script completed within timeout
+        '''
+        if self.proc is None or self.proc.poll() is not None:
+            self.start()
+        done = self.tdir + '/matlab.done'
+        if os.path.exists(done):
+            os.remove(done)
+        if os.path.exists(self.tdir + '/' + results):
+            os.remove(self.tdir + '/' + results)
+        # clear all and rehash pick up the rewritten solver files
+        self.send("clear all; rehash; diary('" + results + "'); "
+                  "try, " + script + "; catch err, disp(err.message); end; "
+                  "diary off; fid = fopen('matlab.done', 'w'); fclose(fid);")
+        end = time.time() + timeout
+        while not os.path.exists(done):
+            if self.proc.poll() is not None:
+                self.proc = None
+                return False
+            if time.time() > end:
+                self.close(kill=True)
+                return False
+            time.sleep(0.1)
+        return True
+
+    def close(self, kill=False):
+        '''
+        Ends the session, killing MATLAB and the black-box calls
+        it started if kill is True
+        '''
+        if self.proc is None:
+            return
+        try:
+            if kill:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            else:
+                try:
+                    self.send('exit')
+                    self.proc.wait(timeout=60)
+                except (OSError, subprocess.TimeoutExpired):
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.proc.wait()
+        self.proc = None
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+
+
+class curvePruner():
+    '''
+    Decides when a running evaluation is hopeless, from the intermediate
+    objective values the black-box appends to its output file, one per
+    line, the last line being the final objective value.
+    A running curve of k values is pruned only if its best value so far
+    is above the best final value of the completed curves, so a pruned
+    evaluation never holds the incumbent, and if, among the completed
+    curves with at least k values:
+    median: its best value so far is above the median of their best
+    values over the first k steps (Golovin et al., 2017)
+    bound: its best value so far minus the largest improvement any of
+    them made after step k is still above the best final value
+    No curve is pruned before warmup values or before min_curves curves
+    are completed. Completed curves are appended to outdir/curves.res,
+    so the evaluators started by HOPSPACK and MATLAB share them.
+    '''
+    poll = 0.1
+
+    def __init__(self, rule='median', warmup=2, min_curves=5, path=None):
+        '''
+        @param rule: 'median' or 'bound'
+        @param warmup: Number of values before a curve can be pruned
+        @param min_curves: Number of completed curves before pruning
+        @param path: Location of curves.res, None keeps them in memory
+        '''
+        self.rule = rule
+        self.warmup = warmup
+        self.min_curves = min_curves
+        self.path = path
+        self.curves = []
+        self.best = None
+        if path and os.path.exists(path):
+            fn = open(path, 'r')
+            for line in fn:
+                if line.strip():
+                    self.add([float(v) for v in line.split()], False)
+            fn.close()
+
+    def observe(self, f_out):
+        '''
+        @param f_out: Value of a full evaluation, bounds the incumbent
+        '''
+        if self.best is None or f_out < self.best:
+            self.best = f_out
+
+    def add(self, curve, save=True):
+        '''
+        @param curve: Values of a completed evaluation
+        @param save: Appends the curve to curves.res if True
+        '''
+        if not curve:
+            return
+        self.curves.append(curve)
+        self.observe(curve[-1])
+        if save and self.path and os.path.isdir(os.path.dirname(self.path)):
+            line = ' '.join('%.15g' % v for v in curve) + '\n'
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                         0o644)
+            os.write(fd, line.encode())
+            os.close(fd)
+
+    def prune(self, curve):
+        '''
+        @param curve: Values of a running evaluation so far
+        @return: True if the evaluation should be stopped
+        '''
+        k = len(curve)
+        if k < self.warmup or k == 0 or self.best is None:
+            return False
+        value = min(curve)
+        if value <= self.best:
+            return False
+        ref = [c for c in self.curves if len(c) >= k]
+        if len(ref) < self.min_curves:
+            return False
+        if self.rule == 'bound':
+            drop = max(min(c[:k]) - min(c) for c in ref)
+            return value - drop > self.best
+        return value > np.median([min(c[:k]) for c in ref])
@@ -1,42 +1,190 @@
-import nlopt
-import subprocess
+import math
+import time
+import numpy as np
+from hybrid_tuner.budgetScheduler import evaluationExpired
 
 
 class pyOpt():
+    '''
+    DIRECT-L (Gablonsky and Kelley, 2001) written with NumPy.
+    The box [lb, ub] is scaled to the unit hypercube and split into
+    hyperrectangles, box j has its center c_j, the value f_j at the
+    center and the level k_ij of each side, side i of box j is 3^-k_ij
+    long. Each iteration selects the potentially optimal boxes, one per
+    box size, and trisects their longest sides. All new centers of an
+    iteration are evaluated together with blackBox.evaluate_batch, so
+    they run concurrently on the evaluation pool when max_workers > 1.
+    Integer variables are rounded before evaluation and a side of an
+    integer variable is no longer divided once the new centers would
+    be less than half a unit apart.
+    '''
+    eps = 1e-4
+
     def __init__(self, hybClass):
         self.hybClass = hybClass
         self.iter = 0
 
-    def f(self, x, grad):
-        fn = open(self.hybClass.tdir + '/' + self.hybClass.input, "w")
-        for i in x:
-            fn.write(str(i) + '\n')
-        fn.close()
-        subprocess.run([self.hybClass.dirpath + '/' +
-                        self.hybClass.executable], shell=True)
-        fn = open(self.hybClass.tdir + '/' + self.hybClass.output, "r")
-        f_out = fn.readline()
-        fn.close()
-        self.iter = self.iter + 1
-        fn = open(self.hybClass.tdir + '/' + 'allEvals.res', "a")
-        fn.write(str(self.iter) + '   ' + '   '.join('%.5f' % i for i in x)  +
-                 '   ' + '%.5f\n' % float(f_out))
-        fn.close()
-        return(float(f_out))
-
-    def direct(self, iter_limit, time_limit, nvars):
-        opt = nlopt.opt(nlopt.GN_DIRECT_L, nvars)
-        x_l = self.hybClass.lb
-        x_u = self.hybClass.ub
-        x_0 = self.hybClass.x0
-        opt.set_lower_bounds(x_l)
-        opt.set_upper_bounds(x_u)
-        opt.set_maxeval(iter_limit)
-        opt.set_maxtime(time_limit)
-        opt.set_min_objective(self.f)
-        x_opt = opt.optimize(x_0)
-        y_opt = opt.last_optimum_value()
-
-        evals = opt.get_numevals()
-
-        return x_opt, y_opt, evals
+    def f_batch(self, C):
+        '''
+        Evaluates a batch of box centers and logs the evaluations
+
+        @param C: Centers in the unit hypercube, array of shape (m, nvars)
+        @return: Array of the m objective values, None if the batch was
+        cut short at the deadline of the blackBox, its completed
+        evaluations are then logged and kept in self.cut
+        '''
+        X = self.lb + C*(self.ub - self.lb)
+        X[:, self.ints] = np.round(X[:, self.ints])
+        cut = False
+        try:
+            F = np.asarray(self.hybClass.blackbox.evaluate_batch(list(X)),
+                           dtype=float)
+        except evaluationExpired as err:
+            cut = True
+            X = X[[f is not None for f in err.values]]
+            F = np.array([f for f in err.values if f is not None],
+                         dtype=float)
+        iters = self.iter + np.arange(1, len(F)+1)
+        self.iter += len(F)
+        wall = time.time() - self.hybClass.s_time
+        self.hybClass.evallog.append(
+            iters, wall, 0, X, F,
+            pruned=self.hybClass.blackbox.pruned_flags(X),
+            surrogate=self.hybClass.blackbox.screened_flags(X))
+        if cut:
+            self.cut = (X, F)
+            return None
+        return F
+
+    def divisible(self, levels):
+        '''
+        @param levels: Side levels of the boxes, array of shape (m, nvars)
+        @return: Boolean array, True for the sides that can be trisected
+        '''
+        step = 3.0**-(levels+1)*(self.ub - self.lb)
+        return ~self.ints | (step >= 0.5)
+
+    def select(self, F, levels, active):
+        '''
+        Finds the potentially optimal boxes
+
+        @param F: Values at the centers of the boxes
+        @param levels: Side levels of the boxes
+        @param active: Boolean array of the boxes that can be divided
+        @return: Indices of the potentially optimal boxes, best first
+        '''
+        idx = np.nonzero(active)[0]
+        size = 3.0**-levels[idx].min(axis=1)
+        fmin = F[idx].min()
+        # One box per size, the one with the lowest value
+        order = np.lexsort((F[idx], size))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = size[order][1:] != size[order][:-1]
+        cand = idx[order[first]]
+        d = 3.0**-levels[cand].min(axis=1)
+        f = F[cand]
+
+        # Lower right convex hull of (d, f) starting at the best box
+        start = np.nonzero(f == f.min())[0][-1]
+        hull = []
+        for j in range(start, len(cand)):
+            while len(hull) >= 2:
+                a, b = hull[-2], hull[-1]
+                if ((f[b] - f[a])*(d[j] - d[a]) >=
+                        (f[j] - f[a])*(d[b] - d[a])):
+                    hull.pop()
+                else:
+                    break
+            hull.append(j)
+        chosen = []
+        for n, j in enumerate(hull):
+            if n + 1 < len(hull):
+                k = hull[n+1]
+                K = (f[k] - f[j])/(d[k] - d[j])
+                if f[j] - K*d[j] > fmin - self.eps*abs(fmin):
+                    continue
+            chosen.append(cand[j])
+        return sorted(chosen, key=lambda j: F[j])
+
+    def direct(self, iter_limit, time_limit, nvars, lb=None, ub=None):
+        '''
+        Runs DIRECT-L until iter_limit evaluations or time_limit seconds
+
+        @param iter_limit: Max number of black-box evaluations
+        @param time_limit: Max amount of time in seconds
+        @param nvars: Number of variables
+        @param lb: Lower bounds of the searched box, defaults to the
+        variable lower bounds
+        @param ub: Upper bounds of the searched box, defaults to the
+        variable upper bounds
+        @return: Best point, its objective value and the number of
+        evaluations, the initial point and inf if none completed
+        '''
+        start = time.time()
+        self.lb = np.asarray(self.hybClass.lb if lb is None else lb,
+                             dtype=float)
+        self.ub = np.asarray(self.hybClass.ub if ub is None else ub,
+                             dtype=float)
+        self.ints = np.asarray(self.hybClass.ints) == 1
+
+        self.cut = None
+        C = np.full((1, nvars), 0.5)
+        levels = np.zeros((1, nvars), dtype=np.int64)
+        F = self.f_batch(C)
+        if F is None:
+            return list(self.hybClass.x0), math.inf, 0
+        count = 1
+        while count < iter_limit and time.time() - start < time_limit:
+            active = self.divisible(levels).any(axis=1)
+            if not active.any():
+                break
+            boxes = []
+            new = []
+            for j in self.select(F, levels, active):
+                ok = self.divisible(levels[j:j+1])[0]
+                dims = np.nonzero(ok & (levels[j] == levels[j][ok].min()))[0]
+                if count + 2*len(dims) > iter_limit:
+                    continue
+                count += 2*len(dims)
+                delta = 3.0**-(levels[j][dims[0]]+1)
+                points = np.repeat(C[j:j+1], 2*len(dims), axis=0)
+                points[np.arange(len(dims)), dims] += delta
+                points[len(dims) + np.arange(len(dims)), dims] -= delta
+                boxes.append((j, dims))
+                new.append(points)
+            if not boxes:
+                break
+
+            values = self.f_batch(np.vstack(new))
+            if values is None:
+                count = self.iter
+                break
+            pos = 0
+            newL = []
+            for (j, dims), points in zip(boxes, new):
+                m = len(dims)
+                fp = values[pos:pos+m]
+                fm = values[pos+m:pos+2*m]
+                pos += 2*m
+                # Sides with the best new values are split first, so
+                # that the best centers end up in the largest boxes
+                lev = np.repeat(levels[j:j+1], 2*m, axis=0)
+                for i in np.argsort(np.minimum(fp, fm), kind='stable'):
+                    levels[j, dims[i]] += 1
+                    lev[[i, m+i]] = levels[j]
+                newL.append(lev)
+            C = np.vstack([C] + new)
+            F = np.append(F, values)
+            levels = np.vstack([levels] + newL)
+
+        best = np.argmin(F)
+        x_opt = self.lb + C[best]*(self.ub - self.lb)
+        x_opt[self.ints] = np.round(x_opt[self.ints])
+        f_opt = F[best]
+        # The evaluations of a batch cut short are not boxes, but may
+        # hold the best value
+        if self.cut is not None and len(self.cut[1]) > 0:
+            k = np.argmin(self.cut[1])
+            if self.cut[1][k] < f_opt:
+                x_opt, f_opt = self.cut[0][k], self.cut[1][k]
+        return [float(v) for v in x_opt], float(f_opt), count
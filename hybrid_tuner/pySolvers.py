@@ -0,0 +1,242 @@
+import math
+import time
+import nlopt
+import numpy as np
+from hybrid_tuner.budgetScheduler import evaluationExpired
+
+
+class budgetExhausted(Exception):
+    pass
+
+
+class pySolvers():
+    '''
+    Native Python local solvers, usable as Bandit DFO arms without MATLAB.
+    Solvers are selected by the same integer IDs as the other DFO solvers:
+    20. Pattern search (compass search on the bounded box)
+    21. Nelder-Mead (NLOPT)
+    22. BOBYQA (NLOPT)
+    23. COBYLA (NLOPT)
+    24. Trust region on a separable quadratic model
+
+    Each call keeps its evaluations in self.evals, with the columns of
+    evals.res written by the HOPSPACK evaluator, and its best value and
+    point in self.fbest and self.xbest, so run_tuning_iteration handles
+    them like any other DFO solver without going through files.
+    '''
+    solvers = [20, 21, 22, 23, 24]
+
+    def __init__(self, hybClass):
+        self.hybClass = hybClass
+
+    def run(self, solver, x0, lb, ub, ints, budget, time_limit):
+        '''
+        Executes one call to a native DFO solver
+
+        @param solver: Number of DFO solver to call, 20 to 24
+        @param x0: Starting point provided as an array with length num_params
+        @param lb: Variable lower bounds
+        @param ub: Variable upper bounds
+        @param ints: Variable types, 0 is cont. and 1 is integer
+        @param budget: Max number of black-box evaluations
+        @param time_limit: Max amount of time in seconds
+        @return: Best objective value and the point that obtained it
+        '''
+        self.lb = np.asarray(lb, dtype=float)
+        self.ub = np.asarray(ub, dtype=float)
+        self.ints = np.asarray(ints) == 1
+        self.budget = budget
+        self.time_limit = time_limit
+        self.start = time.time()
+        self.count = 0
+        self.memo = {}
+        self.fbest = math.inf
+        self.xbest = None
+        x0 = np.clip(np.asarray(x0, dtype=float), self.lb, self.ub)
+        x0[self.ints] = np.round(x0[self.ints])
+
+        self.rows = []
+        try:
+            # An evaluation still running at time_limit is killed
+            with self.hybClass.blackbox.deadline(time_limit):
+                if solver == 20:
+                    self.pattern_search(x0)
+                elif solver == 21:
+                    self.nlopt_local(nlopt.LN_NELDERMEAD, x0)
+                elif solver == 22:
+                    self.nlopt_local(nlopt.LN_BOBYQA, x0)
+                elif solver == 23:
+                    self.nlopt_local(nlopt.LN_COBYLA, x0)
+                elif solver == 24:
+                    self.trust_region(x0)
+        except (budgetExhausted, evaluationExpired, nlopt.RoundoffLimited):
+            pass
+        self.evals = np.array(self.rows)
+        return self.fbest, self.xbest
+
+    def f(self, x):
+        '''
+        Evaluates the black-box at x and records the evaluation.
+        Points already evaluated during this call are not counted again.
+
+        @param x: Point provided as an array with length num_params
+        @return: Objective value
+        '''
+        x = np.clip(np.asarray(x, dtype=float), self.lb, self.ub)
+        x[self.ints] = np.round(x[self.ints])
+        key = tuple(x)
+        if key in self.memo:
+            return self.memo[key]
+        if (self.count >= self.budget or
+                time.time() - self.start > self.time_limit):
+            raise budgetExhausted()
+
+        start = time.time()
+        f_out = self.hybClass.blackbox.evaluate(x, self.hybClass.tdir)
+        seconds = time.time() - start
+        self.memo[key] = f_out
+        self.count += 1
+        if f_out < self.fbest:
+            self.fbest = f_out
+            self.xbest = x
+        exec_time = time.time() - self.hybClass.s_time
+        self.rows.append([self.count, exec_time] + list(x) +
+                         [f_out, self.fbest, seconds])
+
+        tol = self.hybClass.global_tolerance
+        if (tol > 0 and
+                self.fbest <= self.hybClass.global_solution + tol):
+            raise budgetExhausted()
+        return f_out
+
+    def initial_step(self, scale):
+        '''
+        Per variable step of scale times the width of the box,
+        at least 1 for integer variables
+
+        @param scale: Fraction of the width of the box
+        @return: Array of steps with length num_params
+        '''
+        step = scale*(self.ub - self.lb)
+        step[self.ints] = np.maximum(np.round(step[self.ints]), 1)
+        return step
+
+    def pattern_search(self, x):
+        '''
+        Compass search: polls x +- step along each coordinate, moves to the
+        first improving point and halves the steps after an unsuccessful poll
+        '''
+        fx = self.f(x)
+        step = self.initial_step(0.25)
+        tol = 1e-6*(self.ub - self.lb)
+        while True:
+            improved = False
+            for i in range(len(x)):
+                for s in (1, -1):
+                    y = x.copy()
+                    y[i] = min(max(x[i] + s*step[i], self.lb[i]), self.ub[i])
+                    if y[i] == x[i]:
+                        continue
+                    fy = self.f(y)
+                    if fy < fx:
+                        x, fx = y, fy
+                        improved = True
+                        break
+            if not improved:
+                shrink = np.where(self.ints, step > 1, step > tol)
+                if not shrink.any():
+                    break
+                step[shrink] = step[shrink]/2
+                step[self.ints] = np.maximum(np.floor(step[self.ints]), 1)
+
+    def nlopt_local(self, algorithm, x):
+        '''
+        Runs a local NLOPT algorithm on the bounded box
+
+        @param algorithm: NLOPT algorithm, e.g. nlopt.LN_BOBYQA
+        @param x: Starting point
+        '''
+        opt = nlopt.opt(algorithm, len(x))
+        opt.set_lower_bounds(self.lb)
+        opt.set_upper_bounds(self.ub)
+        opt.set_initial_step(self.initial_step(0.1))
+        opt.set_maxeval(self.budget)
+        opt.set_maxtime(self.time_limit)
+        opt.set_xtol_rel(1e-6)
+        opt.set_min_objective(lambda x, grad: self.f(x))
+        opt.optimize(x)
+
+    def trust_region(self, x):
+        '''
+        Derivative-free trust region method. Each iteration fits a
+        quadratic with a diagonal Hessian from the points x + a*e_i and
+        x + b*e_i, minimizes it over the trust region intersected with
+        the bounds and moves to the best point found.
+        '''
+        fx = self.f(x)
+        delta = self.initial_step(0.1)
+        tol = 1e-6*(self.ub - self.lb)
+        n = len(x)
+        while True:
+            g = np.zeros(n)
+            h = np.zeros(n)
+            lo = np.maximum(self.lb - x, -delta)
+            hi = np.minimum(self.ub - x, delta)
+            xnew, fnew = x, fx
+            for i in range(n):
+                if hi[i] > 0 and lo[i] < 0:
+                    a, b = lo[i], hi[i]
+                elif hi[i] > 0:
+                    a, b = hi[i]/2, hi[i]
+                elif lo[i] < 0:
+                    a, b = lo[i]/2, lo[i]
+                else:
+                    continue
+                if self.ints[i]:
+                    a, b = round(a), round(b)
+                if b == 0:
+                    # Rounding left no integer step on the side of b, the
+                    # secant uses a, and no step at all skips the variable
+                    a, b = 0, a
+                if b == 0:
+                    continue
+                y = x.copy()
+                y[i] = x[i] + b
+                fb = self.f(y)
+                if fb < fnew:
+                    xnew, fnew = y, fb
+                if a == 0 or a == b:
+                    g[i] = (fb - fx)/b
+                    continue
+                y = x.copy()
+                y[i] = x[i] + a
+                fa = self.f(y)
+                if fa < fnew:
+                    xnew, fnew = y, fa
+                # Parabola through (0, fx), (a, fa) and (b, fb)
+                A = np.array([[a, a*a/2], [b, b*b/2]])
+                g[i], h[i] = np.linalg.solve(A, [fa - fx, fb - fx])
+
+            # The model is separable, so each coordinate is minimized alone
+            s = np.where(g > 0, lo, hi)
+            inner = h > 0
+            s[inner] = np.clip(-g[inner]/h[inner], lo[inner], hi[inner])
+            s[self.ints] = np.round(s[self.ints])
+            pred = -np.sum(g*s + h*s*s/2)
+            rho = 0
+            if pred > 0:
+                ft = self.f(x + s)
+                rho = (fx - ft)/pred
+                if ft < fnew:
+                    xnew, fnew = x + s, ft
+
+            success = fnew < fx
+            x, fx = xnew, fnew
+            if rho > 0.75:
+                delta = np.minimum(2*delta, self.ub - self.lb)
+            elif not success or rho < 0.25:
+                shrink = np.where(self.ints, delta > 1, delta > tol)
+                if not success and not shrink.any():
+                    break
+                delta[shrink] = delta[shrink]/2
+                delta[self.ints] = np.maximum(np.floor(delta[self.ints]), 1)
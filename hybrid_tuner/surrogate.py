@@ -0,0 +1,93 @@
+import math
+import threading
+import numpy as np
+
+
+class rbfSurrogate():
+    '''
+    Cubic radial basis function model with a linear tail, used to screen
+    the points proposed by the DFO solvers before they reach the black-box.
+    For each point a local model is fitted on its nearest evaluated points,
+    in the box scaled to the unit hypercube. The point is screened out,
+    and the prediction of the model is returned in place of an evaluation,
+    only if all of the following hold:
+    1. The nearest evaluated point is within radius times the diagonal
+    of the box
+    2. The prediction is above the quantile of the values of the neighbors
+    3. The mean leave-one-out error of the model on the neighbors is
+    within tol times the range of their values
+    A screened value is never below the best value of the neighbors,
+    so the incumbent always comes from a real evaluation.
+    '''
+    radius = 0.1
+
+    def __init__(self, lb, ub, quantile=0.75, tol=0.1):
+        self.lb = np.asarray(lb, dtype=float)
+        self.scale = np.asarray(ub, dtype=float) - self.lb
+        self.scale[self.scale == 0] = 1
+        self.quantile = quantile
+        self.tol = tol
+        self.nvars = len(self.lb)
+        self.neighbors = max(2*(self.nvars+1), 10)
+        self.X = np.empty((0, self.nvars))
+        self.F = np.empty(0)
+        self.lock = threading.Lock()
+
+    def add(self, X, F):
+        '''
+        Adds real evaluations to the data of the model
+
+        @param X: Evaluated points, array of shape (m, num_params)
+        @param F: Objective values, array of length m
+        '''
+        X = np.asarray(X, dtype=float).reshape(-1, self.nvars)
+        with self.lock:
+            self.X = np.vstack([self.X, (X - self.lb)/self.scale])
+            self.F = np.append(self.F, F)
+
+    def fit(self, X, F):
+        '''
+        Interpolates F at X
+
+        @param X: Scaled points, array of shape (k, num_params)
+        @param F: Objective values, array of length k
+        @return: Coefficients of the model, k weights followed by the
+        linear tail, and the inverse of the interpolation matrix
+        '''
+        k = len(F)
+        M = np.zeros((k+self.nvars+1, k+self.nvars+1))
+        M[:k, :k] = np.linalg.norm(X[:, None] - X[None], axis=2)**3
+        M[:k, k] = 1
+        M[:k, k+1:] = X
+        M[k:, :k] = M[:k, k:].T
+        Minv = np.linalg.pinv(M)
+        return Minv[:, :k].dot(F), Minv
+
+    def screen(self, x):
+        '''
+        @param x: Point provided as an array with length num_params
+        @return: Predicted objective value if x is screened out,
+        None if x has to be evaluated
+        '''
+        with self.lock:
+            data, values = self.X, self.F
+        if len(values) < self.neighbors:
+            return None
+        y = (np.asarray(x, dtype=float) - self.lb)/self.scale
+        dist = np.linalg.norm(data - y, axis=1)
+        near = np.argpartition(dist, self.neighbors-1)[:self.neighbors]
+        if dist[near].min() > self.radius*math.sqrt(self.nvars):
+            return None
+
+        X, F = data[near], values[near]
+        k = len(F)
+        coef, Minv = self.fit(X, F)
+        f_hat = (dist[near]**3).dot(coef[:k]) + coef[k] + y.dot(coef[k+1:])
+        if f_hat <= np.quantile(F, self.quantile):
+            return None
+        # Leave-one-out errors of the interpolant (Rippa, 1999)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loo = np.abs(coef[:k]/np.diag(Minv)[:k]).mean()
+        if not loo <= self.tol*(F.max() - F.min()):
+            return None
+        return float(f_hat)
@@ -0,0 +1,119 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import contextlib
+import os
+import threading
+import time
+
+
+class traceLog():
+    '''
+    Timing spans of a tuning run in the Chrome trace event format, which
+    chrome://tracing and Perfetto display as a timeline. Each span is a
+    complete event ("ph": "X") appended as one line to outdir/trace.json.
+    The file is a JSON array whose closing bracket is optional in that
+    format, so the trace stays readable when the run is killed.
+    The processes started by the run, the blackBox wrapper, the HOPSPACK
+    evaluator and the evaluation workers, append their spans to the same
+    file under their own pid, so black-box calls made outside of the
+    tuner are traced as well.
+    '''
+    def __init__(self, path, process='hybTuner'):
+        '''
+        @param path: Location of trace.json, None disables tracing
+        @param process: Name of the process shown in the trace
+        '''
+        self.path = path
+        self.process = process
+        self.enabled = (path is not None and
+                        os.path.isdir(os.path.dirname(path) or '.'))
+        self.fd = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def write(self, event):
+        '''
+        Appends one event to the trace, O_APPEND keeps the lines of
+        concurrent processes whole
+        '''
+        with self.lock:
+            if self.pid != os.getpid():
+                # First event of this process, or of a forked child
+                self.pid = os.getpid()
+                self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND |
+                                  os.O_CREAT, 0o644)
+                if os.fstat(self.fd).st_size == 0:
+                    os.write(self.fd, b'[\n')
+                os.write(self.fd, (json.dumps(
+                    {'name': 'process_name', 'ph': 'M', 'pid': self.pid,
+                     'args': {'name': self.process}}) + ',\n').encode())
+            event['pid'] = self.pid
+            os.write(self.fd, (json.dumps(event) + ',\n').encode())
+
+    @contextlib.contextmanager
+    def span(self, name, cat='tuner', **args):
+        '''
+        Times the enclosed block
+
+        @param name: Name of the span
+        @param cat: Category of the span, tuner, solver, bandit or blackbox
+        @param args: Values shown with the span, such as the solver
+        '''
+        if not self.enabled:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            end = time.time()
+            self.write({'name': name, 'cat': cat, 'ph': 'X',
+                        'ts': int(start*1e6), 'dur': int((end - start)*1e6),
+                        'tid': threading.get_ident() % 1000000,
+                        'args': args})
+
+    def events(self):
+        '''
+        Reads the trace one line at a time, so long traces are never
+        held in memory
+
+        @return: Generator of the events of the trace, of all processes
+        '''
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as fn:
+            for line in fn:
+                line = line.strip().rstrip(',')
+                if not line.startswith('{'):
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A process was killed while writing this line
+                    continue
+
+    def summary(self):
+        '''
+        @return: List of (cat, name, count, total seconds, max seconds)
+        of the spans of the trace, longest total first
+        '''
+        spans = {}
+        for event in self.events():
+            if event.get('ph') != 'X':
+                continue
+            key = (event['cat'], event['name'])
+            count, total, longest = spans.get(key, (0, 0.0, 0.0))
+            seconds = event['dur']/1e6
+            spans[key] = (count + 1, total + seconds, max(longest, seconds))
+        rows = [key + value for key, value in spans.items()]
+        return sorted(rows, key=lambda row: -row[3])
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None and self.pid == os.getpid():
+                os.close(self.fd)
+            self.fd = None
+            self.pid = None
@@ -0,0 +1,274 @@
+import argparse
+import collections
+import math
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from hybrid_tuner.hybTuner import hybClass
+from hybrid_tuner.dfo_solvers import dfoClass
+
+
+class askQueue():
+    '''
+    Objective of a tuner in ask/tell mode. The solvers run in a thread of
+    the tuner and wait in the objective until the values of their points
+    are told. Batches, the DIRECT iterations and the space-filling
+    designs, are queued whole, as are the points of concurrent bandit arms.
+    '''
+    def __init__(self):
+        self.lock = threading.Condition()
+        self.next_id = 0
+        self.pending = collections.deque()
+        self.asked = {}
+        self.results = {}
+        self.closed = False
+        self.error = None
+
+    def map(self, points, fidelity=None):
+        '''
+        Queues points and waits for their values
+
+        @param points: List of points, each a list with length num_params
+        @param fidelity: Not used, ask/tell runs at full fidelity
+        @return: List of objective values in the order of points
+        '''
+        with self.lock:
+            tasks = []
+            for x in points:
+                self.next_id += 1
+                tasks.append(self.next_id)
+                self.pending.append((self.next_id,
+                                     tuple(float(v) for v in x)))
+            self.lock.notify_all()
+            while not all(t in self.results for t in tasks):
+                self.lock.wait()
+            return [self.results.pop(t) for t in tasks]
+
+    def __call__(self, x, fidelity=None):
+        return self.map([x])[0]
+
+    def ask(self, n=1, timeout=None):
+        '''
+        @param n: Max number of points
+        @param timeout: Time in seconds to wait for a point, None waits
+        until the solvers propose one or the run ends
+        @return: List of up to n points, empty once the run has ended or
+        if no point is proposed while asked points are not told
+        '''
+        end = None if timeout is None else time.time() + timeout
+        with self.lock:
+            # Never waits while asked points are not told, the solvers
+            # may be waiting for their values
+            while not self.pending and not self.closed and not self.asked:
+                if end is None:
+                    self.lock.wait()
+                elif not self.lock.wait(max(end - time.time(), 0)):
+                    break
+            if self.error is not None:
+                raise self.error
+            points = []
+            while self.pending and len(points) < n:
+                task, x = self.pending.popleft()
+                self.asked.setdefault(x, collections.deque()).append(task)
+                points.append(list(x))
+            return points
+
+    def tell(self, points, values):
+        '''
+        @param points: List of points returned by ask
+        @param values: Objective values in the order of points
+        '''
+        with self.lock:
+            for x, f in zip(points, values):
+                key = tuple(float(v) for v in x)
+                if key not in self.asked:
+                    raise ValueError('Point ' + str(list(key)) +
+                                     ' was not asked')
+                task = self.asked[key].popleft()
+                if not self.asked[key]:
+                    del self.asked[key]
+                self.results[task] = float(f)
+            self.lock.notify_all()
+
+    def close(self, error=None):
+        with self.lock:
+            self.closed = True
+            self.error = error
+            self.lock.notify_all()
+
+
+class tuner():
+    '''
+    Library interface of HybridTuner, for tuning runs hosted in a long
+    lived process. A tuner holds all of its state, the incumbent and the
+    history of the evaluations stay in memory and every file of the run
+    is written under outdir, the working directory is never changed.
+    Tuners are independent of each other, so several of them can run in
+    one process, one per thread.
+
+    Example:
+    t = tuner({'lower_bounds': [0, 0], 'upper_bounds': [1, 1],
+               'var_type': [0, 1]}, objective, 'bandit',
+              max_iterations=200,
+              bandit={'init': 'direct', 'frequency': 20, 'cParam': 0.05,
+                      'window': 200, 'init_limit': 40})
+    result = t.run()
+
+    In ask/tell mode the tuner does not evaluate the objective, the
+    points proposed by its solvers are handed out by ask and their values
+    are fed back with tell, so an external scheduler runs the evaluations:
+    t = tuner(space, None, 'bandit', ...)
+    while not t.finished():
+        points = t.ask(16)
+        t.tell(points, [evaluate(x) for x in points])
+    result = t.result()
+    Only the native solvers, DIRECT and the solvers 20 to 24, propose
+    points in this mode, the external solvers cannot reach the tuner,
+    so they are left out of the bandit and refused as solver. The same
+    holds for a callable objective that cannot be imported by name.
+    '''
+    defaults = {'max_iterations': 100,
+                'global_tol': 0,
+                'cpu_limit': 3600,
+                'global_target': -math.inf,
+                'printopt': 1,
+                'solver': 20}
+
+    def __init__(self, space, objective, strategy='single', outdir=None,
+                 **params):
+        '''
+        @param space: Dictionary with lower_bounds, upper_bounds, var_type
+        and optionally starting_point, see hybClass
+        @param objective: Callable taking the list of parameters and
+        returning the objective value, import string "module:function"
+        or location of a black-box executable
+        @param strategy: 'single', 'hybrid' or 'bandit'
+        @param outdir: Output directory of the run, a new temporary
+        directory if None
+        @param params: Any other entry of myparams.json, the bandit and
+        hybrid params are given as dictionaries
+        '''
+        if strategy not in ['single', 'hybrid', 'bandit']:
+            raise ValueError('Unknown strategy ' + str(strategy))
+        if outdir is None:
+            outdir = tempfile.mkdtemp(prefix='hybtuner.')
+        self.outdir = os.path.abspath(outdir)
+        self.strategy = strategy
+        self.params = dict(self.defaults)
+        self.params.update(space)
+        self.params.update(params)
+        self.params['num_params'] = len(space['lower_bounds'])
+        if 'starting_point' not in space:
+            self.params['starting_point'] = [
+                (lo + hi)/2.0 for lo, hi in zip(space['lower_bounds'],
+                                                space['upper_bounds'])]
+        self.params['outdir'] = self.outdir
+        self.params['executable'] = None
+        if strategy == 'bandit' and 'bandit' not in params:
+            raise ValueError('The bandit strategy needs bandit params')
+        if strategy == 'hybrid' and 'hybrid' not in params:
+            raise ValueError('The hybrid strategy needs hybrid params')
+        self.objective = objective
+        self.ht = None
+        self.queue = None
+        self.thread = None
+        self.outcome = None
+
+    def run(self):
+        '''
+        Runs the tuning
+
+        @return: Dictionary with the best point x, its objective value f,
+        the number of evaluations and the history of the evaluations,
+        an array with the columns of evalLog
+        '''
+        if self.strategy != 'bandit':
+            self.params.pop('bandit', None)
+        if self.strategy != 'hybrid':
+            self.params.pop('hybrid', None)
+        self.ht = hybClass(argparse.Namespace(params=self.params),
+                           executable=self.objective)
+        dfo = dfoClass(self.ht)
+        try:
+            if self.strategy == 'bandit':
+                self.ht.BanditDFO(dfo)
+            elif self.strategy == 'hybrid':
+                self.ht.HybridDFO(dfo)
+            else:
+                self.ht.SingleSolver(dfo)
+        finally:
+            self.close()
+        return self.result()
+
+    def start(self):
+        '''
+        Starts the tuning in ask/tell mode, in a thread of its own
+        '''
+        if 'fidelity' in self.params or 'broker' in self.params:
+            raise ValueError('ask/tell does not support the fidelity '
+                             'and broker params')
+        self.queue = askQueue()
+        self.objective = self.queue
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        try:
+            self.outcome = self.run()
+        except Exception as err:
+            self.queue.close(err)
+        else:
+            self.queue.close()
+
+    def ask(self, n=1, timeout=None):
+        '''
+        @param n: Max number of points
+        @param timeout: Time in seconds to wait for a point, None waits
+        until the solvers propose one or the run ends
+        @return: List of up to n points to evaluate, each a list with
+        length num_params, fewer if the solvers wait for the values of
+        earlier points, empty once the run has ended
+        '''
+        if self.queue is None:
+            self.start()
+        return self.queue.ask(n, timeout)
+
+    def tell(self, points, values):
+        '''
+        @param points: List of points returned by ask
+        @param values: Objective values in the order of points
+        '''
+        self.queue.tell(points, values)
+
+    def finished(self):
+        '''
+        @return: True once the run of an ask/tell tuner has ended
+        '''
+        return self.thread is not None and not self.thread.is_alive()
+
+    def result(self):
+        '''
+        @return: Current result of the run, see run
+        '''
+        return {'x': list(self.ht.x0),
+                'f': self.ht.incumbent,
+                'evaluations': self.ht.elapsed,
+                'history': self.ht.evallog.read()}
+
+    def close(self):
+        '''
+        Releases the evaluation pool, the MATLAB session and the broker
+        '''
+        self.ht.blackbox.close()
+        self.ht.close_session()
+        if getattr(self.ht, 'broker_manager', None) is not None:
+            # The workers exit once the broker has shut down
+            self.ht.broker_manager.shutdown()
+            self.ht.broker_manager = None
+            for worker in self.ht.workers:
+                try:
+                    worker.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
@@ -0,0 +1,145 @@
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import math
+import os
+import numpy as np
+
+
+class warmStart():
+    '''
+    Evaluation history of earlier tuning runs of the same application,
+    read from their allEvals.res files or evaluation logs, evals.bin or
+    the output directory holding it. The history seeds the incumbent,
+    the evaluation cache and the surrogate of a new run, gives the bandit
+    arms prior statistics and can limit the DIRECT initialization to the
+    region of the best earlier evaluations.
+    Only the evaluations inside the bounds of the new run are used, with
+    integer variables at integer values. Evaluations stopped by the
+    pruner only have a partial value and points screened out by the
+    surrogate only have a predicted value, so both are skipped. They are
+    flagged in the pruned and surrogate columns of evals.bin and only
+    listed on the #pruned and #surrogate lines of allEvals.res. The
+    #cached lines of allEvals.res repeat earlier evaluations and are
+    skipped as well. Logs written before these columns existed cannot
+    tell pruned evaluations or screened points apart.
+    allEvals.res has no solver column, so only evaluation logs give
+    prior statistics to the bandit arms. Histories that are missing or
+    cannot be read are skipped with a message.
+    '''
+    def __init__(self, paths, lb, ub, ints):
+        '''
+        @param paths: Location or list of locations of the histories
+        @param lb: Variable lower bounds
+        @param ub: Variable upper bounds
+        @param ints: Variable types, 0 is cont. and 1 is integer
+        '''
+        if isinstance(paths, str):
+            paths = [paths]
+        self.lb = np.asarray(lb, dtype=float)
+        self.ub = np.asarray(ub, dtype=float)
+        self.ints = np.asarray(ints) == 1
+        nvars = len(self.lb)
+        X, F, S = [np.empty((0, nvars))], [np.empty(0)], [np.empty(0)]
+        for path in paths:
+            try:
+                data = self.read(path, nvars)
+            except (IOError, ValueError, KeyError) as err:
+                print('Warm start history ' + path + ' cannot be read and '
+                      'is skipped: ' + str(err))
+                continue
+            if data is None:
+                print('Warm start history ' + path + ' does not match the '
+                      'parameters and is skipped!')
+                continue
+            X.append(data[0])
+            F.append(data[1])
+            S.append(data[2])
+        X, F, S = np.vstack(X), np.concatenate(F), np.concatenate(S)
+        keep = (np.isfinite(F) & np.all(X >= self.lb, axis=1) &
+                np.all(X <= self.ub, axis=1) &
+                np.all(~self.ints | (X == np.round(X)), axis=1))
+        self.X, self.F, self.S = X[keep], F[keep], S[keep]
+
+    def read(self, path, nvars):
+        '''
+        @param path: allEvals.res, evals.bin or an output directory
+        @param nvars: Number of variables of the new run
+        @return: Points, values and solvers, 0 if unknown, None if the
+        history does not have nvars variables
+        '''
+        if os.path.isdir(path):
+            path = path + '/evals.bin'
+        if path.endswith('.bin'):
+            schema = json.load(open(os.path.dirname(path) + '/evals.json'))
+            columns = schema['columns']
+            if ('x' + str(nvars) not in columns or
+                    'x' + str(nvars+1) in columns):
+                return None
+            ncols = len(columns)
+            data = np.fromfile(path, dtype='<f8')
+            data = data[:len(data)//ncols*ncols].reshape(-1, ncols)
+            for flag in ['pruned', 'surrogate']:
+                if flag in columns:
+                    data = data[data[:, columns.index(flag)] == 0]
+            x = columns.index('x1')
+            return (data[:, x:x+nvars], data[:, columns.index('f')],
+                    data[:, columns.index('solver')])
+        data = np.loadtxt(path, comments='#', ndmin=2)
+        if len(data) == 0:
+            return np.empty((0, nvars)), np.empty(0), np.empty(0)
+        if data.shape[1] != nvars + 2:
+            return None
+        return data[:, 1:nvars+1], data[:, nvars+1], np.zeros(len(data))
+
+    def best(self):
+        '''
+        @return: Best value and point of the history, None if empty
+        '''
+        if len(self.F) == 0:
+            return None
+        k = np.argmin(self.F)
+        return float(self.F[k]), [float(v) for v in self.X[k]]
+
+    def seed(self, blackbox):
+        '''
+        Adds the history to the evaluation cache and the surrogate
+        '''
+        if blackbox.cache:
+            for x, f in zip(self.X, self.F):
+                blackbox.cache.put(x, f)
+        if blackbox.surrogate and len(self.F) > 0:
+            blackbox.surrogate.add(self.X, self.F)
+
+    def priors(self, bandit_state):
+        '''
+        Gives each bandit arm the AUC of its evaluations in the history
+        '''
+        for solver in np.unique(self.S):
+            if solver not in bandit_state.solvers:
+                continue
+            values = self.F[self.S == solver][-bandit_state.window:]
+            bandit_state.prior(int(solver), values)
+
+    def region(self, fraction):
+        '''
+        Bounding box of the best evaluations of the history, padded by
+        5% of the range of each variable
+
+        @param fraction: Fraction of the evaluations kept, at least
+        nvars + 1 of them
+        @return: Lower and upper bounds of the region, None if the
+        history is empty
+        '''
+        if len(self.F) == 0:
+            return None
+        k = max(int(math.ceil(fraction*len(self.F))), len(self.lb) + 1)
+        top = self.X[np.argsort(self.F)[:k]]
+        pad = 0.05*(self.ub - self.lb)
+        lb = np.maximum(top.min(axis=0) - pad, self.lb)
+        ub = np.minimum(top.max(axis=0) + pad, self.ub)
+        lb[self.ints] = np.maximum(np.floor(lb[self.ints]), self.lb[self.ints])
+        ub[self.ints] = np.minimum(np.ceil(ub[self.ints]), self.ub[self.ints])
+        return [float(v) for v in lb], [float(v) for v in ub]
@@ -0,0 +1,29 @@
+function F = func_batch(X);
+%% Evaluates the rows of X concurrently on the evaluation pool,
+%% points outside of the bounds are not evaluated
+
+global bu
+global bl
+
+inb = false(size(X,1), 1);
+for j = 1:size(X,1)
+   inb(j) = all((X(j,:) <= bu) & (X(j,:) >= bl));
+end;
+F = 1e90*ones(size(X,1), 1);
+if any(inb)
+   fb = fopen('mybatch.in', 'w');
+   fprintf(fb, [repmat('%30.15f ', 1, ${nvars}) '\n'], X(inb,:)');
+   fclose(fb);
+   setenv('GFORTRAN_STDIN_UNIT', '5');
+   setenv('GFORTRAN_STDOUT_UNIT', '6');
+   setenv('GFORTRAN_STDERR_UNIT', '0');
+   [status, cmdout] = system('${executable} batch');
+   setenv('GFORTRAN_STDIN_UNIT', '-1') ;
+   setenv('GFORTRAN_STDOUT_UNIT', '-1') ;
+   setenv('GFORTRAN_STDERR_UNIT', '-1');
+   F(inb) = load('mybatch.out');
+end;
+
+for j = 1:size(X,1)
+   func_record(X(j,:), F(j));
+end;
@@ -2,22 +2,10 @@ function f = func_f(${inPair});
 
 global bu
 global bl
-global global_counter
-global global_objective
-global global_evaluation
-global global_solution
-global global_tolerance
-global xbest
-global start_time
 
-global_counter = global_counter + 1;
-exec_time = etime(clock,start_time);
-iten = fopen('iteration.number', 'wt');
-fprintf(iten, '%10d\n', global_counter);
-fclose(iten);
 fin = fopen('myin', 'w');
 
-${fin_loop}
+fprintf(fin, '%30.15f\n', x);
 
 fclose(fin);
 if ( (x <= bu) & (x >= bl) )
@@ -42,38 +30,4 @@ else
    f = 1e90;
 end;
 
-pmod = 1;
-if (f < global_objective)
-  global_objective = f;
-  global_evaluation = global_counter;
-  xbest = x;
-  gobj = fopen('best_objective', 'wt');
-  fprintf(gobj, '%55.8f\n', global_objective);
-  fclose(gobj);
-  gcou = fopen('best_iteration', 'wt');
-  fprintf(gcou, '%10d\n', global_evaluation);
-  fclose(gcou);
-  gxbest = fopen('best_solution', 'wt');
-  fprintf(gxbest, '%10d\n', xbest);
-  fclose(gxbest);
-end;
-if (pmod > 0)
-  printmod = mod(global_counter,pmod);
-  if (printmod == 0)
-    fres = fopen('evals.res', 'a');
-    fprintf(fres, '%5d ', global_counter);
-    fprintf(fres, '%5d ', exec_time);
-    fprintf(fres, '%15.6f ', x);
-    fprintf(fres, '%20.8f \n', global_objective);
-    fclose(fres);
-  end;
-end;
-
-if (global_counter > (${limit_evals}))
-   exit
-end
-if (global_tolerance > 0)
-   if (global_objective <= (global_solution + global_tolerance) )
-      exit
-   end
-end
\ No newline at end of file
+func_record(x, f);
@@ -7,12 +7,19 @@ global global_solution
 global global_tolerance
 global xbest
 global start_time
+global limit_evals
 
 lastn = maxNumCompThreads(1);
 start_time = clock;
 
 ${var_params}
 
+%% Starting point and budget of the call, see hybClass.matlab_setup
+pull = load('pull.dat');
+limit_evals = pull(1);
+budget = pull(2);
+x_0 = pull(3:end);
+
 global_counter = 0;
 global_objective = inf;
 global_solution = ${global_solution};
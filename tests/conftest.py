@@ -0,0 +1,50 @@
+import pytest
+
+
+@pytest.fixture
+def config(tmp_path):
+    '''
+    @return: Function building the blackBox configuration of a run in
+    tmp_path with two continuous variables on [0, 1], keys overridden by
+    its keyword arguments
+    '''
+    def build(**kwargs):
+        conf = {'tdir': str(tmp_path),
+                'dirpath': str(tmp_path),
+                'executable': None,
+                'objective': None,
+                'input': 'myin',
+                'output': 'myout',
+                'ints': [0, 0],
+                'lb': [0.0, 0.0],
+                'ub': [1.0, 1.0],
+                'surrogate': None,
+                'cache': str(tmp_path / 'evals.cache'),
+                'cache_size': 100,
+                'max_workers': 1,
+                'broker': None,
+                'authkey': None,
+                'lease': 30,
+                'trace': None,
+                'prune': None,
+                'fidelity': None}
+        conf.update(kwargs)
+        return conf
+    return build
+
+
+class counted():
+    '''
+    Objective counting its calls, the value is the sum of the point
+    '''
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, x):
+        self.calls.append(list(x))
+        return float(sum(x))
+
+
+@pytest.fixture
+def objective():
+    return counted()
@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import sys
+import time
+import pytest
+from hybrid_tuner.blackBox import blackBox
+from hybrid_tuner.budgetScheduler import evaluationExpired
+
+
+def lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+@pytest.mark.parametrize('cache_size', [0, 100])
+def test_duplicates_of_a_batch_are_evaluated_once(config, objective,
+                                                  tmp_path, cache_size):
+    bb = blackBox(config(cache_size=cache_size), objective)
+    X = [[0.1, 0.2], [0.3, 0.4], [0.1, 0.2], [0.1, 0.2]]
+    assert bb.evaluate_batch(X) == pytest.approx([0.3, 0.7, 0.3, 0.3])
+    assert objective.calls == [[0.1, 0.2], [0.3, 0.4]]
+    # The copies are reported like cache hits
+    hits = lines(str(tmp_path / 'cacheHits.res'))
+    assert len(hits) == 2
+    assert all(line.startswith('#cached') for line in hits)
+    bb.close()
+
+
+def test_integer_variables_are_rounded_before_deduplication(config,
+                                                            objective):
+    bb = blackBox(config(ints=[1, 0], ub=[5.0, 1.0]), objective)
+    F = bb.evaluate_batch([[1.2, 0.5], [0.8, 0.5], [2.0, 0.5]])
+    assert F == [1.5, 1.5, 2.5]
+    assert objective.calls == [[1.0, 0.5], [2.0, 0.5]]
+    bb.close()
+
+
+def test_cached_points_are_not_run_again(config, objective):
+    bb = blackBox(config(), objective)
+    bb.evaluate_batch([[0.1, 0.2], [0.3, 0.4]])
+    F = bb.evaluate_batch([[0.3, 0.4], [0.5, 0.5], [0.1, 0.2]])
+    assert F == pytest.approx([0.7, 1.0, 0.3])
+    assert objective.calls == [[0.1, 0.2], [0.3, 0.4], [0.5, 0.5]]
+    assert bb.evaluate([0.5, 0.5]) == 1.0
+    assert len(objective.calls) == 3
+    bb.close()
+    # The connection to the cache database is released
+    with pytest.raises(sqlite3.ProgrammingError):
+        bb.cache.points()
+
+
+def test_batches_run_on_the_evaluation_pool(config, tmp_path):
+    bb = blackBox(config(max_workers=2, objective='math:fsum'))
+    X = [[0.1, 0.2], [0.3, 0.4], [0.1, 0.2], [0.5, 0.5]]
+    assert bb.evaluate_batch(X) == pytest.approx([0.3, 0.7, 0.3, 1.0])
+    assert len(lines(str(tmp_path / 'cacheHits.res'))) == 1
+    bb.close()
+
+
+@pytest.fixture
+def sleeper(tmp_path):
+    '''
+    @return: Executable sleeping x1 seconds, its value is x1 + x2
+    '''
+    exe = tmp_path / 'sleeper.py'
+    exe.write_text('#!' + sys.executable + '\n'
+                   'import time\n'
+                   'x = [float(v) for v in open("myin") if v.strip()]\n'
+                   'time.sleep(x[0])\n'
+                   'open("myout", "w").write("%.15g\\n" % sum(x))\n')
+    os.chmod(str(exe), 0o755)
+    return str(exe)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_completed_evaluations_survive_the_deadline(config, sleeper,
+                                                    workers):
+    bb = blackBox(config(executable=sleeper, ub=[10.0, 1.0],
+                         max_workers=workers))
+    X = [[0.1, 0.5], [0.2, 0.5], [8.0, 0.5]]
+    start = time.time()
+    with pytest.raises(evaluationExpired) as err:
+        with bb.deadline(2):
+            bb.evaluate_batch(X)
+    assert time.time() - start < 5
+    assert err.value.values == pytest.approx([0.6, 0.7, None])
+    assert bb.cache.get([0.1, 0.5]) == pytest.approx(0.6)
+    assert bb.cache.get([0.2, 0.5]) == pytest.approx(0.7)
+    assert bb.cache.get([8.0, 0.5]) is None
+    bb.close()
+
+
+def test_screened_points_are_flagged_once(config, objective, tmp_path):
+    bb = blackBox(config(surrogate={'quantile': 0.75, 'tol': 0.1}),
+                  objective)
+    grid = [[i/3, j/3] for i in range(4) for j in range(4)]
+    bb.evaluate_batch(grid)
+    # The linear objective is predicted exactly, high values are screened
+    f_out = bb.evaluate([0.95, 0.95])
+    assert f_out == pytest.approx(1.9)
+    assert len(objective.calls) == 16
+    assert len(lines(str(tmp_path / 'surrogate.res'))) == 1
+    flags = bb.screened_flags(grid + [[0.95, 0.95]])
+    assert flags.tolist() == [False]*16 + [True]
+    assert not bb.pruned_flags([[0.95, 0.95]]).any()
+    # Each line of surrogate.res flags one logged point
+    assert not bb.screened_flags([[0.95, 0.95]]).any()
+    bb.close()
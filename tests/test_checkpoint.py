@@ -0,0 +1,95 @@
+import argparse
+import pickle
+import numpy as np
+from hybrid_tuner.hybTuner import hybClass
+from hybrid_tuner.dfo_solvers import dfoClass
+
+
+class crashing():
+    '''
+    Objective interrupting the run after limit calls, like a killed job
+    '''
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        if self.limit is not None and self.calls > self.limit:
+            raise KeyboardInterrupt()
+        return float(sum((v - 0.3)**2 for v in x))
+
+
+def params(tdir):
+    return {'num_params': 2,
+            'lower_bounds': [-1, -1],
+            'upper_bounds': [1, 1],
+            'starting_point': [0.9, 0.9],
+            'var_type': [0, 0],
+            'max_iterations': 120,
+            'global_tol': 0,
+            'cpu_limit': 600,
+            'global_target': -1e9,
+            'printopt': 1,
+            'solver': 20,
+            'outdir': tdir,
+            'bandit': {'init': 'direct', 'frequency': 20, 'cParam': 0.05,
+                       'window': 120, 'init_limit': 30}}
+
+
+def tuner(tdir, objective, resume=False):
+    return hybClass(argparse.Namespace(params=params(tdir), resume=resume),
+                    executable=objective)
+
+
+def test_resumed_run_continues_from_the_checkpoint(tmp_path):
+    tdir = str(tmp_path / 'out')
+    ht = tuner(tdir, crashing(70))
+    try:
+        ht.BanditDFO(dfoClass(ht))
+    except KeyboardInterrupt:
+        pass
+    ht.blackbox.close()
+    with open(tdir + '/checkpoint.pkl', 'rb') as f:
+        state = pickle.load(f)
+    assert state['phase'] == 'bandit'
+    assert 30 <= state['elapsed'] <= 70
+
+    objective = crashing()
+    ht = tuner(tdir, objective, resume=True)
+    assert ht.resume_phase == 'bandit'
+    assert ht.elapsed == state['elapsed']
+    assert ht.incumbent == state['incumbent']
+    # Rows logged after the checkpoint are dropped
+    assert len(ht.evallog.read()) == state['log_rows']
+    ht.BanditDFO(dfoClass(ht))
+    ht.blackbox.close()
+    assert ht.elapsed == 120
+    data = ht.evallog.read()
+    assert list(data[:, 0]) == list(range(1, 121))
+    assert data[-1, -1] == ht.incumbent
+    # Points evaluated between the checkpoint and the crash come from
+    # the evaluation cache
+    assert objective.calls <= 120 - 70
+
+
+def test_finished_run_is_not_run_again(tmp_path):
+    tdir = str(tmp_path / 'out')
+    ht = tuner(tdir, crashing())
+    ht.BanditDFO(dfoClass(ht))
+    ht.blackbox.close()
+    rows = len(ht.evallog.read())
+    objective = crashing()
+    ht = tuner(tdir, objective, resume=True)
+    assert ht.resume_phase == 'done'
+    ht.BanditDFO(dfoClass(ht))
+    ht.blackbox.close()
+    assert objective.calls == 0
+    assert len(ht.evallog.read()) == rows
+
+
+def test_resume_without_checkpoint_starts_a_new_run(tmp_path):
+    ht = tuner(str(tmp_path / 'out'), crashing(), resume=True)
+    assert ht.resume_phase is None
+    assert ht.elapsed == 0
+    assert np.isinf(ht.evallog.best)
@@ -0,0 +1,92 @@
+import types
+import pytest
+from hybrid_tuner import evalBroker as module
+from hybrid_tuner.blackBox import blackBox
+from hybrid_tuner.evalBroker import (evalBoard, evaluationFailed,
+                                     start_broker, start_workers)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(module, 'time',
+                        types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_values_are_posted_to_the_client(clock):
+    board = evalBoard()
+    a = board.submit(([0.1], None))
+    b = board.submit(([0.2], 3))
+    assert board.take('w1', 0) == (a, ([0.1], None))
+    assert board.take('w2', 0) == (b, ([0.2], 3))
+    assert board.take('w1', 0) is None
+    board.finish('w2', b, 2.0)
+    assert board.wait([a, b], 0) == ({b: (True, 2.0)}, 2)
+    board.finish('w1', a, 1.0)
+    assert board.wait([a], 0) == ({a: (True, 1.0)}, 2)
+    assert board.points == {} and board.tries == {}
+
+
+def test_failed_points_are_retried_first(clock):
+    board = evalBoard(retries=2)
+    a = board.submit(([0.1], None))
+    b = board.submit(([0.2], None))
+    for n in range(2):
+        task, x = board.take('w1', 0)
+        assert task == a
+        board.fail('w1', a, 'ValueError()')
+        assert board.wait([a], 0)[0] == {}
+    board.take('w1', 0)
+    board.fail('w1', a, 'ValueError()')
+    assert board.wait([a], 0)[0] == {a: (False, 'ValueError()')}
+    assert board.take('w1', 0)[0] == b
+
+
+def test_points_of_a_lost_worker_are_leased_again(clock):
+    board = evalBoard(lease=30)
+    a = board.submit(([0.1], None))
+    assert board.take('w1', 0)[0] == a
+    clock[0] += 20
+    board.heartbeat('w1')
+    clock[0] += 20
+    # w1 is still alive, it reported a heartbeat 20 seconds ago
+    assert board.take('w2', 0) is None
+    clock[0] += 20
+    assert board.take('w2', 0)[0] == a
+    assert board.tries[a] == 1
+    # The late value of the lost worker is ignored
+    board.finish('w1', a, 5.0)
+    assert board.wait([a], 0)[0] == {}
+    board.finish('w2', a, 1.0)
+    assert board.wait([a], 0)[0] == {a: (True, 1.0)}
+
+
+def test_lost_points_fail_after_the_retries(clock):
+    board = evalBoard(lease=30, retries=1)
+    a = board.submit(([0.1], None))
+    for worker in ['w1', 'w2']:
+        assert board.take(worker, 0)[0] == a
+        clock[0] += 31
+    assert board.wait([a], 0)[0] == {a: (False, 'Worker w2 was lost')}
+
+
+def test_workers_evaluate_the_points_of_a_client(config, tmp_path):
+    manager, address, authkey = start_broker('local', lease=10)
+    conf = config(objective='math:fsum', broker=address, authkey=authkey,
+                  lease=10)
+    bb = blackBox(conf)
+    bb.write_config(str(tmp_path / 'blackbox.json'))
+    workers = start_workers(str(tmp_path / 'blackbox.json'), 2)
+    try:
+        X = [[0.1, 0.2], [0.3, 0.4], [0.5, 0.5]]
+        assert bb.evaluate_batch(X) == pytest.approx([0.3, 0.7, 1.0])
+        assert bb.evaluate([0.25, 0.25]) == pytest.approx(0.5)
+        # A point the objective cannot evaluate fails after the retries
+        with pytest.raises(evaluationFailed):
+            bb.remote().map([[float('inf'), -float('inf')]])
+    finally:
+        bb.close()
+        manager.shutdown()
+        for worker in workers:
+            worker.wait(timeout=10)
@@ -0,0 +1,56 @@
+import itertools
+import types
+import pytest
+from hybrid_tuner import evalCache as module
+from hybrid_tuner.evalCache import evalCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Distinct last_used stamps, so the eviction order is deterministic
+    ticks = itertools.count(1)
+    monkeypatch.setattr(module, 'time',
+                        types.SimpleNamespace(time=lambda: next(ticks)))
+
+
+def test_integer_variables_share_an_entry(tmp_path):
+    cache = evalCache(str(tmp_path / 'cache.db'), [0, 1])
+    cache.put([0.5, 2.2], 1.5)
+    assert cache.get([0.5, 1.8]) == 1.5
+    assert cache.get([0.5, 3.0]) is None
+    assert cache.get([0.25, 2.0]) is None
+    cache.close()
+
+
+def test_size_is_bounded(tmp_path, clock):
+    cache = evalCache(str(tmp_path / 'cache.db'), [0], max_size=3)
+    for i in range(10):
+        cache.put([float(i)], float(i))
+    X, F = cache.points()
+    assert sorted(F) == [7.0, 8.0, 9.0]
+    cache.close()
+
+
+def test_least_recently_used_is_evicted(tmp_path, clock):
+    cache = evalCache(str(tmp_path / 'cache.db'), [0], max_size=3)
+    for i in range(3):
+        cache.put([float(i)], float(i))
+    # A hit makes the oldest entry the most recently used
+    assert cache.get([0.0]) == 0.0
+    cache.put([3.0], 3.0)
+    assert cache.get([1.0]) is None
+    assert cache.get([0.0]) == 0.0
+    assert cache.get([2.0]) == 2.0
+    assert cache.get([3.0]) == 3.0
+    cache.close()
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = evalCache(path, [0, 0])
+    cache.put([1.0, 2.0], 3.0)
+    cache.close()
+    cache = evalCache(path, [0, 0])
+    assert cache.get([1.0, 2.0]) == 3.0
+    assert cache.points() == ([[1.0, 2.0]], [3.0])
+    cache.close()
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from hybrid_tuner.evalLog import evalLog
+
+
+def filled(tdir):
+    '''
+    @return: Log of two variables with 3 DIRECT evaluations, then 2 of
+    solver 20, the first of them pruned, and 2 of solver 21
+    '''
+    log = evalLog(str(tdir), 2)
+    log.append([1, 2, 3], 0.5, 0, [[0, 0], [1, 1], [2, 2]], [5, 3, 4])
+    log.append([4, 5], 1.0, 20, [[3, 3], [4, 4]], [1, 2.5],
+               seconds=[0.1, 0.2], pruned=[True, False])
+    log.append([6, 7], 2.0, 21, [[5, 5], [6, 6]], [6, 2])
+    return log
+
+
+def test_best_column_skips_pruned_evaluations(tmp_path):
+    data = np.asarray(filled(tmp_path).read())
+    assert data.shape == (7, 10)
+    assert list(data[:, 0]) == [1, 2, 3, 4, 5, 6, 7]
+    assert list(data[:, 4]) == [0, 0, 0, 1, 0, 0, 0]
+    assert list(data[:, -2]) == [5, 3, 4, 1, 2.5, 6, 2]
+    assert list(data[:, -1]) == [5, 3, 3, 3, 2.5, 2.5, 2]
+    assert np.isnan(data[0, 3]) and data[4, 3] == 0.2
+
+
+def test_truncate_restores_the_best_value(tmp_path):
+    log = filled(tmp_path)
+    log.truncate(5)
+    assert len(log.read()) == 5
+    assert log.best == 2.5
+    log.append([6], 3.0, 22, [[7, 7]], [2.7])
+    assert log.read()[-1, -1] == 2.5
+    log.truncate(0)
+    assert len(log.read()) == 0 and log.best == np.inf
+
+
+def test_reopened_log_ignores_a_partial_row(tmp_path):
+    filled(tmp_path)
+    with open(str(tmp_path / 'evals.bin'), 'ab') as f:
+        f.write(b'\0'*20)
+    log = evalLog(str(tmp_path), 2)
+    assert len(log.read()) == 7
+    assert log.best == 2
+    assert sum(len(c) for c in log.chunks(3)) == 7
+
+
+def test_chunks_and_profile_match_the_log(tmp_path):
+    log = filled(tmp_path)
+    data = np.asarray(log.read())
+    assert np.array_equal(np.vstack(list(log.chunks(2))), data,
+                          equal_nan=True)
+    iteration, best, seconds, timed = log.profile(3)
+    assert list(iteration) == [1, 4, 7]
+    assert list(best) == [5, 3, 2]
+    assert seconds == pytest.approx(0.3)
+    assert timed == 2
+
+
+def test_export_writes_the_res_files(tmp_path):
+    log = filled(tmp_path)
+    (tmp_path / 'cacheHits.res').write_text('#cached   1.00000   1.00000'
+                                            '   3.00000\n')
+    (tmp_path / 'pruned.res').write_text('#pruned   3   3   1\n')
+    log.export()
+    rows = (tmp_path / 'allEvals.res').read_text().splitlines()
+    assert rows[0].split() == ['1', '0.00000', '0.00000', '5.00000']
+    assert [r.split()[0] for r in rows] == ['1', '2', '3', '5', '6', '7',
+                                            '#cached', '#pruned']
+    # DIRECT evaluations only appear in allEvals.res
+    assert not (tmp_path / '0.res').exists()
+    assert np.loadtxt(str(tmp_path / '20.res'), ndmin=2).tolist() == [
+        [5, 4, 4, 2.5]]
+    assert np.loadtxt(str(tmp_path / '21.res'))[:, 0].tolist() == [6, 7]
+
+
+def test_screened_points_are_not_real_evaluations(tmp_path):
+    log = evalLog(str(tmp_path), 2)
+    log.append([1, 2, 3], 0.5, 20, [[0, 0], [1, 1], [2, 2]], [5, 1, 3],
+               surrogate=[False, True, False])
+    data = np.asarray(log.read())
+    assert list(data[:, 5]) == [0, 1, 0]
+    assert list(data[:, -1]) == [5, 5, 3]
+    (tmp_path / 'surrogate.res').write_text('#surrogate   1   1   1\n')
+    log.export()
+    rows = (tmp_path / 'allEvals.res').read_text().splitlines()
+    assert [r.split()[0] for r in rows] == ['1', '3', '#surrogate']
+    assert np.loadtxt(str(tmp_path / '20.res'))[:, 0].tolist() == [1, 3]
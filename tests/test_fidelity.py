@@ -0,0 +1,68 @@
+import json
+import numpy as np
+import pytest
+from hybrid_tuner.blackBox import blackBox
+from hybrid_tuner.fidelity import successiveHalving
+
+
+class noisy():
+    '''
+    Objective whose error shrinks with the fidelity, counting the
+    evaluations at each fidelity
+    '''
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, x, fidelity):
+        self.calls.append(fidelity)
+        return float(x[0] + 1.0/fidelity)
+
+
+def test_ladder_runs_from_min_to_max():
+    sh = successiveHalving({'min': 3, 'max': 81}, None)
+    assert sh.fidelities == [3, 9, 27, 81]
+    sh = successiveHalving({'min': 2, 'max': 10, 'var_type': 1}, None)
+    assert sh.fidelities == [3, 10]
+    sh = successiveHalving({'min': 1, 'max': 16, 'eta': 2}, None)
+    assert sh.fidelities == [1, 2, 4, 8, 16]
+
+
+@pytest.mark.parametrize('spec', [{'min': 81, 'max': 3},
+                                  {'min': 0, 'max': 3},
+                                  {'min': 1, 'max': 9, 'eta': 1}])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        successiveHalving(spec, None)
+
+
+def test_candidates_fit_the_budget():
+    sh = successiveHalving({'min': 3, 'max': 81}, None)
+    # 27 candidates at 3, 9 at 9, 3 at 27 and 1 at 81
+    assert sh.cost(27) == pytest.approx(1 + 1 + 1 + 1)
+    for budget in [1, 4, 10, 50]:
+        n = sh.candidates(budget)
+        assert budget < sh.cost(n+1)
+        assert n == 0 or sh.cost(n) <= budget
+    assert sh.candidates(1) == 0
+
+
+def test_best_candidates_are_promoted(config, tmp_path):
+    objective = noisy()
+    bb = blackBox(config(fidelity=27), objective)
+    sh = successiveHalving({'min': 3, 'max': 27}, bb)
+    X = np.column_stack([np.linspace(0.9, 0.1, 9), np.zeros(9)])
+    Xf, F, cost = sh.run(X)
+    assert objective.calls == [3]*9 + [9]*3 + [27]
+    assert Xf.tolist() == [[0.1, 0.0]]
+    assert F.tolist() == pytest.approx([0.1 + 1/27])
+    assert cost == pytest.approx(3)
+    # Only the full fidelity value is cached
+    assert bb.cache.points()[0] == [[0.1, 0.0]]
+    sh.write(str(tmp_path / 'promotions.json'))
+    with open(str(tmp_path / 'promotions.json')) as f:
+        tree = json.load(f)
+    assert [r['promoted'] for r in tree['rungs']] == [[8, 7, 6], [8], []]
+    assert tree['values'][8] == [[3, pytest.approx(0.1 + 1/3)],
+                                 [9, pytest.approx(0.1 + 1/9)],
+                                 [27, pytest.approx(0.1 + 1/27)]]
+    bb.close()
@@ -0,0 +1,25 @@
+import json
+import time
+import pytest
+from hybrid_tuner.hopspackEval import main
+
+
+def run(tmp_path, conf):
+    (tmp_path / 'blackbox.json').write_text(json.dumps(conf))
+    (tmp_path / 'in.1').write_text('F\n2\n0.25\n0.5\n')
+    main(['10.script', str(tmp_path / 'in.1'), str(tmp_path / 'out.1'), '1'],
+         str(tmp_path / 'blackbox.json'), 2, time.time(), 1)
+    return (tmp_path / 'out.1').read_text().split()
+
+
+def test_point_is_evaluated_and_recorded(config, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert run(tmp_path, config(objective='math:fsum')) == ['1', '0.75']
+    assert (tmp_path / 'best_objective').read_text() == '0.75\n'
+    assert (tmp_path / 'iteration.number').read_text() == '1\n'
+
+
+def test_unreachable_objective_exits(config, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit, match='not importable'):
+        run(tmp_path, config())
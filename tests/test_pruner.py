@@ -0,0 +1,114 @@
+import os
+import sys
+import pytest
+from hybrid_tuner.blackBox import blackBox
+from hybrid_tuner.pruner import curvePruner
+
+curves = [[10, 5, 1], [8, 4, 2], [9, 6, 3]]
+
+
+def pruner(rule, warmup=2, min_curves=3, path=None):
+    p = curvePruner(rule, warmup, min_curves, path)
+    for c in curves:
+        p.add(c)
+    return p
+
+
+def test_median_rule():
+    p = pruner('median')
+    # The median of the best values over 2 steps is 5
+    assert p.prune([7, 7])
+    assert not p.prune([7, 4.5])
+    assert not p.prune([7, 7, 7, 7])
+
+
+def test_bound_rule():
+    p = pruner('bound')
+    # The completed curves improved by at most 4 after step 2
+    assert p.prune([7, 5.5])
+    assert not p.prune([7, 4.9])
+
+
+@pytest.mark.parametrize('rule', ['median', 'bound'])
+def test_no_pruning_without_evidence(rule):
+    assert not pruner(rule, warmup=3).prune([50, 50])
+    assert not pruner(rule, min_curves=4).prune([50, 50])
+    assert not curvePruner(rule, 0, 0).prune([50, 50])
+    p = pruner(rule)
+    assert not p.prune([])
+    # A curve holding the incumbent is never pruned
+    p.observe(0.5)
+    assert not p.prune([50, 0.5])
+
+
+def test_completed_curves_are_shared_through_curves_res(tmp_path):
+    path = str(tmp_path / 'curves.res')
+    pruner('median', path=path)
+    p = curvePruner('median', 2, 3, path)
+    assert p.curves == curves
+    assert p.best == 1
+    assert p.prune([7, 7])
+
+
+@pytest.fixture
+def streamed(config, tmp_path):
+    '''
+    @return: blackBox running an executable that appends 6 values to
+    myout, x1 + 1/k at step k, with the median rule and the surrogate
+    '''
+    exe = tmp_path / 'stream.py'
+    exe.write_text('#!' + sys.executable + '\n'
+                   'import time\n'
+                   'x = [float(v) for v in open("myin") if v.strip()]\n'
+                   'out = open("myout", "w")\n'
+                   'for k in range(1, 7):\n'
+                   '    out.write("%.15g\\n" % (x[0] + 1.0/k))\n'
+                   '    out.flush()\n'
+                   '    time.sleep(0.15)\n')
+    os.chmod(str(exe), 0o755)
+    bb = blackBox(config(executable=str(exe), ub=[10.0, 1.0],
+                         prune={'rule': 'median', 'warmup': 2,
+                                'min_curves': 2},
+                         surrogate={'quantile': 0.75, 'tol': 0.1}))
+    yield bb
+    bb.close()
+
+
+def reported(tmp_path, name):
+    path = str(tmp_path / name)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_pruned_values_are_not_cached(streamed, tmp_path):
+    bb = streamed
+    assert bb.evaluate([0.0, 0.0]) == pytest.approx(1/6)
+    assert bb.evaluate([0.1, 0.0]) == pytest.approx(0.1 + 1/6)
+    assert len(reported(tmp_path, 'curves.res')) == 2
+    f_out = bb.evaluate([5.0, 0.0])
+    # The value is the last one written before the evaluation was killed
+    assert f_out > 5 + 1/6
+    assert bb.cache.get([5.0, 0.0]) is None
+    assert len(bb.surrogate.F) == 2
+    assert len(reported(tmp_path, 'curves.res')) == 2
+    lines = reported(tmp_path, 'pruned.res')
+    assert len(lines) == 1 and lines[0].startswith('#pruned')
+    flags = bb.pruned_flags([[0.0, 0.0], [5.0, 0.0], [0.1, 0.0]])
+    assert flags.tolist() == [False, True, False]
+    # Each line of pruned.res flags one logged evaluation
+    assert not bb.pruned_flags([[5.0, 0.0]]).any()
+
+
+def test_pruned_batch_duplicates_are_reported(streamed, tmp_path):
+    bb = streamed
+    bb.evaluate_batch([[0.0, 0.0], [0.1, 0.0]])
+    F = bb.evaluate_batch([[6.0, 0.0], [6.0, 0.0], [0.0, 0.5]])
+    assert F[0] == F[1] and F[0] > 6 + 1/6
+    assert F[2] == pytest.approx(1/6)
+    assert bb.cache.get([6.0, 0.0]) is None
+    assert bb.cache.get([0.0, 0.5]) == F[2]
+    assert len(bb.surrogate.F) == 3
+    assert len(reported(tmp_path, 'pruned.res')) == 2
+    assert reported(tmp_path, 'cacheHits.res') == []
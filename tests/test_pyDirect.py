@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import types
+import numpy as np
+import pytest
+from hybrid_tuner.blackBox import blackBox
+from hybrid_tuner.evalLog import evalLog
+from hybrid_tuner.pyDirect import pyOpt
+
+
+def quadratic(x):
+    return float((x[0] - 0.3)**2 + (x[1] - 0.7)**2)
+
+
+@pytest.fixture
+def direct(config, tmp_path):
+    '''
+    @return: Function building a pyOpt on a tuner stub, the objective
+    counts its calls
+    '''
+    def build(ints=(0, 0), ub=(1.0, 1.0), objective=quadratic):
+        calls = []
+
+        def counted(x):
+            calls.append(list(x))
+            return objective(x)
+        bb = blackBox(config(ints=list(ints), ub=list(ub), cache_size=0),
+                      counted)
+        stub = types.SimpleNamespace(blackbox=bb,
+                                     evallog=evalLog(str(tmp_path), 2),
+                                     lb=[0.0, 0.0], ub=list(ub),
+                                     ints=list(ints), x0=[0.5, 0.5],
+                                     s_time=time.time())
+        return pyOpt(stub), calls
+    return build
+
+
+@pytest.mark.parametrize('limit', [1, 2, 5, 20, 21, 40, 100])
+def test_init_limit_bounds_the_evaluations(direct, limit):
+    nlo, calls = direct()
+    x, f, count = nlo.direct(limit, 60, 2)
+    assert count <= limit
+    assert count == len(calls) == len(nlo.hybClass.evallog.read())
+    assert f == min(quadratic(c) for c in calls)
+    assert quadratic(x) == f
+
+
+def test_evaluations_are_logged_in_order(direct):
+    nlo, calls = direct()
+    x, f, count = nlo.direct(60, 60, 2)
+    data = nlo.hybClass.evallog.read()
+    assert list(data[:, 0]) == list(range(1, count+1))
+    assert np.allclose(data[:, 6:8], calls)
+    assert set(data[:, 2]) == {0}
+    assert data[-1, -1] == f
+
+
+def test_converges_on_a_quadratic(direct):
+    nlo, calls = direct()
+    x, f, count = nlo.direct(300, 60, 2)
+    assert f < 1e-3
+    assert x == pytest.approx([0.3, 0.7], abs=0.05)
+
+
+def test_integer_sides_stop_dividing(direct):
+    nlo, calls = direct(ints=(1, 1), ub=(4.0, 4.0))
+    x, f, count = nlo.direct(1000, 60, 2)
+    # The boxes are less than a unit wide well before the limit
+    assert count < 50
+    assert all(v == round(v) for c in calls for v in c)
+    assert all(v == round(v) for v in x)
+
+
+def test_time_limit_stops_after_the_first_center(direct):
+    nlo, calls = direct()
+    x, f, count = nlo.direct(100, 0, 2)
+    assert count == 1
+    assert calls == [[0.5, 0.5]]
+
+
+def test_region_limits_the_search(direct):
+    nlo, calls = direct()
+    x, f, count = nlo.direct(50, 60, 2, [0.5, 0.5], [1.0, 1.0])
+    assert all(0.5 <= v <= 1.0 for c in calls for v in c)
+    assert x[0] == pytest.approx(0.5, abs=0.05)
+
+
+def test_cut_batch_keeps_its_completed_evaluations(config, tmp_path):
+    exe = tmp_path / 'slow.py'
+    exe.write_text('#!' + sys.executable + '\n'
+                   'import time\n'
+                   'x = [float(v) for v in open("myin") if v.strip()]\n'
+                   'time.sleep(x[0])\n'
+                   'open("myout", "w").write("%.15g\\n" % (10 - x[0]))\n')
+    os.chmod(str(exe), 0o755)
+    bb = blackBox(config(executable=str(exe), ub=[3.0, 1.0]))
+    stub = types.SimpleNamespace(blackbox=bb,
+                                 evallog=evalLog(str(tmp_path), 2),
+                                 lb=[0.0, 0.0], ub=[3.0, 1.0], ints=[0, 0],
+                                 x0=[0.5, 0.5], s_time=time.time())
+    # The center takes 1.5 s, the first point of the next batch 2.5 s
+    # and the second one is killed
+    with bb.deadline(5):
+        x, f, count = pyOpt(stub).direct(100, 5, 2)
+    bb.close()
+    assert count == 2
+    assert x == pytest.approx([2.5, 0.5])
+    assert f == pytest.approx(7.5)
+    data = stub.evallog.read()
+    assert data[:, -2].tolist() == pytest.approx([8.5, 7.5])
@@ -0,0 +1,97 @@
+import threading
+import pytest
+from hybrid_tuner.tuner import askQueue, tuner
+
+space = {'lower_bounds': [-1, -1], 'upper_bounds': [1, 1],
+         'var_type': [0, 1]}
+
+
+def quadratic(x):
+    return float((x[0] - 0.3)**2 + (x[1] - 1)**2)
+
+
+def test_told_values_are_returned_in_order():
+    queue = askQueue()
+    out = []
+    solver = threading.Thread(
+        target=lambda: out.append(queue.map([[0.1, 0], [0.2, 1]])))
+    solver.start()
+    a = queue.ask(1, timeout=5)
+    b = queue.ask(5, timeout=5)
+    assert a == [[0.1, 0.0]] and b == [[0.2, 1.0]]
+    # Nothing is pending, asked points are not waited for
+    assert queue.ask(1) == []
+    queue.tell(b, [2.0])
+    queue.tell(a, [1.0])
+    solver.join(5)
+    assert out == [[1.0, 2.0]]
+
+
+def test_points_not_asked_are_rejected():
+    queue = askQueue()
+    with pytest.raises(ValueError):
+        queue.tell([[0.5, 0.5]], [1.0])
+
+
+def test_close_ends_the_asks():
+    queue = askQueue()
+    threading.Timer(0.1, queue.close).start()
+    assert queue.ask(1) == []
+    queue = askQueue()
+    queue.close(RuntimeError('solver failed'))
+    with pytest.raises(RuntimeError):
+        queue.ask(1)
+
+
+@pytest.mark.parametrize('strategy', ['single', 'bandit'])
+def test_ask_tell_round_trip(tmp_path, strategy):
+    t = tuner(space, None, strategy, str(tmp_path), max_iterations=60,
+              bandit={'init': 'direct', 'frequency': 10, 'cParam': 0.05,
+                      'window': 60, 'init_limit': 15})
+    told = {}
+    while not t.finished():
+        points = t.ask(4, timeout=10)
+        assert all(p[1] == round(p[1]) for p in points)
+        values = [quadratic(x) for x in points]
+        t.tell(points, values)
+        told.update((tuple(x), f) for x, f in zip(points, values))
+    result = t.result()
+    assert 0 < result['evaluations'] <= 60
+    assert result['f'] == min(told.values())
+    assert told[tuple(result['x'])] == result['f']
+    # Every logged evaluation was told
+    for row in result['history']:
+        assert told[tuple(row[6:8])] == row[-2]
+    if strategy == 'bandit':
+        # HOPSPACK cannot reach the tuner
+        assert list(t.ht.bandit_state.solvers) == [20, 21, 22, 23, 24]
+
+
+@pytest.mark.parametrize('objective', [None, lambda x: quadratic(x)])
+def test_external_solvers_are_refused(tmp_path, objective):
+    t = tuner(space, objective, 'single', str(tmp_path), solver=10,
+              max_iterations=20)
+    with pytest.raises(ValueError):
+        if objective is None:
+            t.ask(1, timeout=10)
+        else:
+            t.run()
+
+
+def test_run_matches_ask_tell(tmp_path):
+    calls = []
+
+    def objective(x):
+        calls.append(list(x))
+        return quadratic(x)
+    result = tuner(space, objective, 'single', str(tmp_path / 'run'),
+                   max_iterations=40).run()
+    t = tuner(space, None, 'single', str(tmp_path / 'ask'),
+              max_iterations=40)
+    asked = []
+    while not t.finished():
+        points = t.ask(1, timeout=10)
+        asked.extend(points)
+        t.tell(points, [quadratic(x) for x in points])
+    assert asked == calls
+    assert t.result()['f'] == result['f']
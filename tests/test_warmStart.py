@@ -0,0 +1,42 @@
+import numpy as np
+from hybrid_tuner.evalLog import evalLog
+from hybrid_tuner.tuner import tuner
+from hybrid_tuner.warmStart import warmStart
+
+
+def quadratic(x):
+    return float((x[0] - 0.3)**2 + (x[1] - 0.7)**2)
+
+
+def test_partial_and_predicted_values_are_skipped(tmp_path):
+    log = evalLog(str(tmp_path), 2)
+    log.append([1, 2, 3, 4], 0.5, 20, [[0, 0], [1, 1], [2, 2], [3, 3]],
+               [5, 1, 0.5, 3], pruned=[False, True, False, False],
+               surrogate=[False, False, True, False])
+    log.export()
+    for path in [str(tmp_path), str(tmp_path / 'allEvals.res')]:
+        warm = warmStart(path, [0, 0], [4, 4], [0, 0])
+        assert warm.X.tolist() == [[0, 0], [3, 3]]
+        assert warm.F.tolist() == [5, 3]
+        assert warm.best() == (3.0, [3.0, 3.0])
+
+
+def test_missing_histories_are_skipped(tmp_path, capsys):
+    (tmp_path / 'empty').mkdir()
+    warm = warmStart([str(tmp_path / 'empty'), str(tmp_path / 'none.res')],
+                     [0, 0], [4, 4], [0, 0])
+    assert len(warm.F) == 0 and warm.best() is None
+    assert capsys.readouterr().out.count('cannot be read') == 2
+
+
+def test_outdir_warm_starts_from_its_own_run(tmp_path, capsys):
+    space = {'lower_bounds': [-1, -1], 'upper_bounds': [1, 1],
+             'var_type': [0, 0]}
+    outdir = str(tmp_path / 'out')
+    first = tuner(space, quadratic, 'single', outdir,
+                  max_iterations=30).run()
+    second = tuner(space, quadratic, 'single', outdir, max_iterations=30,
+                   warm_start=outdir).run()
+    assert 'Warm start from ' + str(first['evaluations']) in (
+        capsys.readouterr().out)
+    assert second['f'] <= first['f']